@@ -8,6 +8,7 @@ from Core.Settings import Settings_entry
 from Core.ConduitServer import get_server
 from Core.BlenderClient import get_client
 from UI.ThemeLoader import StyleLoader
+from UI.IconCache import init_icon_cache
 
 
 # ======================================================
@@ -29,7 +30,8 @@ class AppManager:
         self.logger = get_logger()
 
         # Initialize the global Conduit instance so other modules can call get_conduit()
-        init_conduit(self.settings)
+        # the project itself is loaded in the background by the main window
+        init_conduit(self.settings, autoload=False)
         self.conduit = get_conduit()
         print("initializing conduit")
 
@@ -43,17 +45,32 @@ class AppManager:
         self.app.setStyleSheet(style_loader.load_stylesheet())
         print("applied Theme")
 
+        # decode and pre-scale the icons once, before any view paints them
+        init_icon_cache(dpr=self.app.devicePixelRatio())
+
         # Import MainWindow lazily to break circular imports
         window = main_window_class(settings=self.settings, conduit=self.conduit)
         window.show()
         print("showing main Window")
 
+        # Unix sockets in the config dir for traffic on this machine
+        local_socket = bool(self.settings.get(Settings_entry.LOCAL_SOCKET.value, True))
+
         # initializing Blender client
         BlenderClient = get_client()
+        if local_socket:
+            BlenderClient.unix_path = self.settings.config_dir / BlenderClient.SOCKET_NAME
         BlenderClient.connect()
 
         # starting server
         ConduitServer = get_server()
-        ConduitServer.start()
+        try:
+            ConduitServer.start(
+                use_asyncio=bool(self.settings.get(Settings_entry.SERVER_ASYNC.value, True)),
+                unix_path=ConduitServer.socket_path(self.settings.config_dir) if local_socket else None,
+            )
+        except OSError as e:
+            # e.g. another instance has the port and there is no local socket
+            self.logger.log(f"Could not start the Conduit server: {e}", "error")
 
         sys.exit(self.app.exec())
@@ -1,100 +1,445 @@
+import itertools
+import json
+import os
 import socket
 import threading
 import time
-from time import sleep
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Callable, Iterable
+from Core import Framing
 from Core.QLogger import log
 
 
 class BlenderClient:
+    """
+    Persistent connection to the Conduit add-on in Blender.
+
+    One socket is kept open; a reader thread takes the newline-delimited
+    replies off it, and the heartbeat thread pings over it and reconnects with
+    exponential backoff when it drops. The heartbeat state is cached in
+    `alive` and published to listeners, so nothing has to wait on the socket
+    to know whether Blender is there.
+
+    Every message carries an "id" that Blender echoes in its reply, so any
+    number of requests can be in flight at once: `request` returns a Future
+    right away and `send_many` costs about one round-trip. Replies without an
+    id are matched to the oldest pending request.
+
+    Each connection starts with a "hello" asking for length-prefixed frames
+    (see `Core.Framing`); an add-on that does not know it keeps getting
+    newline-delimited JSON.
+
+    With 'unix_path' set the client first tries the add-on's Unix socket and
+    falls back to TCP on host:port when it is not there.
+
+    Older add-ons close the connection after every reply. Once a connection
+    ends right after its first reply, every request gets a connection of its
+    own, one at a time; whatever was still waiting on that connection is sent
+    again that way.
+    """
+
     HOST = "127.0.0.1"
     PORT = 9000
     TIMEOUT = 2
+    # reconnect delays, doubled after every failed attempt
+    BACKOFF_MIN = 1.0
+    BACKOFF_MAX = 30.0
+    # framing asked for on every new connection
+    FRAMING = Framing.LENGTH
+    # Unix socket file of the add-on, in the Conduit config dir
+    SOCKET_NAME = "blender.sock"
 
-    def __init__(self, interval: float = 1.0):
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        interval: float = 1.0,
+        framing: str | None = None,
+        unix_path: Path | str | None = None,
+    ):
+        self.host = host or self.HOST
+        self.port = port or self.PORT
+        self.unix_path = unix_path
+        # "unix" or "tcp" while connected
+        self.transport: str | None = None
         self.interval = interval
+        self.framing = framing or self.FRAMING
+        # cleared once the add-on turned out not to know "hello"
+        self._negotiate = self.framing != Framing.NEWLINE
+        # framing of the current connection
+        self._wire = Framing.NEWLINE
         self._alive = None
-        self._ever_connected = False  # <— new flag
+        self._ever_connected = False
         self._lock = threading.Lock()
-        self._stop = False
+        # whole messages only, so concurrent requests do not interleave
+        self._send_lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._ids = itertools.count(1)
+        # request id -> (future, command, kwargs), oldest first
+        self._pending: dict[int, tuple[Future, str, dict]] = {}
+        # set once the add-on turned out to close after every reply
+        self._one_shot = False
+        self._one_shot_pool: ThreadPoolExecutor | None = None
+        # cleared once Blender answers without the request id
+        self._echoes_ids = True
+        self._listeners: list[Callable[[bool], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
         self._running = False
 
+    @property
+    def alive(self) -> bool:
+        """Result of the last heartbeat; never touches the socket."""
+        return bool(self._alive)
+
+    def add_listener(self, callback: Callable[[bool], None]) -> None:
+        """Call 'callback(alive)' from the heartbeat thread whenever the state changes."""
+        self._listeners.append(callback)
+
     def connect(self):
+        """Start the heartbeat thread, which opens and keeps the connection."""
+        if self._running:
+            return
         self._running = True
-        self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._heartbeat_loop, name="blender-heartbeat", daemon=True
+        )
         self._thread.start()
 
     # --------------------------
-    # Internal heartbeat loop
+    # Connection
     # --------------------------
 
-    def _heartbeat_loop(self):
-        while not self._stop:
-            self.ping()
-            sleep(1)
+    def _dial(self) -> socket.socket | None:
+        """The add-on's Unix socket if there is one, else TCP; None if neither answers."""
+        if self.unix_path and hasattr(socket, "AF_UNIX") and os.path.exists(self.unix_path):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.TIMEOUT)
+            try:
+                sock.connect(str(self.unix_path))
+                self.transport = "unix"
+                return sock
+            except OSError:
+                sock.close()  # stale file, Blender is gone or on TCP only
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.TIMEOUT)
+        except OSError:
+            return None
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.transport = "tcp"
+        return sock
 
-    def ping(self) -> bool:
-        response = self.send(command="ping")
+    def _connect(self) -> tuple[socket.socket, Framing.MessageReader, int] | None:
+        """
+        Open a socket and agree on the framing; None if Blender is not there.
+        Also returns the number of replies read already (the one to "hello").
+        """
+        for _ in range(2):
+            sock = self._dial()
+            if sock is None:
+                return None
+            reader = Framing.MessageReader(sock)
+            replies = 0
+            if self._negotiate:
+                try:
+                    sock.sendall(Framing.hello(self.framing))
+                    reply = reader.read()
+                except OSError:
+                    reply = None
+                if reply is None:
+                    # an add-on that closes the connection after every message
+                    sock.close()
+                    self._negotiate = False
+                    continue
+                replies = 1
+                try:
+                    framing = json.loads(reply).get("framing")
+                except (ValueError, AttributeError):
+                    framing = None
+                if framing == self.framing:
+                    reader.framing = framing
+                else:
+                    self._negotiate = False
+            sock.settimeout(None)  # the reader blocks until data or close
+            return sock, reader, replies
+        return None
 
-        # --- No response ---
-        if not response:
-            # Previously connected -> lost connection
-            if self._alive:
-                log("Lost connection to Blender!", "error")
-                self._alive = False
+    def _open(self) -> socket.socket | None:
+        """Connect if there is no connection yet; returns the socket or None."""
+        with self._lock:
+            if self._sock is not None:
+                return self._sock
+            connection = self._connect()
+            if connection is None:
+                return None
+            sock, reader, replies = connection
+            self._sock = sock
+            self._wire = reader.framing
+        threading.Thread(
+            target=self._read_loop,
+            args=(sock, reader, replies),
+            name="blender-reader",
+            daemon=True,
+        ).start()
+        return sock
 
-            # Never connected yet -> print once
-            elif not self._ever_connected:
-                log("Could not establish connection to Blender.", "warning")
-                self._ever_connected = True  # prevent repeated warnings
+    def _close(self, sock: socket.socket | None = None, resend: bool = False) -> None:
+        """
+        Drop the connection ('sock' only if it is still the current one). The
+        requests still waiting resolve to None, or with 'resend' are sent again
+        on connections of their own.
+        """
+        with self._lock:
+            if self._sock is None or (sock is not None and sock is not self._sock):
+                return
+            sock, self._sock = self._sock, None
+            self.transport = None
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+        # the requests still waiting will not get a reply on a new connection
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, command, kwargs in pending.values():
+            if future.done():
+                continue
+            if resend:
+                self._send_one_shot(future, command, kwargs)
+            else:
+                future.set_result(None)
 
-            return False
+    def _read_loop(
+        self, sock: socket.socket, reader: Framing.MessageReader, replies: int
+    ) -> None:
+        try:
+            # None once Blender closed the connection
+            while (message := reader.read()) is not None:
+                if not message.strip():
+                    continue
+                replies += 1
+                try:
+                    reply = json.loads(message)
+                except ValueError:
+                    log(f"invalid reply from Blender: {bytes(message[:200])!r}", "warning")
+                    continue
+                self._deliver(reply)
+        except OSError:
+            pass  # reset by an add-on that closed with our next request unread
+        # an add-on that serves one message per connection never read the rest
+        one_shot = replies == 1 and not self._stop.is_set() and sock is self._sock
+        if one_shot and not self._one_shot:
+            log("Blender closes the connection after every reply, using one per request", "noise")
+            self._one_shot = True
+        self._close(sock, resend=one_shot)
 
-        # --- Response received ---
+    def _deliver(self, reply) -> None:
+        request_id = reply.get("id") if isinstance(reply, dict) else None
         with self._lock:
-            alive = response.get("status") == "ok"
+            if request_id is None:
+                self._echoes_ids = False
+                request_id = next(iter(self._pending), None)
+            entry = self._pending.pop(request_id, None)
+        if entry is not None and not entry[0].done():
+            entry[0].set_result(reply)
 
-            # First successful connection
-            if not self._alive:
-                log("Blender Heartbeat detected! Conduit -> Blender Ready", "success")
+    # --------------------------
+    # Internal heartbeat loop
+    # --------------------------
+
+    def _heartbeat_loop(self):
+        delay = self.BACKOFF_MIN
+        while not self._stop.is_set():
+            if self._one_shot:
+                connected = self.ping()
+            else:
+                connected = self._open() is not None and self.ping()
+            if not connected:
+                self._set_alive(False)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.BACKOFF_MAX)
+                continue
+            delay = self.BACKOFF_MIN
+            self._stop.wait(self.interval)
 
+    def _set_alive(self, alive: bool) -> None:
+        with self._lock:
+            was_alive = self._alive
             self._alive = alive
-            self._ever_connected = True
+
+            if alive and not was_alive:
+                log("Blender Heartbeat detected! Conduit -> Blender Ready", "success")
+            elif not alive and was_alive:
+                # Previously connected -> lost connection
+                log("Lost connection to Blender!", "error")
+            elif not alive and not self._ever_connected:
+                # Never connected yet -> print once
+                log("Could not establish connection to Blender.", "warning")
+            self._ever_connected = True  # prevent repeated warnings
             self._last_check = time.time()
 
+        if was_alive is None or alive != was_alive:
+            for callback in list(self._listeners):
+                try:
+                    callback(alive)
+                except Exception as e:
+                    log(f"ERROR in Blender heartbeat listener: {e}", "error")
+
+    def ping(self) -> bool:
+        response = self.send(command="ping")
+        alive = bool(response) and response.get("status") == "ok"
+        self._set_alive(alive)
         return alive
 
-    def send(self, command: str, **kwargs) -> dict | None:
-        import json
+    def request(
+        self,
+        command: str,
+        callback: Callable[[dict | None], None] | None = None,
+        **kwargs,
+    ) -> Future:
+        """
+        Send one command without waiting for the reply.
+
+        The Future resolves to the reply, or to None if the connection is
+        lost first; 'callback' is called with the same value, usually on the
+        reader thread. Connects first if there is no connection.
+        """
+        return self._request_all([(command, kwargs)], callback)[0]
+
+    def _request_all(
+        self,
+        commands: list[tuple[str, dict]],
+        callback: Callable[[dict | None], None] | None = None,
+    ) -> list[Future]:
+        futures = [Future() for _ in commands]
+        if callback is not None:
+            for future in futures:
+                future.add_done_callback(lambda f: callback(f.result()))
+
+        if self._one_shot:
+            for future, (command, kwargs) in zip(futures, commands):
+                self._send_one_shot(future, command, kwargs)
+            return futures
 
-        payload = {"cmd": command, **kwargs}
-        data = json.dumps(payload) + "\n"
-        data_bytes = data.encode("utf-8")
+        sock = self._open()
+        messages = []
+        with self._lock:
+            if sock is not None and sock is self._sock:
+                for future, (command, kwargs) in zip(futures, commands):
+                    request_id = next(self._ids)
+                    self._pending[request_id] = (future, command, kwargs)
+                    message = json.dumps({"cmd": command, **kwargs, "id": request_id})
+                    messages.append(Framing.encode(message.encode("utf-8"), self._wire))
+            else:
+                sock = None  # not connected, or closed in the meantime
+        if sock is None:
+            for future in futures:
+                future.set_result(None)
+            return futures
+        try:
+            with self._send_lock:
+                sock.sendall(b"".join(messages))
+        except OSError as e:
+            # the reader sees the connection end and settles the requests
+            log(f"Error sending to Blender: {e}", "noise")
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return futures
+
+    def _send_one_shot(self, future: Future, command: str, kwargs: dict) -> None:
+        """Queue a request for a connection of its own (see `_exchange`)."""
+        with self._lock:
+            if self._one_shot_pool is None:
+                self._one_shot_pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="blender-request"
+                )
+            pool = self._one_shot_pool
+        message = json.dumps({"cmd": command, **kwargs}).encode("utf-8")
+        pool.submit(lambda: future.done() or future.set_result(self._exchange(message)))
 
+    def _exchange(self, message: bytes) -> dict | None:
+        """Send one message on a new connection and read the reply."""
+        sock = self._dial()
+        if sock is None:
+            return None
         try:
-            with socket.create_connection(
-                (self.HOST, self.PORT), timeout=self.TIMEOUT
-            ) as s:
-                s.sendall(data_bytes)
-
-                buffer = ""
-                while True:
-                    chunk = s.recv(1024).decode("utf-8")
-                    if not chunk:
-                        break
-                    buffer += chunk
-                    if "\n" in buffer:
-                        line, _ = buffer.split("\n", 1)
-                        return json.loads(line)
-                return json.loads(buffer) if buffer else None
-
-        except Exception as e:
-            log(f"Error: {e}", "error")
+            with sock:
+                sock.settimeout(self.TIMEOUT)
+                sock.sendall(message + b"\n")
+                reply = Framing.MessageReader(sock).read()
+            return json.loads(reply) if reply else None
+        except (OSError, ValueError):
             return None
 
+    def _wait(self, future: Future, command: str, timeout: float | None) -> dict | None:
+        try:
+            return future.result(self.TIMEOUT if timeout is None else timeout)
+        except FutureTimeout:
+            log(f"Blender did not answer '{command}' in time", "warning")
+            with self._lock:
+                for request_id, (pending, _, _) in list(self._pending.items()):
+                    if pending is future:
+                        del self._pending[request_id]
+                # replies matched by order would now go to the wrong request
+                restart = not self._echoes_ids
+            if restart:
+                self._close()
+            return None
+
+    def send(self, command: str, **kwargs) -> dict | None:
+        """Send one command and wait for its reply."""
+        return self._wait(self.request(command, **kwargs), command, None)
+
+    def send_many(
+        self, commands: Iterable[str | tuple[str, dict]], timeout: float | None = None
+    ) -> list[dict | None]:
+        """
+        Send all 'commands' in one write and wait for every reply. Items are
+        commands or (command, kwargs) pairs; replies come back in the same order.
+        """
+        commands = [(c, {}) if isinstance(c, str) else c for c in commands]
+        futures = self._request_all(commands)
+        deadline = time.monotonic() + (self.TIMEOUT if timeout is None else timeout)
+        return [
+            self._wait(future, command, max(0.0, deadline - time.monotonic()))
+            for future, (command, _) in zip(futures, commands)
+        ]
+
+    def send_batch(
+        self, commands: Iterable[str | tuple[str, dict]], timeout: float | None = None
+    ) -> list[dict | None]:
+        """
+        Like `send_many`, but as one "batch" message that Blender answers
+        with one list of replies. Falls back to `send_many` if the add-on
+        does not know the batch command.
+        """
+        commands = [(c, {}) if isinstance(c, str) else c for c in commands]
+        if not commands:
+            return []
+        envelope = [{"cmd": command, **kwargs} for command, kwargs in commands]
+        reply = self._wait(self.request("batch", commands=envelope), "batch", timeout)
+        if reply and reply.get("status") == "ok" and isinstance(reply.get("reply"), list):
+            return reply["reply"]
+        if reply and reply.get("msg") == "unknown command":
+            return self.send_many(commands, timeout)
+        return [None] * len(commands)
+
     def stop(self):
-        """Stops background heartbeat thread."""
-        self._stop = True
-        self._thread.join()
+        """Stops background heartbeat thread and closes the connection."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._running = False
+        self._close()
+        if self._one_shot_pool is not None:
+            self._one_shot_pool.shutdown(wait=False, cancel_futures=True)
+            self._one_shot_pool = None
 
 
 _instance: BlenderClient | None = None
@@ -108,8 +453,6 @@ def get_client() -> BlenderClient:
 
 
 def get_heartbeat() -> bool:
+    """Cached heartbeat state; does not block."""
     client = get_client()
-    if client._running:
-        return client.ping()
-    else:
-        return False
+    return client._running and client.alive
@@ -22,7 +22,22 @@ class BlenderCommands:
     
         
         command = self.build_command("link", {"path": f"{filepath}"})
-        self.Blender.send(command)
+        # does not wait for Blender; failures are logged when the reply comes in
+        self.Blender.request(command, callback=lambda reply: self._check_reply(command, reply))
+
+    def link_many(self, filepaths: list[Path]) -> list[dict | None]:
+        """Link all 'filepaths' in one round-trip and return Blender's replies."""
+        commands = [self.build_command("link", {"path": f"{path}"}) for path in filepaths]
+        replies = self.Blender.send_batch(commands)
+        for command, reply in zip(commands, replies):
+            self._check_reply(command, reply)
+        return replies
+
+    def _check_reply(self, command: str, reply: dict | None) -> None:
+        if not reply:
+            log(f"Blender did not answer {command}", "warning")
+        elif reply.get("status") != "ok":
+            log(f"Blender failed {command}: {reply.get('msg', reply)}", "error")
 
 
     def build_command(self, command: str, kwargs: dict | None = None) -> str:
@@ -0,0 +1,367 @@
+import heapq
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from Core.ProjectModel import ProjectModel, ProjectChange, Folder, Asset, Task
+from Core import TaskMetadata
+
+
+INDEX_VERSION = 1
+
+# mtimes (ns) of a task directory and of its metadata store (None if missing)
+Stamp = tuple[int, int | None]
+
+
+class VersionHit(NamedTuple):
+    task: Path
+    file: str
+    version: int | None
+    user: str
+    comment: str
+    time: int
+
+
+_WORD = re.compile(r"\w+")
+_PHRASE = re.compile(r'"([^"]*)"|\'([^\']*)\'')
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _parse_query(text: str) -> tuple[set[str], list[str]]:
+    """Words every hit must contain, and quoted phrases it must contain as such."""
+    phrases = [" ".join(_words(a or b)) for a, b in _PHRASE.findall(text)]
+    words = set(_words(_PHRASE.sub(" ", text)))
+    for phrase in phrases:
+        words.update(phrase.split())
+    return words, [phrase for phrase in phrases if phrase]
+
+
+class CommentIndex:
+    """
+    Inverted index over the version comments and users of the whole project.
+
+    Every metadata record is one document, keyed by (task path, file); a newer
+    record for the same file replaces it, like in the store itself. Comment
+    words and lower-case user names each map to the documents holding them, so
+    "versions by anna mentioning 'UV fix'" is a couple of set intersections.
+    All methods are safe to call from any thread. Saved with `save`, the index
+    only reads the tasks that changed on the next launch (see `refresh`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # doc id -> (task, file, version, user, comment, time, comment words)
+        self._docs: dict[int, tuple] = {}
+        # (task, file) -> doc id
+        self._keys: dict[tuple[str, str], int] = {}
+        # task -> doc ids, to replace or drop a task at once
+        self._tasks: dict[str, set[int]] = {}
+        self._words: dict[str, set[int]] = {}
+        self._users: dict[str, set[int]] = {}
+        # task -> stamp of the task when its store was read
+        self._stamps: dict[str, Stamp] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._keys.clear()
+            self._tasks.clear()
+            self._words.clear()
+            self._users.clear()
+            self._stamps.clear()
+
+    # ------------------------
+    # Updates
+    # ------------------------
+
+    def _drop(self, doc: int) -> None:
+        task, file, _, user, _, _, words = self._docs.pop(doc)
+        del self._keys[(task, file)]
+        for postings, key in [(self._users, user.lower())] + [(self._words, w) for w in words]:
+            docs = postings.get(key)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del postings[key]
+
+    def _add(self, task: str, record: dict) -> None:
+        file = record.get("file")
+        if not file:
+            return
+        old = self._keys.get((task, file))
+        if old is not None:
+            self._drop(old)
+            self._tasks[task].discard(old)
+        user = record.get("user") or "Unknown"
+        comment = record.get("comment") or ""
+        words = tuple(_words(comment))
+        doc = self._next_id
+        self._next_id += 1
+        self._docs[doc] = (
+            task, file, record.get("version"), user, comment, record.get("time") or 0, words
+        )
+        self._keys[(task, file)] = doc
+        self._tasks.setdefault(task, set()).add(doc)
+        self._users.setdefault(user.lower(), set()).add(doc)
+        for word in set(words):
+            self._words.setdefault(word, set()).add(doc)
+
+    def add_records(self, task_path: Path, records: Iterable[dict]) -> None:
+        """Index records appended to the store of 'task_path'."""
+        task = str(task_path)
+        with self._lock:
+            for record in records:
+                self._add(task, record)
+
+    def set_task(
+        self, task_path: Path, records: dict[str, dict], stamp: Stamp | None = None
+    ) -> None:
+        """
+        Replace everything indexed for 'task_path' with 'records', read when
+        the task had 'stamp' (see `read_task`).
+        """
+        task = str(task_path)
+        with self._lock:
+            for doc in self._tasks.pop(task, ()):
+                self._drop(doc)
+            for record in records.values():
+                self._add(task, record)
+            if stamp is not None:
+                self._stamps[task] = stamp
+            else:
+                self._stamps.pop(task, None)
+
+    @staticmethod
+    def stamp(task_path: Path) -> Stamp | None:
+        """mtimes of the task directory and of its store; None if the task is gone."""
+        try:
+            directory = os.stat(task_path).st_mtime_ns
+        except OSError:
+            return None
+        try:
+            store = os.stat(TaskMetadata.metadata_path(task_path)).st_mtime_ns
+        except OSError:
+            store = None
+        return directory, store
+
+    @classmethod
+    def read_task(cls, task_path: Path) -> tuple[Path, Stamp | None, dict[str, dict]]:
+        """The stamp and the records of a task, stamped first so no change is missed."""
+        stamp = cls.stamp(task_path)
+        return task_path, stamp, TaskMetadata.load_task_metadata(task_path, import_legacy=False)
+
+    def index_tasks(self, task_paths: Iterable[Path]) -> None:
+        """Read and index the stores of 'task_paths'."""
+        for task in task_paths:
+            task, stamp, records = self.read_task(task)
+            self.set_task(task, records, stamp)
+
+    def remove(self, path: Path) -> None:
+        """Forget the tasks at and below 'path'."""
+        path = str(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            for task in [t for t in self._tasks if t == path or t.startswith(prefix)]:
+                for doc in self._tasks.pop(task):
+                    self._drop(doc)
+            for task in [t for t in self._stamps if t == path or t.startswith(prefix)]:
+                del self._stamps[task]
+
+    def apply_changes(self, changes: Iterable[ProjectChange]) -> list[Path]:
+        """
+        Drop what `ProjectModel.apply_updates` removed. Returns the task paths
+        to read again with `index_tasks`.
+        """
+        added: list[Path] = []
+        for kind, _, node in changes:
+            if kind in ("removed", "tasks"):
+                # an asset whose tasks changed is simply read again
+                self.remove(node.path)
+            if kind in ("added", "tasks"):
+                added.extend(self._task_paths(node))
+        return added
+
+    @staticmethod
+    def _task_paths(node: Folder | Asset | Task) -> list[Path]:
+        stack, paths = [node], []
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Task):
+                paths.append(node.path)
+            elif isinstance(node, Asset):
+                stack.extend(node.tasks)
+            else:
+                stack.extend(node.assets)
+                stack.extend(node.subfolders)
+        return paths
+
+    def build(
+        self, root: Path, workers: int = 1, cancel: threading.Event | None = None
+    ) -> bool:
+        """
+        Index every task below 'root', reading the stores on 'workers'
+        threads. Returns False if it was cancelled.
+        """
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="conduit-comments"
+        )
+
+        try:
+            for batch in ProjectModel.scan_batches(Path(root), workers=workers, cancel=cancel):
+                tasks = [task for scan in batch.values() if scan.is_asset for task in scan.subdirs]
+                for task, stamp, records in pool.map(self.read_task, tasks):
+                    self.set_task(task, records, stamp)
+                if cancel is not None and cancel.is_set():
+                    return False
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return not (cancel is not None and cancel.is_set())
+
+    def refresh(
+        self, task_paths: Iterable[Path], workers: int = 1, cancel: threading.Event | None = None
+    ) -> bool:
+        """
+        Make the index hold exactly 'task_paths': tasks not among them are
+        dropped and only the ones whose stamp changed since they were read are
+        read again, on 'workers' threads. Returns False if it was cancelled.
+        """
+        wanted = sorted({str(task) for task in task_paths})
+        keep = set(wanted)
+        with self._lock:
+            for task in [t for t in chain(self._tasks, self._stamps) if t not in keep]:
+                for doc in self._tasks.pop(task, ()):
+                    self._drop(doc)
+                self._stamps.pop(task, None)
+            stamps = dict(self._stamps)
+
+        def _read(task: str):
+            if cancel is not None and cancel.is_set():
+                return None
+            path = Path(task)
+            stamp = self.stamp(path)
+            if stamp is not None and stamp == stamps.get(task):
+                return None
+            return self.read_task(path)
+
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="conduit-comments"
+        )
+        try:
+            for result in pool.map(_read, wanted):
+                if result is not None:
+                    task, stamp, records = result
+                    self.set_task(task, records, stamp)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return not (cancel is not None and cancel.is_set())
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the indexed records and task stamps to 'path' as compact JSON."""
+        with self._lock:
+            tasks = {
+                task: [
+                    self._stamps.get(task),
+                    [list(self._docs[doc][1:6]) for doc in self._tasks.get(task, ())],
+                ]
+                for task in chain(self._tasks, self._stamps)
+            }
+        data = {"version": INDEX_VERSION, "tasks": tasks}
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path) -> bool:
+        """
+        Add the records saved by `save`, without reading any task store.
+        Returns False if the file is missing or unreadable.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return False
+            tasks = []
+            for task, (stamp, docs) in data["tasks"].items():
+                records = [
+                    dict(zip(("file", "version", "user", "comment", "time"), doc))
+                    for doc in docs
+                ]
+                tasks.append((str(task), tuple(stamp) if stamp else None, records))
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            return False
+        with self._lock:
+            for task, stamp, records in tasks:
+                for record in records:
+                    self._add(task, record)
+                if stamp is not None:
+                    self._stamps[task] = stamp
+        return True
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def search(
+        self,
+        text: str = "",
+        user: str | None = None,
+        path: Path | None = None,
+        limit: int | None = 100,
+    ) -> list[VersionHit]:
+        """
+        Versions whose comment holds every word of 'text' and every "quoted
+        phrase" in it, newest first. 'user' and 'path' (a folder, asset or
+        task) narrow the result down.
+        """
+        words, phrases = _parse_query(text)
+        if not words and not user:
+            return []
+        with self._lock:
+            postings = [self._words.get(word, set()) for word in words]
+            if user:
+                postings.append(self._users.get(user.lower(), set()))
+            postings.sort(key=len)
+            docs = set.intersection(*postings) if postings[0] else set()
+
+            prefix = None
+            if path is not None:
+                path = str(path)
+                prefix = path.rstrip(os.sep) + os.sep
+
+            hits = []
+            for doc in docs:
+                entry = self._docs[doc]
+                task = entry[0]
+                if prefix and task != path and not task.startswith(prefix):
+                    continue
+                if phrases:
+                    joined = f" {' '.join(entry[6])} "
+                    if not all(f" {phrase} " in joined for phrase in phrases):
+                        continue
+                hits.append(entry)
+
+        key = lambda entry: (-entry[5], entry[0], entry[1])
+        if limit is None:
+            hits.sort(key=key)
+        else:
+            hits = heapq.nsmallest(limit, hits, key=key)
+        return [
+            VersionHit(Path(task), file, version, user_name, comment, time)
+            for task, file, version, user_name, comment, time, _ in hits
+        ]
@@ -3,14 +3,19 @@ from pathlib import Path
 import shutil
 import os
 import threading
-from typing import Optional, Protocol
-import re
-import json
+import hashlib
+from typing import Callable, Iterable, Optional, Protocol
 from Core import Settings
 from Core.Settings import Constants
 from Core.QLogger import get_logger
 from Core.QLogger import log
-from Core.ProjectModel import ProjectModel, Folder, Asset, Task
+from Core.ProjectModel import ProjectModel, Folder, Asset, Task, DirScan, ProjectChange
+from Core.ProjectWatcher import POLL_INTERVAL, ProjectWatcher, create_watcher
+from Core.ProjectCatalog import ProjectCatalog
+from Core.SearchIndex import SearchIndex, SearchResult
+from Core.CommentIndex import CommentIndex, VersionHit
+from Core.VersionIndex import VersionIndex
+from Core import TaskMetadata
 from Core.Settings import Settings_entry
 import subprocess
 
@@ -29,11 +34,11 @@ class ConduitSingleton:
         return cls._instance
 
     @classmethod
-    def init_instance(cls, settings: Settings) -> "Conduit":
+    def init_instance(cls, settings: Settings, autoload: bool = True) -> "Conduit":
         """Create and register the global Conduit instance."""
         with cls._lock:
             if cls._instance is None:
-                cls._instance = Conduit(settings)
+                cls._instance = Conduit(settings, autoload=autoload)
             return cls._instance
 
     @classmethod
@@ -52,9 +57,9 @@ def get_conduit() -> "Conduit":
     return ConduitSingleton.get_instance()
 
 
-def init_conduit(settings: Settings) -> "Conduit":
+def init_conduit(settings: Settings, autoload: bool = True) -> "Conduit":
     """Create and register the global Conduit instance."""
-    return ConduitSingleton.init_instance(settings)
+    return ConduitSingleton.init_instance(settings, autoload=autoload)
 
 
 class Conduit:
@@ -64,8 +69,11 @@ class Conduit:
     Do not instantiate directly - use get_conduit() or init_conduit() instead.
     """
 
-    def __init__(self, settings: Settings):
-        """Initialize Conduit instance. Do not call directly - use init_conduit()."""
+    def __init__(self, settings: Settings, autoload: bool = True):
+        """
+        Initialize Conduit instance. Do not call directly - use init_conduit().
+        With 'autoload' off the project is left for the UI to load in the background.
+        """
         if ConduitSingleton._instance is not None:
             raise RuntimeError(
                 "Conduit instance already exists. Use get_conduit() to access it."
@@ -73,32 +81,430 @@ class Conduit:
 
         self.settings = settings
         self.root_path = None
+        self.project: ProjectModel | None = None
+        self.watcher: ProjectWatcher | None = None
+        self.catalog: ProjectCatalog | None = None
+        self._catalog_cancel: threading.Event | None = None
+        self.search_index = SearchIndex()
+        self._index_cancel: threading.Event | None = None
+        # set once the search index lists every task of the project
+        self._index_ready = threading.Event()
+        self.comment_index = CommentIndex()
+        self._comments_cancel: threading.Event | None = None
         self.logger = get_logger()
-        self.load_project()
-
         self.selected_asset: Asset | None = None
         self.selected_task: Task | None = None
-
-    def load_project(self):
+        self.versions = VersionIndex()
+        if autoload:
+            self.load_project()
+
+    def _project_options(self) -> dict:
+        return {
+            "workers": int(self.settings.get(Settings_entry.SCAN_WORKERS.value, 1) or 1),
+            "lazy": bool(self.settings.get(Settings_entry.LAZY_SCAN.value, False)),
+        }
+
+    def load_project(self, stream: bool = False):
+        """
+        Load the configured project, from the index snapshot when there is one.
+
+        Without a snapshot the tree is scanned right away, unless 'stream' is
+        set: then an empty project with `loading` set is returned and the caller
+        fills it with `ProjectModel.scan_batches` / `attach_project_batch` and
+        calls `finish_project_load` at the end.
+        """
         root = self.settings.get(Settings_entry.PROJECT_DIRECTORY.value)
         if not root:
             return None
         self.root_path = Path(root)
-        self.project = ProjectModel(self.root_path)
+        self.versions.forget()
+        self.open_catalog()
+
+        options = self._project_options()
+        snapshot = self._snapshot_path()
+        self.project = (
+            ProjectModel.from_snapshot(self.root_path, snapshot, **options)
+            if snapshot
+            else None
+        )
+        if self.project is not None:
+            self._on_project_ready()
+            return self.project
+
+        if stream:
+            options["lazy"] = True
+            self.project = ProjectModel(self.root_path, scan=False, **options)
+            self.project.loading = True
+            return self.project
+
+        self.project = ProjectModel(self.root_path, **options)
+        self.save_project_snapshot()
+        self._on_project_ready()
         return self.project
 
+    def attach_project_batch(
+        self, project: ProjectModel, batch: dict[Path, DirScan]
+    ) -> list[ProjectChange]:
+        """Attach streamed listings; batches for a replaced project are dropped."""
+        if project is not self.project or not project.loading:
+            return []
+        return project.attach_scans(batch)
+
+    def finish_project_load(self, project: ProjectModel) -> None:
+        if project is not self.project or not project.loading:
+            return
+        project.loading = False
+        project.lazy = self._project_options()["lazy"]
+        self.save_project_snapshot()
+        self._on_project_ready()
+        log("Project loaded", "success")
+
+    def _on_project_ready(self) -> None:
+        """Background work that needs the loaded project."""
+        self.build_search_index()
+        self.build_comment_index()
+        self.sync_catalog()
+
+    def build_search_index(self) -> None:
+        """
+        Index the asset and task names of the project for `search`.
+
+        A fully loaded tree is indexed right away; for a lazily loaded one the
+        index saved at the last launch is brought up to date in the background,
+        so folders that were never expanded are searchable too. Only the first
+        launch lists the whole project.
+        """
+        if self._index_cancel:
+            self._index_cancel.set()
+            self._index_cancel = None
+        self.search_index.clear()
+        ready = self._index_ready = threading.Event()
+        project = self.project
+        if not project:
+            return
+        if not project.lazy and not project.loading:
+            self.search_index.add_node(project.root)
+            ready.set()
+            return
+
+        cancel = self._index_cancel = threading.Event()
+        index = self.search_index
+        root = project.root.path
+        workers = project.workers
+        saved = self._project_file("search_index", ".json")
+
+        def _run():
+            try:
+                if saved and index.load(saved):
+                    if not index.refresh(workers, cancel):
+                        return
+                else:
+                    for batch in ProjectModel.scan_batches(root, workers=workers, cancel=cancel):
+                        index.add_scans(batch)
+            except Exception as e:
+                log(f"Building the search index failed: {e}", "error")
+                return
+            if cancel.is_set():
+                return
+            ready.set()
+            log(f"Search index ready ({len(index)} entries)", "noise")
+            if saved:
+                try:
+                    index.save(saved)
+                except OSError as e:
+                    log(f"Could not save search index: {e}", "warning")
+
+        threading.Thread(target=_run, name="conduit-search-index", daemon=True).start()
+
+    @property
+    def search_ready(self) -> bool:
+        """Whether the search index lists every asset and task of the project."""
+        return self._index_ready.is_set()
+
+    def search(
+        self, query: str, limit: int = 20, kinds: list[str] | None = None
+    ) -> list[SearchResult]:
+        """Assets and tasks whose name matches 'query', best first."""
+        return self.search_index.search(query, limit, kinds)
+
+    def build_comment_index(self) -> None:
+        """
+        Read the version metadata of every task into the comment index, in the
+        background. The index saved at the last launch is loaded first and
+        only the tasks that changed since are read again; the task list comes
+        from the search index once it is complete.
+        """
+        if self._comments_cancel:
+            self._comments_cancel.set()
+            self._comments_cancel = None
+        self.comment_index.clear()
+        if not self.root_path:
+            return
+        cancel = self._comments_cancel = threading.Event()
+        index = self.comment_index
+        tasks = self.search_index
+        ready = self._index_ready
+        saved = self._project_file("comment_index", ".json")
+        workers = self._project_options()["workers"]
+
+        def _run():
+            try:
+                if saved:
+                    index.load(saved)
+                while not ready.wait(0.5):
+                    if cancel.is_set():
+                        return
+                if not index.refresh(tasks.paths("task"), workers, cancel):
+                    return
+            except Exception as e:
+                if not cancel.is_set():
+                    log(f"Building the comment index failed: {e}", "error")
+                return
+            log(f"Comment index ready ({len(index)} versions)", "noise")
+            if saved:
+                try:
+                    index.save(saved)
+                except OSError as e:
+                    log(f"Could not save comment index: {e}", "warning")
+
+        threading.Thread(target=_run, name="conduit-comments", daemon=True).start()
+
+    def _reindex_comments(self, task_paths: list[Path]) -> None:
+        if not task_paths:
+            return
+        index = self.comment_index
+
+        def _run():
+            try:
+                index.index_tasks(task_paths)
+            except Exception as e:
+                log(f"Could not update the comment index: {e}", "warning")
+
+        threading.Thread(target=_run, name="conduit-comments", daemon=True).start()
+
+    def search_versions(
+        self,
+        text: str = "",
+        user: str | None = None,
+        path: Path | None = None,
+        limit: int | None = 100,
+    ) -> list[VersionHit]:
+        """Versions by 'user' and/or whose comment matches 'text', newest first."""
+        return self.comment_index.search(text, user, path, limit)
+
+    def load_children(self, folder: Folder) -> list[Folder | Asset]:
+        """Scan a lazily loaded folder on demand and start watching its children."""
+        if not self.project:
+            return []
+        children = self.project.load_children(folder)
+        if children and self.watcher:
+            # the folder is worth polling now that its children are shown
+            self._watch([folder.path] + [child.path for child in children])
+        return children
+
+    def _project_file(self, prefix: str, suffix: str) -> Path | None:
+        """File in the config dir that belongs to the current project root."""
+        config_dir = getattr(self.settings, "config_dir", None)
+        if not config_dir or not self.root_path:
+            return None
+        digest = hashlib.sha1(str(self.root_path).encode("utf-8")).hexdigest()[:12]
+        return Path(config_dir) / f"{prefix}_{digest}{suffix}"
+
+    def _snapshot_path(self) -> Path | None:
+        """Project index file in the config dir, one per project root."""
+        return self._project_file("project_index", ".json")
+
+    def open_catalog(self) -> None:
+        """Open the SQLite catalog of the current project if it is enabled."""
+        self.close_catalog()
+        if not self.settings.get(Settings_entry.PROJECT_CATALOG.value, False):
+            return
+        path = self._project_file("project_catalog", ".sqlite")
+        if not path:
+            return
+        try:
+            self.catalog = ProjectCatalog(path)
+        except Exception as e:
+            log(f"Could not open project catalog: {e}", "warning")
+
+    def close_catalog(self) -> None:
+        if self._catalog_cancel:
+            self._catalog_cancel.set()
+            self._catalog_cancel = None
+        if self.catalog:
+            self.catalog.close()
+            self.catalog = None
+
+    def sync_catalog(self) -> None:
+        """Bring the catalog in line with the filesystem in the background."""
+        catalog = self.catalog
+        if not catalog or not self.root_path:
+            return
+        if self._catalog_cancel:
+            self._catalog_cancel.set()
+        cancel = self._catalog_cancel = threading.Event()
+        root = self.root_path
+        workers = self._project_options()["workers"]
+
+        def _run():
+            try:
+                if catalog.sync(root, workers, cancel):
+                    log("Project catalog updated", "noise")
+            except Exception as e:
+                if not cancel.is_set():
+                    log(f"Project catalog sync failed: {e}", "error")
+
+        threading.Thread(target=_run, name="conduit-catalog", daemon=True).start()
+
+    def _update_catalog(self, method: str, *args) -> None:
+        if not self.catalog:
+            return
+        try:
+            getattr(self.catalog, method)(*args)
+        except Exception as e:
+            log(f"Could not update project catalog: {e}", "warning")
+
+    def save_project_snapshot(self) -> None:
+        path = self._snapshot_path()
+        if not path or not self.project:
+            return
+        try:
+            self.project.save_snapshot(path)
+        except OSError as e:
+            log(f"Could not save project index: {e}", "warning")
+
+    def revalidate_project(
+        self,
+        on_done: Callable[[ProjectModel, dict[Path, DirScan]], None],
+        full: bool = False,
+    ) -> None:
+        """
+        Check the loaded project against the filesystem in the background.
+
+        Only directories whose mtime changed since the snapshot are listed again,
+        or every known directory if 'full' is set (manual refresh).
+        'on_done' is called from the worker thread with the project and the
+        fresh listings; pass them to `apply_project_updates` on the UI thread.
+        """
+        project = self.project
+        if not project:
+            return
+
+        def _run():
+            try:
+                paths = set(project.directories()) if full else None
+                updates = project.revalidate(paths)
+            except Exception as e:
+                log(f"Project revalidation failed: {e}", "error")
+                return
+            on_done(project, updates)
+
+        threading.Thread(target=_run, name="conduit-revalidate", daemon=True).start()
+
+    def apply_project_updates(
+        self, project: ProjectModel, updates: dict[Path, DirScan]
+    ) -> list[ProjectChange]:
+        """
+        Apply a `revalidate_project` or watcher result to the loaded project.
+        Returns the changes so the UI can patch only the affected rows.
+        """
+        if project is not self.project or not updates:
+            return []
+        changes = project.apply_updates(updates)
+        self.search_index.apply_changes(changes)
+        self._reindex_comments(self.comment_index.apply_changes(changes))
+        self._update_catalog("apply_changes", changes)
+
+        if self.watcher:
+            for kind, _, node in changes:
+                if kind == "added":
+                    self._watch(ProjectModel.subtree_paths(node))
+                elif kind == "removed":
+                    self.watcher.unwatch(ProjectModel.subtree_paths(node))
+
+        self.save_project_snapshot()
+        log(f"Project index refreshed ({len(updates)} changed directories)", "noise")
+        return changes
+
+    def start_watching(
+        self,
+        on_change: Callable[[ProjectModel, dict[Path, DirScan], set[Path]], None],
+    ) -> None:
+        """
+        Watch the loaded project for changes made by others.
+
+        Changed directories are listed again on the watcher thread and handed
+        to 'on_change' together with every directory that was reported, which
+        includes the selected task. Pass the updates on to
+        `apply_project_updates` on the UI thread. The directories are
+        registered on a worker thread, as that costs a system call each.
+        """
+        self.stop_watching()
+        project = self.project
+        if not project or not self.settings.get(Settings_entry.WATCH_PROJECT.value, True):
+            return
+
+        def _on_change(changed: set[Path] | None):
+            updates = project.revalidate(changed)
+            on_change(project, updates, changed or set())
+
+        interval = float(
+            self.settings.get(Settings_entry.POLL_INTERVAL.value, POLL_INTERVAL) or POLL_INTERVAL
+        )
+        watcher = self.watcher = create_watcher(_on_change, interval)
+        watcher.start()
+        if self.selected_task:
+            watcher.watch([self.selected_task.path])
+
+        def _register():
+            try:
+                self._watch(project.directories(), watcher)
+            except Exception as e:
+                log(f"Could not watch the project: {e}", "warning")
+
+        threading.Thread(target=_register, name="conduit-watch", daemon=True).start()
+
+    def _watch(self, paths: Iterable[Path], watcher: ProjectWatcher | None = None) -> None:
+        """
+        Hand 'paths' to the watcher. Where no change events can be had, only
+        folders whose children are loaded are polled; assets and folders
+        nobody expanded are left to the revalidation.
+        """
+        watcher = watcher or self.watcher
+        project = self.project
+        if not watcher or not project:
+            return
+        polled, others = [], []
+        for path in paths:
+            node = project.find(path)
+            if isinstance(node, Folder) and node.unloaded is None:
+                polled.append(path)
+            else:
+                others.append(path)
+        watcher.watch(polled)
+        watcher.watch(others, poll=False)
+
+    def stop_watching(self) -> None:
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+
     def create_folder(self, name: str, parent: Folder | None = None) -> Folder:
         if not self.project:
             raise RuntimeError("No project loaded.")
-        parent = parent or self.project.root
-        new_path = parent.path / name
-        new_path.mkdir(exist_ok=True)
-        new_node = Folder(new_path)
-        parent.subfolders.append(new_node)
+        new_node = self.project.add_folder(name, parent)
+        self._watch([new_node.path])
+        self.search_index.add_node(new_node)
+        self._update_catalog("add_nodes", ProjectCatalog.node_rows(new_node))
         return new_node
 
     def create_asset(self, name: str, parent: Folder) -> Asset:
-        new_asset = parent.add_asset(name)
+        if not self.project:
+            raise RuntimeError("No project loaded.")
+        new_asset = self.project.add_asset(name, parent)
+        self._watch([new_asset.path])
+        self.search_index.add_node(new_asset)
+        self._update_catalog("add_nodes", ProjectCatalog.node_rows(new_asset))
         return new_asset
 
     def add_new_task_file(self, new_file: Path, task: Task | None = None) -> None:
@@ -108,19 +514,22 @@ class Conduit:
 
         asset_name = task.path.parent.name
         task_name = task.name
-        version = self.get_latest_task_version(task=task)
+        number = self.versions.latest(task.path) + 1
+        version = f"{number:03}"
         suffix = new_file.suffix
         file_name = f"{asset_name}_{task_name}_{version}{suffix}"  # example: soldier_modelling_20.blend
-        shutil.copy(new_file, os.path.join(task.path, file_name))
+        target = task.path / file_name
+        # hashed while copying, so the new version is not read back
+        sha1 = TaskMetadata.copy_file(new_file, target)
         log(f"added {file_name} at {asset_name}, {task_name} to the project", "noise")
 
-        # add version info
-        data = {"user": self.settings.get(Settings_entry.USERNAME.value)}
-
-        json_name = f"{asset_name}_{task_name}_{version}.versioninfo"
-        json_path = os.path.join(task.path, json_name)
-        with open(json_path, "w") as f:
-            json.dump(data, f, indent=4)
+        # add version info to the task's metadata store
+        user = self.settings.get(Settings_entry.USERNAME.value)
+        record = TaskMetadata.version_record(target, user, sha1=sha1)
+        TaskMetadata.append_records(task.path, [record])
+        self.comment_index.add_records(task.path, [record])
+        self.versions.add(task.path, number)
+        self._update_catalog("add_version", task.path, record)
         return
 
     def get_latest_task_version(self, task: Task | None = None) -> str | None:
@@ -129,44 +538,35 @@ class Conduit:
             log("no task selected", "warning")
             return None
 
-        pattern = re.compile(
-            r"^(.*?)(\d+)\.([a-zA-Z0-9]+)$"
-        )  # matches: any string + any int + file extension
-
-        files = task.path.iterdir()
-        max_version = 0
-
-        for file in files:
-            match = pattern.match(file.name)
-            if match:
-                version = int(match.group(2))
-                if version > max_version:
-                    max_version = version
-
-        return f"{max_version + 1:03}"
+        # the index only lists the directory again if its mtime changed
+        return f"{self.versions.latest(task.path) + 1:03}"
 
     def create_task(self, name: str, asset: Asset) -> Task:
-        task_path = Path(os.path.join(asset.path, name))
-        new_task = Task(path=task_path)
-        asset.add_task(new_task)
-        return new_task
+        if not self.project:
+            raise RuntimeError("No project loaded.")
+        task = self.project.add_task(name, asset)
+        self.search_index.add_node(task)
+        self._update_catalog("add_nodes", ProjectCatalog.node_rows(task))
+        return task
 
     def delete_node(self, node: Folder | Asset) -> None:
         if not node.path.exists():
             return
         shutil.rmtree(node.path)
-        parent: Folder | None = self.project._find_entity(node)
-
-        if parent and isinstance(node, Folder):
-            parent.subfolders.remove(node)
-        if parent and isinstance(node, Asset):
-            parent.assets.remove(node)
+        self.versions.forget(node.path)
+        self.search_index.remove(node.path)
+        self.comment_index.remove(node.path)
+        self._update_catalog("remove", node.path)
+        if self.watcher:
+            self.watcher.unwatch(ProjectModel.subtree_paths(node))
+        self.project.remove_node(node)
 
     def get_all_assets(
         self, folder: Folder | None = None, asset_list: list[Asset] = []
     ) -> list[Asset]:
         if folder is None:
             folder = self.project.root
+            self.project.load_all(folder)
 
         for asset in folder.assets:
             asset_list.append(asset)
@@ -180,7 +580,11 @@ class Conduit:
         self.selected_asset = Asset
 
     def set_seleted_task(self, Task: Task) -> None:
+        if self.watcher and self.selected_task:
+            self.watcher.unwatch([self.selected_task.path])
         self.selected_task = Task
+        if self.watcher and Task:
+            self.watcher.watch([Task.path])
 
     def export_task(self, task: Task | None = None) -> None:
         if task is None:
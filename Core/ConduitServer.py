@@ -1,24 +1,225 @@
+import asyncio
+import heapq
+import itertools
+import os
 import socket
-from threading import Thread
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable
+from threading import Event, Thread
+from Core import Framing, TaskMetadata
 from Core.QLogger import log
 import json
+from pathlib import Path
 from Core.Conduit import get_conduit
+from Core.ProjectModel import Asset, Folder, Task
 from Core.Settings import Settings_entry
+from Core.VersionIndex import is_version_file, parse_version
+
+
+class _StreamConnection:
+    """
+    What the handlers write their reply to in asyncio mode. Every reply
+    becomes one message in the framing of the connection, tagged with the id
+    of the request if it had one, so clients can keep several requests in
+    flight.
+
+    Handlers may reply from a worker thread; the write is handed to the event
+    loop. Only the first reply of a request is sent, so a handler that
+    finishes after its timeout was reported stays quiet. With 'bare' the
+    reply goes out as is, without framing, for clients that read until the
+    connection closes.
+    """
+
+    __slots__ = (
+        "_writer", "_request_id", "_framing", "_bare", "_loop", "_loop_thread", "replied"
+    )
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        request_id=None,
+        framing: str = Framing.NEWLINE,
+        bare: bool = False,
+    ):
+        self._writer = writer
+        self._request_id = request_id
+        self._framing = framing
+        self._bare = bare
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.replied = False
+
+    def sendall(self, data: bytes) -> None:
+        # the reply is written in parts, so a large one is not copied to add
+        # the id and the framing
+        if data[:1].isspace() or data[-1:].isspace():
+            data = data.strip()
+        parts = [data]
+        if self._request_id is not None and data.startswith(b"{"):
+            request_id = json.dumps(self._request_id).encode("utf-8")
+            empty = len(data) < 8 and data[1:].strip() == b"}"
+            parts = [b'{"id":' + request_id + (b"" if empty else b","), memoryview(data)[1:]]
+        if self._bare:
+            pass  # the end of the connection ends the reply
+        elif self._framing == Framing.LENGTH:
+            parts.insert(0, Framing.HEADER.pack(sum(len(part) for part in parts)))
+        else:
+            parts.append(b"\n")
+        if threading.get_ident() == self._loop_thread:
+            self._write(parts)
+        else:
+            self._loop.call_soon_threadsafe(self._write, parts)
+
+    def _write(self, parts: list) -> None:
+        if self.replied or self._writer.is_closing():
+            return
+        self.replied = True
+        for part in parts:
+            self._writer.write(part)
+
+
+class _Request:
+    """
+    One command on its way through the handler pool, handed to the handler
+    as its connection. Only the first reply gets through, so a handler that
+    finishes after "<cmd> timed out" went out stays quiet. 'done' is called
+    once, as soon as the request is answered or its handler returned.
+    """
+
+    __slots__ = ("conn", "payload", "cmd", "answered", "_done", "_lock")
+
+    def __init__(self, conn, payload: dict, done: Callable[[], None] | None = None):
+        self.conn = conn
+        self.payload = payload
+        self.cmd = payload.get("cmd")
+        self.answered = False
+        self._done = done
+        self._lock = threading.Lock()
+
+    def sendall(self, data: bytes) -> None:
+        with self._lock:
+            if self.answered:
+                return
+            self.answered = True
+        try:
+            self.conn.sendall(data)
+        finally:
+            self.finish()
+
+    def finish(self) -> None:
+        with self._lock:
+            self.answered = True
+            done, self._done = self._done, None
+        if done is not None:
+            done()
+
+
+class _CapturedReply:
+    """Connection stand-in that keeps the reply of one batched command."""
+
+    __slots__ = ("data",)
+
+    def __init__(self):
+        self.data: bytes | None = None
+
+    def sendall(self, data: bytes) -> None:
+        if self.data is None:
+            self.data = data.strip()
+
+
+def _claim_unix_path(path: Path) -> bool:
+    """
+    Whether a Unix socket can be bound at 'path': the platform supports them
+    and no live server owns the file. A stale file left by a crash is removed.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    if not path.exists():
+        return True
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink(missing_ok=True)
+        return True
+    finally:
+        probe.close()
+    log(f"{path} is in use by another Conduit; serving TCP only", "warning")
+    return False
+
+
+def _page(items, limit: int, cursor_of) -> dict:
+    """
+    Reply with the first 'limit' of 'items' and the cursor to pass back for
+    the rest; the cursor is None on the last page.
+    """
+    page = list(islice(items, limit + 1))
+    cursor = cursor_of(page[limit - 1]) if len(page) > limit else None
+    return {"status": "ok", "reply": page[:limit], "cursor": cursor}
 
 
 class ConduitServer:
+    # longest request line accepted in asyncio mode
+    MAX_MESSAGE = 16 * 1024 * 1024
+    # Unix socket file in the config dir, one per running instance so several
+    # can share a machine; see Settings_entry.LOCAL_SOCKET and `local_sockets`
+    SOCKET_NAME = "conduit-{pid}.sock"
+
+    # answered right where they are read, never queued behind other handlers
+    FAST_COMMANDS = frozenset({"ping", "status"})
+    # most commands one "batch" message may carry
+    MAX_BATCH = 1000
+    # threads running all other handlers
+    HANDLER_WORKERS = 8
+    # handlers of one command running at once; "log" keeps its lines in order
+    COMMAND_LIMITS = {"log": 1, "blender_exec": 1, "catalog": 2}
+    DEFAULT_LIMIT = 4
+    # seconds a command may wait for its turn and run before the client gets
+    # an error; the handler itself cannot be interrupted and finishes anyway
+    COMMAND_TIMEOUTS: dict[str, float] = {}
+    DEFAULT_TIMEOUT = 10.0
+    # items per reply of the list_* commands, unless the client asks for fewer
+    PAGE_SIZE = 200
+    MAX_PAGE = 1000
+
     def __init__(self):
         self._running = False
         self._sock = None
         self._thread = None
         self._host = "127.0.0.1"
         self._port = 8000
+        self._executor: ThreadPoolExecutor | None = None
+        # per command: handlers running, and requests waiting for a slot
+        self._limits_lock = threading.Lock()
+        self._active: dict[str, int] = {}
+        self._waiting: dict[str, deque[_Request]] = {}
+        # (deadline, seq, request) of every request handed to `_schedule`
+        self._deadlines: list[tuple[float, int, _Request]] = []
+        self._deadline_seq = itertools.count()
+        self._deadline_changed = threading.Condition(self._limits_lock)
+        self._watchdog: Thread | None = None
+        # asyncio mode
+        self.unix_path: Path | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
 
         self.commands = {
             "ping": self.handle_ping,
             "status": self.handle_status,
             "log": self.handle_log,
             "blender_exec": self.handle_blender_exec,
+            "catalog": self.handle_catalog,
+            "search": self.handle_search,
+            "comments": self.handle_comments,
+            "batch": self.handle_batch,
+            "list_assets": self.handle_list_assets,
+            "get_asset": self.handle_get_asset,
+            "list_tasks": self.handle_list_tasks,
+            "list_versions": self.handle_list_versions,
         }
 
     def handle_ping(self, conn, args):
@@ -51,6 +252,268 @@ class ConduitServer:
         settings.set(Settings_entry.BLENDER_EXEC.value, path)
         settings.save()
 
+    def handle_search(self, conn, args):
+        """{"cmd": "search", "query": "chair", "limit": 20, "kinds": ["asset"]}"""
+        try:
+            results = get_conduit().search(
+                str(args.get("query", "")),
+                int(args.get("limit", 20)),
+                args.get("kinds"),
+            )
+            reply = [
+                {"kind": r.kind, "name": r.name, "path": str(r.path), "score": round(r.score, 3)}
+                for r in results
+            ]
+            resp = {"status": "ok", "reply": reply}
+        except Exception as e:
+            resp = {"status": "error", "msg": str(e)}
+        conn.sendall(json.dumps(resp).encode("utf-8"))
+
+    def handle_comments(self, conn, args):
+        """{"cmd": "comments", "text": "'UV fix'", "user": "anna", "path": "...", "limit": 100}"""
+        try:
+            path = args.get("path")
+            hits = get_conduit().search_versions(
+                str(args.get("text", "")),
+                args.get("user"),
+                Path(path) if path else None,
+                int(args.get("limit", 100)),
+            )
+            reply = [dict(hit._asdict(), task=str(hit.task)) for hit in hits]
+            resp = {"status": "ok", "reply": reply}
+        except Exception as e:
+            resp = {"status": "error", "msg": str(e)}
+        conn.sendall(json.dumps(resp).encode("utf-8"))
+
+    def handle_batch(self, conn, args):
+        """
+        {"cmd": "batch", "commands": [{"cmd": "log", "message": "hi"}, ...]}
+
+        Runs the commands one after the other and replies with the list of
+        their replies, in order, in one message. Each command waits for its
+        own slot and has its own timeout, like a request of its own; nothing
+        holds a worker while it waits.
+        """
+        commands = args.get("commands")
+        if not isinstance(commands, list):
+            conn.sendall(b'{"status":"error","msg":"batch needs a list of commands"}')
+            return
+        if len(commands) > self.MAX_BATCH:
+            conn.sendall(json.dumps(
+                {"status": "error", "msg": f"batch is limited to {self.MAX_BATCH} commands"}
+            ).encode("utf-8"))
+            return
+
+        replies: list[bytes] = []
+
+        def _next() -> None:
+            while len(replies) < len(commands):
+                payload = commands[len(replies)]
+                if not isinstance(payload, dict) or payload.get("cmd") == "batch":
+                    replies.append(b'{"status":"error","msg":"invalid batch entry"}')
+                    continue
+                reply = _CapturedReply()
+                cmd = payload.get("cmd")
+                if cmd in self.FAST_COMMANDS or cmd not in self.commands:
+                    self._dispatch(reply, payload)
+                    replies.append(reply.data)
+                    continue
+                # continues on the thread that answers this one
+                self._schedule(reply, payload, lambda: _answered(reply))
+                return
+            # the replies are JSON already; join them instead of decoding them
+            conn.sendall(b'{"status":"ok","reply":[' + b",".join(replies) + b"]}")
+
+        def _answered(reply: _CapturedReply) -> None:
+            replies.append(reply.data or b'{"status":"error","msg":"no reply"}')
+            _next()
+
+        _next()
+
+    CATALOG_QUERIES = ("assets", "tasks", "latest", "versions")
+
+    def handle_catalog(self, conn, args):
+        """Named queries against the project catalog, e.g. {"query": "versions", "user": "bob"}."""
+        catalog = get_conduit().catalog
+        query = args.get("query")
+        if catalog is None:
+            resp = {"status": "error", "msg": "project catalog is disabled"}
+        elif query not in self.CATALOG_QUERIES:
+            resp = {"status": "error", "msg": f"unknown catalog query: {query}"}
+        else:
+            try:
+                if query == "assets":
+                    reply = catalog.assets(args.get("name"), args.get("limit"))
+                elif query == "tasks":
+                    reply = catalog.tasks(args.get("asset"), args.get("name"))
+                elif query == "latest":
+                    reply = catalog.latest_version(args.get("task", ""))
+                else:
+                    reply = catalog.versions(
+                        args.get("user"),
+                        args.get("asset"),
+                        args.get("task"),
+                        args.get("since"),
+                        args.get("limit", 100),
+                    )
+                resp = {"status": "ok", "reply": reply}
+            except Exception as e:
+                resp = {"status": "error", "msg": str(e)}
+        conn.sendall(json.dumps(resp).encode("utf-8"))
+
+    # ------------------------
+    # Project queries
+    # ------------------------
+    #
+    # Read the in-memory project, never the share. Folders a lazily loaded
+    # project did not expand yet are answered from the search index, which
+    # lists the whole project in the background. The list_* commands page
+    # with cursors: a reply carries up to "limit" items and a "cursor"; send
+    # the command again with that cursor for the next page until it is null.
+
+    def _page_size(self, args) -> int:
+        return max(1, min(int(args.get("limit") or self.PAGE_SIZE), self.MAX_PAGE))
+
+    @staticmethod
+    def _find(args, key: str, kind: str) -> Path:
+        """
+        Path of the "folder", "asset" or "task" named by args[key], loaded or
+        not. Any directory below the root that is no asset or task is taken
+        for a folder.
+        """
+        conduit = get_conduit()
+        project = conduit.project
+        if project is None:
+            raise LookupError("no project loaded")
+        path = args.get(key)
+        if not path:
+            raise LookupError(f"no {kind} at {path}")
+        path = Path(path)
+        node = project.find(path)
+        if isinstance(node, Folder):
+            found = "folder"
+        elif isinstance(node, Asset):
+            found = "asset"
+        elif isinstance(node, Task):
+            found = "task"
+        else:
+            found = conduit.search_index.kind(path)
+            if found is None and path.is_relative_to(project.root.path):
+                found = "folder"
+        if found != kind:
+            raise LookupError(f"no {kind} at {path}")
+        return path
+
+    @staticmethod
+    def _task_names(asset: Path) -> list[str]:
+        conduit = get_conduit()
+        node = conduit.project.find(asset)
+        if isinstance(node, Asset):
+            return [task.name for task in node.tasks]
+        return [task.name for task in conduit.search_index.entries("task", under=asset)]
+
+    def _serialize_asset(self, asset: Path) -> dict:
+        return {
+            "name": asset.name,
+            "path": str(asset),
+            "folder": str(asset.parent),
+            "tasks": self._task_names(asset),
+        }
+
+    def _reply_query(self, conn, query) -> None:
+        try:
+            resp = query()
+        except Exception as e:
+            resp = {"status": "error", "msg": str(e)}
+        conn.sendall(json.dumps(resp).encode("utf-8"))
+
+    def handle_list_assets(self, conn, args):
+        """{"cmd": "list_assets", "folder": "...", "cursor": null, "limit": 200}"""
+
+        def _query():
+            conduit = get_conduit()
+            if conduit.project is None:
+                raise LookupError("no project loaded")
+            folder = self._find(args, "folder", "folder") if args.get("folder") else None
+            cursor = args.get("cursor")
+            limit = self._page_size(args)
+            assets = conduit.search_index.entries(
+                "asset", folder, Path(cursor) if cursor else None, limit + 1
+            )
+            resp = _page(
+                (self._serialize_asset(asset) for asset in assets), limit, lambda a: a["path"]
+            )
+            # assets may still turn up while the project is being listed
+            resp["loading"] = conduit.project.loading or not conduit.search_ready
+            return resp
+
+        self._reply_query(conn, _query)
+
+    def handle_get_asset(self, conn, args):
+        """{"cmd": "get_asset", "path": "..."}"""
+
+        def _query():
+            asset = self._find(args, "path", "asset")
+            reply = self._serialize_asset(asset)
+            reply["tasks"] = [
+                {"name": name, "path": str(asset / name)} for name in reply["tasks"]
+            ]
+            return {"status": "ok", "reply": reply}
+
+        self._reply_query(conn, _query)
+
+    def handle_list_tasks(self, conn, args):
+        """{"cmd": "list_tasks", "asset": "...", "cursor": null, "limit": 200}"""
+
+        def _query():
+            asset = self._find(args, "asset", "asset")
+            cursor = args.get("cursor") or ""
+            names = sorted(name for name in self._task_names(asset) if name > cursor)
+            return _page(
+                ({"name": name, "path": str(asset / name)} for name in names),
+                self._page_size(args),
+                lambda t: t["name"],
+            )
+
+        self._reply_query(conn, _query)
+
+    def handle_list_versions(self, conn, args):
+        """{"cmd": "list_versions", "task": "...", "cursor": null, "limit": 200}"""
+
+        def _query():
+            task = self._find(args, "task", "task")
+            cursor = args.get("cursor") or ""
+            try:
+                with os.scandir(task) as it:
+                    entries = {entry.name: entry for entry in it}
+            except FileNotFoundError:
+                entries = {}
+            # the files decide what is listed, the store only adds to them
+            records = TaskMetadata.load_task_metadata(task, list(entries), import_legacy=False)
+            files = sorted(
+                name for name, entry in entries.items()
+                if name > cursor and is_version_file(name) and entry.is_file()
+            )
+
+            def _record(file):
+                if file in records:
+                    return records[file]
+                # copied in by hand, nothing recorded about it
+                try:
+                    stat = entries[file].stat()
+                except OSError:
+                    stat = None
+                return {
+                    "file": file,
+                    "version": parse_version(file),
+                    "time": int(stat.st_mtime) if stat else None,
+                    "size": stat.st_size if stat else None,
+                }
+
+            return _page(map(_record, files), self._page_size(args), lambda r: r["file"])
+
+        self._reply_query(conn, _query)
+
     def _serve_loop(self):
         while self._running:
             connection = None
@@ -58,34 +521,29 @@ class ConduitServer:
                 if not self._sock:
                     return
                 connection, _ = self._sock.accept()
-                buffer = ""
                 connection.settimeout(1.0)  # avoid hanging forever
 
-                while True:
-                    chunk = connection.recv(1024).decode("utf-8")
-                    if not chunk:
-                        break  # client closed connection
-                    buffer += chunk
-                    if "\n" in buffer:
-                        line, buffer = buffer.split("\n", 1)
-                        line = line.rstrip("\r\n")  # safe for both CR and LF
-                        try:
-                            payload = json.loads(line)
-                            cmd = payload.get("cmd")
-                        except json.JSONDecodeError:
-                            connection.sendall(
-                                b'{"status":"error","msg":"invalid json"}\n'
-                            )
-                            break
-
-                        handler = self.commands.get(cmd)
-                        if handler:
-                            handler(connection, payload)
-                        else:
-                            connection.sendall(
-                                b'{"status":"error","msg":"unknown command"}\n'
-                            )
-                        break  # process one message per connection
+                # bytes until the whole line is in, so split characters survive
+                line = Framing.MessageReader(connection).read()
+                if line is None:
+                    continue  # client closed connection
+                try:
+                    payload = json.loads(line)
+                    cmd = payload.get("cmd")
+                except (ValueError, AttributeError):
+                    connection.sendall(b'{"status":"error","msg":"invalid json"}\n')
+                    continue
+
+                # process one message per connection
+                handler = self.commands.get(cmd)
+                if handler and cmd in self.FAST_COMMANDS:
+                    handler(connection, payload)
+                elif handler:
+                    # closed once answered, by a worker or the watchdog
+                    self._schedule(connection, payload, connection.close)
+                    connection = None
+                else:
+                    connection.sendall(b'{"status":"error","msg":"unknown command"}\n')
 
             except socket.timeout:
                 continue
@@ -95,7 +553,334 @@ class ConduitServer:
                 if connection:
                     connection.close()
 
-    def start(self, host="127.0.0.1", port=8000, background=True):
+    # --------------------------
+    # Handler dispatch
+    # --------------------------
+
+    def _limit(self, cmd: str) -> int:
+        return self.COMMAND_LIMITS.get(cmd, self.DEFAULT_LIMIT)
+
+    def _timeout(self, cmd: str) -> float:
+        return self.COMMAND_TIMEOUTS.get(cmd, self.DEFAULT_TIMEOUT)
+
+    def _dispatch(self, conn, payload: dict) -> None:
+        """Run the handler of 'payload' on the calling thread."""
+        cmd = payload.get("cmd")
+        handler = self.commands.get(cmd)
+        if not handler:
+            conn.sendall(b'{"status":"error","msg":"unknown command"}')
+            return
+        try:
+            handler(conn, payload)
+        except Exception as e:
+            log(f"ERROR in command {cmd}: {e}", "error")
+            conn.sendall(json.dumps({"status": "error", "msg": str(e)}).encode("utf-8"))
+
+    def _schedule(self, conn, payload: dict, done: Callable[[], None] | None = None) -> None:
+        """
+        Run the handler of 'payload' on the pool once its command has one of
+        its `COMMAND_LIMITS` slots; until then the request waits in a queue,
+        not on a worker. If it is not answered within its timeout, counted
+        from now, 'conn' gets "<cmd> timed out". 'done' is called once it is
+        answered (see `_Request`). Batches only pass their commands on.
+        """
+        request = _Request(conn, payload, done)
+        if request.cmd == "batch":
+            # answers once its last command is answered
+            self._dispatch(request, payload)
+            return
+        deadline = time.monotonic() + self._timeout(request.cmd)
+        with self._limits_lock:
+            start = self._active.get(request.cmd, 0) < self._limit(request.cmd)
+            if start:
+                self._active[request.cmd] = self._active.get(request.cmd, 0) + 1
+            else:
+                self._waiting.setdefault(request.cmd, deque()).append(request)
+            heapq.heappush(self._deadlines, (deadline, next(self._deadline_seq), request))
+            self._deadline_changed.notify()
+        if start:
+            self._submit(request)
+
+    def _submit(self, request: _Request) -> None:
+        try:
+            self._executor.submit(self._work, request)
+        except (AttributeError, RuntimeError):
+            pass  # shutting down
+
+    def _work(self, request: _Request) -> None:
+        """Worker side: run the handler, then pass the slot on."""
+        try:
+            if not request.answered:
+                self._dispatch(request, request.payload)
+        finally:
+            request.finish()
+            with self._limits_lock:
+                waiting = self._waiting.get(request.cmd)
+                following = None
+                # requests that timed out while waiting are skipped
+                while waiting and following is None:
+                    following = waiting.popleft()
+                    if following.answered:
+                        following = None
+                if following is None:
+                    self._active[request.cmd] -= 1
+            if following is not None:
+                self._submit(following)
+
+    def _watch_deadlines(self) -> None:
+        """Watchdog thread: answer the requests that ran out of time."""
+        while True:
+            expired = []
+            with self._limits_lock:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    request = heapq.heappop(self._deadlines)[2]
+                    if not request.answered:
+                        expired.append(request)
+                if not expired:
+                    wait = self._deadlines[0][0] - now if self._deadlines else None
+                    self._deadline_changed.wait(wait)
+                    continue
+            for request in expired:
+                log(f"command {request.cmd} timed out", "warning")
+                try:
+                    request.sendall(json.dumps(
+                        {"status": "error", "msg": f"{request.cmd} timed out"}
+                    ).encode("utf-8"))
+                except Exception as e:
+                    log(f"ERROR answering {request.cmd}: {e}", "error")
+
+    async def _run_command(self, conn: _StreamConnection, payload: dict) -> None:
+        """`_schedule` a handler and wait until it is answered."""
+        loop = asyncio.get_running_loop()
+        answered = loop.create_future()
+
+        def _done():
+            try:
+                loop.call_soon_threadsafe(
+                    lambda: answered.done() or answered.set_result(None)
+                )
+            except RuntimeError:
+                pass  # the loop is closed already
+
+        self._schedule(conn, payload, _done)
+        await answered
+
+    # --------------------------
+    # asyncio mode
+    # --------------------------
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve commands on one connection until the client closes it.
+        Requests with an "id" run concurrently and may be answered out of
+        order; requests without one are answered in order. The connection
+        reads lines until a "hello" switches it to length-prefixed frames.
+
+        Only clients that start with a "hello" or an "id" keep the connection:
+        anyone else gets one bare reply and the connection is closed, like the
+        threaded server does, so clients that read until EOF keep working.
+        """
+        self._writers.add(writer)
+        running: set[asyncio.Task] = set()
+        framing = Framing.NEWLINE
+        persistent = False
+        try:
+            while True:
+                try:
+                    message = await self._read_message(reader, framing)
+                except ValueError:
+                    writer.write(Framing.encode(b'{"status":"error","msg":"message too long"}', framing))
+                    break
+                if message is None:
+                    break  # client closed connection
+                message = message.strip()
+                if not message:
+                    continue
+                try:
+                    payload = json.loads(message)
+                except ValueError:
+                    payload = None
+                if not isinstance(payload, dict):
+                    if not persistent:
+                        writer.write(b'{"status":"error","msg":"invalid json"}')
+                        break
+                    writer.write(Framing.encode(b'{"status":"error","msg":"invalid json"}', framing))
+                    continue
+
+                cmd = payload.get("cmd")
+                persistent = persistent or cmd == "hello" or payload.get("id") is not None
+                conn = _StreamConnection(writer, payload.get("id"), framing, bare=not persistent)
+                if cmd == "hello":
+                    # answered in the old framing, everything after in the new one
+                    if payload.get("framing") in (Framing.NEWLINE, Framing.LENGTH):
+                        framing = payload["framing"]
+                    conn.sendall(json.dumps({"status": "ok", "framing": framing}).encode("utf-8"))
+                    continue
+                if cmd in self.FAST_COMMANDS or cmd not in self.commands:
+                    self._dispatch(conn, payload)
+                elif payload.get("id") is None:
+                    await self._run_command(conn, payload)
+                else:
+                    task = asyncio.ensure_future(self._run_command(conn, payload))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                await writer.drain()
+                if not persistent:
+                    break
+            if running:
+                # replies to the last requests of a client that stopped sending
+                await asyncio.wait(running)
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_message(self, reader: asyncio.StreamReader, framing: str) -> bytes | None:
+        """The next message in 'framing'; None at the end of the stream."""
+        try:
+            if framing == Framing.LENGTH:
+                (size,) = Framing.HEADER.unpack(await reader.readexactly(Framing.HEADER.size))
+                if size > self.MAX_MESSAGE:
+                    raise ValueError("message too long")
+                return await reader.readexactly(size)
+        except asyncio.IncompleteReadError:
+            return None
+        # a ValueError here means the line was longer than MAX_MESSAGE
+        return await reader.readline() or None
+
+    def _run_asyncio(self, ready: Event, errors: list) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        servers = []
+        try:
+            server = loop.run_until_complete(
+                asyncio.start_server(
+                    self._handle_stream, self._host, self._port, limit=self.MAX_MESSAGE
+                )
+            )
+            self._port = server.sockets[0].getsockname()[1]
+            servers.append(server)
+        except OSError as e:
+            tcp_error = e
+        if self.unix_path:
+            try:
+                servers.append(loop.run_until_complete(
+                    asyncio.start_unix_server(
+                        self._handle_stream, str(self.unix_path), limit=self.MAX_MESSAGE
+                    )
+                ))
+                log(f"Serving local clients on {self.unix_path}", "noise")
+            except OSError as e:
+                log(f"Could not listen on {self.unix_path}: {e}", "warning")
+                self.unix_path = None
+        if len(servers) < 1 + bool(self.unix_path):
+            if not servers:
+                errors.append(tcp_error)
+                ready.set()
+                loop.close()
+                return
+            # another instance has the port; local clients still get through
+            log(f"Port {self._port} is taken ({tcp_error}); serving {self.unix_path} only", "warning")
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            for server in servers:
+                server.close()
+            # closing the connections ends their handlers at the next read
+            for writer in list(self._writers):
+                writer.close()
+            tasks = asyncio.all_tasks(loop)
+            if tasks:
+                loop.run_until_complete(asyncio.wait(tasks, timeout=1.0))
+            loop.close()
+            self._loop = None
+
+    def _start_asyncio(self, background: bool) -> None:
+        ready, errors = Event(), []
+        log(f"Starting asyncio server on {self._host}:{self._port}", "warning")
+        if not background:
+            self._run_asyncio(ready, errors)
+        else:
+            self._thread = Thread(
+                target=self._run_asyncio, args=(ready, errors), name="conduit-server", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+        if errors:
+            self._abort_start()
+            raise errors[0]
+
+    def _abort_start(self) -> None:
+        """Undo `start` when nothing could be listened on."""
+        with self._limits_lock:
+            self._running = False
+            self._deadline_changed.notify()
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @classmethod
+    def socket_path(cls, directory: Path | str, pid: int | None = None) -> Path:
+        """Unix socket in 'directory' of the instance running as 'pid' (default: this one)."""
+        return Path(directory) / cls.SOCKET_NAME.format(pid=pid or os.getpid())
+
+    @classmethod
+    def local_sockets(cls, directory: Path | str) -> list[Path]:
+        """
+        Unix sockets of the instances running on this machine, newest first,
+        for clients to pick from. Files left by instances that are gone are
+        removed.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            return []
+        prefix, _, suffix = cls.SOCKET_NAME.partition("{pid}")
+        live = []
+        for path in Path(directory).glob(f"{prefix}*{suffix}"):
+            pid = path.name[len(prefix):len(path.name) - len(suffix)]
+            if not pid.isdigit():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                path.unlink(missing_ok=True)
+                continue
+            except OSError:
+                # e.g. EPERM: the process exists but belongs to another user
+                pass
+            try:
+                live.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        return [path for _, path in sorted(live, reverse=True)]
+
+    def start(
+        self,
+        host="127.0.0.1",
+        port=8000,
+        background=True,
+        use_asyncio=False,
+        unix_path: Path | str | None = None,
+    ):
+        """
+        Listen on host:port. The default mode serves one message per
+        connection on a single thread; with 'use_asyncio' connections of
+        clients that send a "hello" or request ids stay open for any number of
+        commands and many clients are served at once (others still get one
+        reply per connection). Both use the same `commands` table; apart from
+        `FAST_COMMANDS` the handlers run on a pool of `HANDLER_WORKERS`
+        threads, within `COMMAND_LIMITS` and `COMMAND_TIMEOUTS`.
+
+        In asyncio mode 'unix_path' adds a Unix socket for local clients next
+        to TCP, where the platform has them; TCP stays the fallback.
+        """
         if self._running:
             log(f"Server already running on {self._host}:{self._port}", "info")
             return
@@ -103,10 +888,31 @@ class ConduitServer:
         self._host = host
         self._port = port
         self._running = True
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.HANDLER_WORKERS, thread_name_prefix="conduit-handler"
+        )
+        self._watchdog = Thread(
+            target=self._watch_deadlines, name="conduit-deadlines", daemon=True
+        )
+        self._watchdog.start()
+        if use_asyncio:
+            if unix_path and _claim_unix_path(Path(unix_path)):
+                self.unix_path = Path(unix_path)
+            self._start_asyncio(background)
+            return
+        if unix_path:
+            log("The local socket needs the asyncio server; serving TCP only", "noise")
 
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._sock.bind((self._host, self._port))
+        try:
+            self._sock.bind((self._host, self._port))
+        except OSError:
+            self._sock.close()
+            self._sock = None
+            self._abort_start()
+            raise
+        self._port = self._sock.getsockname()[1]
         self._sock.listen(5)
         self._sock.settimeout(1.0)
 
@@ -121,13 +927,29 @@ class ConduitServer:
     def stop(self):
         if not self._running:
             return
-        self._running = False
+        with self._limits_lock:
+            self._running = False
+            self._deadline_changed.notify()
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if self._thread:
+                self._thread.join(5)
+        if self.unix_path:
+            try:
+                os.unlink(self.unix_path)
+            except OSError:
+                pass
+            self.unix_path = None
         try:
             if self._sock:
                 self._sock.close()
         except Exception:
             pass
         self._sock = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         log("Server shutdown requested", "info")
 
 
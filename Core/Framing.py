@@ -0,0 +1,94 @@
+import json
+import socket
+import struct
+
+# Wire framing shared by ConduitServer and BlenderClient.
+#
+# Connections start out as newline-delimited JSON. A client that wants
+# length-prefixed frames sends {"cmd": "hello", "framing": "length"} as its
+# first line; if the reply (still a line) says "framing": "length", every
+# message after it in both directions is a 4-byte big-endian length followed
+# by that many bytes of JSON. Peers that do not know "hello" answer with an
+# error and the connection simply stays in newline mode.
+
+NEWLINE = "newline"
+LENGTH = "length"
+
+HEADER = struct.Struct(">I")
+
+
+def hello(framing: str = LENGTH) -> bytes:
+    return (json.dumps({"cmd": "hello", "framing": framing}) + "\n").encode("utf-8")
+
+
+def encode(message: bytes, framing: str) -> bytes:
+    """'message' (one JSON document) ready to be written in 'framing'."""
+    if framing == LENGTH:
+        return HEADER.pack(len(message)) + message
+    return message + b"\n"
+
+
+class MessageReader:
+    """
+    Reads whole messages off a blocking socket in either framing.
+
+    Incoming data is collected in one growing bytearray and newlines are only
+    searched for in the part not scanned yet, so a large message costs linear
+    time; length-prefixed messages are received straight into a buffer of
+    their final size. Messages are bytes-like and go to `json.loads` as is.
+    """
+
+    def __init__(self, sock: socket.socket, framing: str = NEWLINE, chunk_size: int = 65536):
+        self.sock = sock
+        self.framing = framing
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._scanned = 0
+
+    def _fill(self) -> bool:
+        chunk = self.sock.recv(self.chunk_size)
+        if not chunk:
+            return False
+        self._buffer += chunk
+        return True
+
+    def read(self) -> bytearray | None:
+        """
+        The next message, or None once the peer closed the connection. A last
+        line without a newline still counts: peers that close the connection
+        after their only reply do not have to end it.
+        """
+        if self.framing == LENGTH:
+            return self._read_frame()
+        while True:
+            end = self._buffer.find(b"\n", self._scanned)
+            if end >= 0:
+                message = self._buffer[:end]
+                del self._buffer[: end + 1]
+                self._scanned = 0
+                return message
+            self._scanned = len(self._buffer)
+            if not self._fill():
+                if not self._buffer.strip():
+                    return None
+                message, self._buffer = self._buffer, bytearray()
+                self._scanned = 0
+                return message
+
+    def _read_frame(self) -> bytearray | None:
+        while len(self._buffer) < HEADER.size:
+            if not self._fill():
+                return None
+        (size,) = HEADER.unpack_from(self._buffer)
+        message = bytearray(size)
+        # whatever was read past the header already, then the rest in place
+        have = min(size, len(self._buffer) - HEADER.size)
+        message[:have] = self._buffer[HEADER.size : HEADER.size + have]
+        del self._buffer[: HEADER.size + have]
+        view = memoryview(message)
+        while have < size:
+            received = self.sock.recv_into(view[have:])
+            if not received:
+                return None
+            have += received
+        return message
@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from Core.ProjectModel import ProjectModel, Folder, Asset, Task, ProjectChange
+from Core.QLogger import log
+from Core import TaskMetadata
+from Core.VersionIndex import is_version_file, parse_version
+
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    path   TEXT PRIMARY KEY,
+    kind   TEXT NOT NULL,       -- folder | asset | task
+    name   TEXT NOT NULL,
+    parent TEXT,
+    asset  TEXT,                -- asset name, for assets and tasks
+    mtime  INTEGER              -- for tasks: directory mtime of the last version sync
+);
+CREATE INDEX IF NOT EXISTS nodes_kind_name ON nodes (kind, name);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent);
+CREATE INDEX IF NOT EXISTS nodes_asset ON nodes (asset, kind, name);
+
+CREATE TABLE IF NOT EXISTS versions (
+    path    TEXT PRIMARY KEY,
+    task    TEXT NOT NULL,      -- task directory
+    asset   TEXT,
+    name    TEXT,               -- task name
+    file    TEXT NOT NULL,
+    version INTEGER,
+    user    TEXT,
+    comment TEXT,
+    time    INTEGER,
+    size    INTEGER,
+    mtime   INTEGER
+);
+CREATE INDEX IF NOT EXISTS versions_task ON versions (task, version);
+CREATE INDEX IF NOT EXISTS versions_asset ON versions (asset);
+CREATE INDEX IF NOT EXISTS versions_name ON versions (name);
+CREATE INDEX IF NOT EXISTS versions_user ON versions (user, time);
+CREATE INDEX IF NOT EXISTS versions_mtime ON versions (mtime);
+"""
+
+NodeRow = tuple[str, str, str, str | None, str | None, int | None]
+
+
+def _subtree_range(path: str) -> tuple[str, str]:
+    """Bounds of every path strictly below 'path', usable with the primary key."""
+    prefix = path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class ProjectCatalog:
+    """
+    SQLite catalog of the folders, assets, tasks and versions of a project.
+
+    `sync` brings the whole catalog in line with the filesystem from a
+    background thread; the other writers patch it as the app edits the project.
+    Task versions are only listed again when the task directory mtime changed.
+    The connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._db.executescript(
+                    "DROP TABLE IF EXISTS nodes; DROP TABLE IF EXISTS versions;"
+                )
+            self._db.executescript(SCHEMA)
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ------------------------
+    # Writing
+    # ------------------------
+
+    @staticmethod
+    def node_rows(node: Folder | Asset | Task) -> list[NodeRow]:
+        """Rows for 'node' and everything loaded below it."""
+        if isinstance(node, Task):
+            asset = node.asset
+            return [(str(node.path), "task", node.name, str(asset.path), asset.name, None)]
+        if isinstance(node, Asset):
+            rows = [(str(node.path), "asset", node.name, str(node.folder.path), node.name, None)]
+            for task in node.tasks:
+                rows += ProjectCatalog.node_rows(task)
+            return rows
+        parent = str(node.parent.path) if node.parent else None
+        rows = [(str(node.path), "folder", node.name, parent, None, None)]
+        for asset in node.assets:
+            rows += ProjectCatalog.node_rows(asset)
+        for folder in node.subfolders:
+            rows += ProjectCatalog.node_rows(folder)
+        return rows
+
+    def add_nodes(self, rows: list[NodeRow]) -> None:
+        # keeps the stored task mtime so versions are not listed again for nothing
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO nodes (path, kind, name, parent, asset, mtime) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+                "kind=excluded.kind, name=excluded.name, parent=excluded.parent, "
+                "asset=excluded.asset",
+                rows,
+            )
+
+    def remove(self, path: Path | str) -> None:
+        """Remove 'path' and everything below it."""
+        path = str(path)
+        low, high = _subtree_range(path)
+        with self._lock, self._db:
+            for table in ("nodes", "versions"):
+                self._db.execute(
+                    f"DELETE FROM {table} WHERE path = ? OR (path >= ? AND path < ?)",
+                    (path, low, high),
+                )
+
+    def apply_changes(self, changes: list[ProjectChange]) -> None:
+        """Patch the catalog with changes from `ProjectModel.apply_updates`."""
+        for kind, _, node in changes:
+            if kind == "removed":
+                self.remove(node.path)
+            elif kind == "added":
+                self.add_nodes(self.node_rows(node))
+            elif kind == "tasks":
+                path = str(node.path)
+                tasks = [str(task.path) for task in node.tasks]
+                with self._lock, self._db:
+                    stale = [
+                        row[0] for row in self._db.execute(
+                            "SELECT path FROM nodes WHERE parent = ? AND kind = 'task'",
+                            (path,),
+                        )
+                        if row[0] not in tasks
+                    ]
+                for task in stale:
+                    self.remove(task)
+                self.add_nodes(self.node_rows(node))
+
+    @staticmethod
+    def read_task(task: Path, asset: str, name: str) -> tuple[int | None, list[tuple]]:
+        """List a task directory; returns its mtime and the version rows."""
+        try:
+            mtime = os.stat(task).st_mtime_ns
+            with os.scandir(task) as it:
+                entries = list(it)
+        except FileNotFoundError:
+            return None, []
+        files = {
+            entry.name: entry
+            for entry in entries
+            if is_version_file(entry.name) and entry.is_file()
+        }
+        # the whole listing, so the legacy sidecars are merged in
+        records = TaskMetadata.load_task_metadata(
+            task, [entry.name for entry in entries], import_legacy=False
+        )
+        rows = []
+        for file, entry in files.items():
+            record = records.get(file, {})
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            rows.append((
+                str(task / file), str(task), asset, name, file, parse_version(file),
+                record.get("user"), record.get("comment"), record.get("time"),
+                stat.st_size, int(stat.st_mtime),
+            ))
+        return mtime, rows
+
+    def _write_tasks(self, tasks: list[tuple[Path, int | None, list[tuple]]]) -> None:
+        """Replace the versions of each (task, mtime, rows) in one transaction."""
+        with self._lock, self._db:
+            for task, mtime, rows in tasks:
+                task = str(task)
+                self._db.execute("DELETE FROM versions WHERE task = ?", (task,))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("UPDATE nodes SET mtime = ? WHERE path = ?", (mtime, task))
+
+    def sync_task(self, task: Path) -> None:
+        """List the versions of the task directory 'task' again, whatever its mtime."""
+        task = Path(task)
+        asset = task.parent
+        mtime, rows = self.read_task(task, asset.name, task.name)
+        self.add_nodes([(str(task), "task", task.name, str(asset), asset.name, None)])
+        self._write_tasks([(task, mtime, rows)])
+
+    def add_version(self, task: Path, record: dict) -> None:
+        """
+        Add the row of one new version of 'task' from its metadata 'record',
+        without listing the task again.
+        """
+        task = Path(task)
+        asset = task.parent
+        file = task / record["file"]
+        try:
+            mtime = int(file.stat().st_mtime)
+        except OSError:
+            mtime = None
+        row = (
+            str(file), str(task), asset.name, task.name, record["file"],
+            parse_version(record["file"]), record.get("user"), record.get("comment"),
+            record.get("time"), record.get("size"), mtime,
+        )
+        self.add_nodes([(str(task), "task", task.name, str(asset), asset.name, None)])
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row
+            )
+
+    def sync(
+        self,
+        root: Path,
+        workers: int = 1,
+        cancel: threading.Event | None = None,
+    ) -> bool:
+        """
+        Walk the whole project and bring the catalog in line with it.
+
+        Returns False if it was cancelled, in which case nothing was removed.
+        """
+        root = Path(root)
+        with self._lock:
+            task_mtimes = dict(
+                self._db.execute("SELECT path, mtime FROM nodes WHERE kind = 'task'")
+            )
+        seen: set[str] = set()
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="conduit-catalog"
+        )
+        try:
+            for batch in ProjectModel.scan_batches(root, workers=workers, cancel=cancel):
+                rows: list[NodeRow] = []
+                tasks: list[tuple[Path, str, str]] = []
+                for path, scan in batch.items():
+                    if path == root:
+                        continue
+                    parent = str(path.parent)
+                    if not scan.is_asset:
+                        rows.append((str(path), "folder", path.name, parent, None, None))
+                        continue
+                    rows.append((str(path), "asset", path.name, parent, path.name, None))
+                    for task in scan.subdirs:
+                        rows.append((str(task), "task", task.name, str(path), path.name, None))
+                        tasks.append((task, path.name, task.name))
+                self.add_nodes(rows)
+                seen.update(row[0] for row in rows)
+
+                def _read(job):
+                    task, asset, name = job
+                    try:
+                        mtime = os.stat(task).st_mtime_ns
+                    except OSError:
+                        return task, None, None
+                    if task_mtimes.get(str(task)) == mtime:
+                        return task, mtime, None  # unchanged since the last sync
+                    return (task, *self.read_task(task, asset, name))
+
+                self._write_tasks([
+                    result for result in pool.map(_read, tasks) if result[2] is not None
+                ])
+                if cancel is not None and cancel.is_set():
+                    return False
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if cancel is not None and cancel.is_set():
+            return False
+
+        with self._lock:
+            stale = [
+                row[0] for row in self._db.execute("SELECT path FROM nodes")
+                if row[0] not in seen
+            ]
+        for path in stale:
+            self.remove(path)
+        return True
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def query(self, sql: str, params: tuple | dict = ()) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def assets(self, name: str | None = None, limit: int | None = None) -> list[dict]:
+        """Assets by name; 'name' may use SQL wildcards (% and _)."""
+        sql = "SELECT path, name, parent FROM nodes WHERE kind = 'asset'"
+        params: list = []
+        if name:
+            sql += " AND name LIKE ?"
+            params.append(name)
+        sql += " ORDER BY name"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.query(sql, tuple(params))
+
+    def tasks(self, asset: str | None = None, name: str | None = None) -> list[dict]:
+        sql = "SELECT path, name, asset FROM nodes WHERE kind = 'task'"
+        params: list = []
+        if asset:
+            sql += " AND asset = ?"
+            params.append(asset)
+        if name:
+            sql += " AND name = ?"
+            params.append(name)
+        return self.query(sql + " ORDER BY asset, name", tuple(params))
+
+    def latest_version(self, task: Path | str) -> dict | None:
+        rows = self.query(
+            "SELECT * FROM versions WHERE task = ? ORDER BY version DESC LIMIT 1",
+            (str(task),),
+        )
+        return rows[0] if rows else None
+
+    def versions(
+        self,
+        user: str | None = None,
+        asset: str | None = None,
+        task: str | None = None,
+        since: int | None = None,
+        limit: int | None = 100,
+    ) -> list[dict]:
+        """Versions, newest first. 'since' is a unix time compared to the file mtime."""
+        sql = "SELECT * FROM versions WHERE 1"
+        params: list = []
+        for column, value in (("user", user), ("asset", asset), ("name", task)):
+            if value:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if since is not None:
+            sql += " AND mtime >= ?"
+            params.append(since)
+        sql += " ORDER BY mtime DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.query(sql, tuple(params))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command line access: python -m Core.ProjectCatalog <catalog> <query> ..."""
+    parser = argparse.ArgumentParser(description="Query a Conduit project catalog.")
+    parser.add_argument("catalog", help="path of the .sqlite catalog")
+    sub = parser.add_subparsers(dest="query", required=True)
+    assets = sub.add_parser("assets")
+    assets.add_argument("--name")
+    assets.add_argument("--limit", type=int)
+    tasks = sub.add_parser("tasks")
+    tasks.add_argument("--asset")
+    tasks.add_argument("--name")
+    latest = sub.add_parser("latest")
+    latest.add_argument("task")
+    versions = sub.add_parser("versions")
+    versions.add_argument("--user")
+    versions.add_argument("--asset")
+    versions.add_argument("--task")
+    versions.add_argument("--since", type=int)
+    versions.add_argument("--limit", type=int, default=100)
+    sync = sub.add_parser("sync")
+    sync.add_argument("root")
+    sync.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    catalog = ProjectCatalog(args.catalog)
+    if args.query == "assets":
+        result = catalog.assets(args.name, args.limit)
+    elif args.query == "tasks":
+        result = catalog.tasks(args.asset, args.name)
+    elif args.query == "latest":
+        result = catalog.latest_version(args.task)
+    elif args.query == "versions":
+        result = catalog.versions(args.user, args.asset, args.task, args.since, args.limit)
+    else:
+        result = catalog.sync(Path(args.root), args.workers)
+    catalog.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
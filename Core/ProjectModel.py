@@ -1,20 +1,73 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Iterator, NamedTuple
 
 
 class Task:
-    def __init__(self, path: Path):
-        self.path = path
-        self.name = self.path.name
+    """
+    A task directory inside an asset.
+
+    Only the name and the owning asset are stored; the full path is built on
+    access. A task created with a path that is not directly inside its asset
+    keeps that path.
+    """
+
+    __slots__ = ("name", "asset", "_path")
+
+    def __init__(self, path: Path, asset: "Asset | None" = None):
+        # task names repeat across every asset, share one string per name
+        self.name = sys.intern(path.name)
+        self.asset = None
+        self._path: Path | None = path
+        if asset is not None:
+            self._attach(asset, asset.path)
+
+    def _attach(self, asset: "Asset", asset_path: Path) -> None:
+        self.asset = asset
+        if self._path is not None and self._path.parent == asset_path:
+            self._path = None
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            return self.asset.path / self.name
+        return self._path
 
     def serialize(self) -> dict:
         return {"name": self.name, "path": str(self.path)}
 
 
 class Folder:
-    def __init__(self, path: Path):
-        self.path = path
+    """
+    A project folder. Like a task, it only keeps its path when it has no
+    parent folder or does not sit directly inside it; otherwise the path is
+    built from the parent on access.
+    """
+
+    __slots__ = ("name", "parent", "subfolders", "assets", "unloaded", "_path")
+
+    def __init__(self, path: Path, parent: "Folder | None" = None):
+        self._path: Path | None = path
+        if parent is not None and path.parent == parent.path:
+            self._path = None
+        self.name = path.name
+        self.parent = parent
         self.subfolders: list[Folder] = []
         self.assets: list[Asset] = []
+        # subdirectories that were listed but not classified yet (lazy scan);
+        # None once the children are attached
+        self.unloaded: list[Path] | None = None
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            return self.parent.path / self.name
+        return self._path
 
     def add_asset(self, asset_name: str):
         asset = Asset(name=asset_name, folder=self)
@@ -27,13 +80,25 @@ class Folder:
 
 
 class Asset:
+    """An asset directory; its path is built from the folder on access."""
+
+    __slots__ = ("name", "folder", "tasks")
+
     def __init__(self, folder: Folder, name: str, tasks: list[Task] | None = None):
         self.tasks = tasks or []
         self.name = name
         self.folder = folder
-        self.path = folder.path / name
+        if self.tasks:
+            path = self.path
+            for task in self.tasks:
+                task._attach(self, path)
+
+    @property
+    def path(self) -> Path:
+        return self.folder.path / self.name
 
     def add_task(self, task: Task) -> None:
+        task._attach(self, self.path)
         self.tasks.append(task)
         task.path.mkdir(exist_ok=True)
 
@@ -46,27 +111,516 @@ class Asset:
         }
 
 
+class DirScan(NamedTuple):
+    """Result of listing a single directory."""
+
+    is_asset: bool
+    subdirs: list[Path]
+    mtime: int
+
+
+# ("added" | "removed", parent folder, node) or ("tasks", parent folder, asset)
+ProjectChange = tuple[str, "Folder", "Folder | Asset"]
+
+SNAPSHOT_VERSION = 1
+
+
 class ProjectModel:
     """Represents the entire project directory as an internal tree model."""
 
-    def __init__(self, root: Path):
+    def __init__(
+        self, root: Path, workers: int = 1, scan: bool = True, lazy: bool = False
+    ):
         self.root = Folder(root)
-        self._build_tree(self.root)
+        self.workers = workers
+        # lazy: folders are only classified when `load_children` asks for them
+        self.lazy = lazy
+        # True while the tree is still being filled by `attach_scans`
+        self.loading = False
+        # directory mtimes (ns) of every scanned folder and asset, used to find
+        # out which parts of a loaded snapshot are out of date
+        self._mtimes: dict[Path, int] = {}
+        # guards _mtimes, which the UI thread changes while `revalidate` and
+        # `directories` read it on worker and watcher threads
+        self._mtimes_lock = threading.Lock()
+        # path -> node for every folder and asset, kept in sync with the tree
+        # so lookups never have to walk it; tasks are found through their asset
+        self._nodes: dict[Path, Folder | Asset] = {root: self.root}
+        if not scan:
+            return
+        if lazy:
+            scan = self._scan_dir(root)
+            self._set_mtime(root, scan.mtime)
+            self.root.unloaded = scan.subdirs
+            self.load_children(self.root)
+        elif workers > 1:
+            self._build_tree_parallel(self.root, workers)
+        else:
+            self._build_tree(self.root)
 
     def _build_tree(self, node: Folder) -> None:
-        for path in node.path.iterdir():
-            if path.is_dir():
-                new_entity = Folder(path=path)
-                if self.isAsset(new_entity):
-                    asset = Asset(folder=node, name=path.name)
-                    node.assets.append(asset)
-                    for subentry in path.iterdir():
-                        if subentry.is_dir():
-                            task = Task(path=subentry)
-                            asset.tasks.append(task)
+        scan = self._scan_dir(node.path)
+        self._set_mtime(node.path, scan.mtime)
+        self._populate(node, scan.subdirs)
+
+    def load_children(self, folder: Folder) -> list[Folder | Asset]:
+        """
+        Attach the children of a lazily scanned folder. Each child is listed
+        once to tell assets from folders; grandchildren stay unloaded.
+        Returns the new children.
+        """
+        if folder.unloaded is None:
+            return []
+        paths, folder.unloaded = folder.unloaded, None
+        self._populate(folder, paths, self._scan_many(paths))
+        return folder.assets + folder.subfolders
+
+    def load_all(self, folder: Folder | None = None) -> None:
+        """Load every lazily skipped folder below 'folder' (default: root)."""
+        stack = [folder or self.root]
+        while stack:
+            node = stack.pop()
+            self.load_children(node)
+            stack.extend(node.subfolders)
+
+    def _scan_many(self, paths: list[Path]) -> dict[Path, DirScan]:
+        """List several sibling directories, in parallel if workers allow it."""
+        scans: dict[Path, DirScan] = {}
+
+        def _scan(path: Path) -> None:
+            try:
+                scans[path] = self._scan_dir(path)
+            except OSError:
+                pass
+
+        if self.workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="conduit-scan"
+            ) as pool:
+                list(pool.map(_scan, paths))
+        else:
+            for path in paths:
+                _scan(path)
+        return scans
+
+    def _build_tree_parallel(self, node: Folder, workers: int) -> None:
+        """
+        Scan the tree below 'node' with a pool of 'workers' threads.
+
+        The listings are only collected here and assembled afterwards in
+        sorted order, so the tree is identical to the one built by `_build_tree`.
+        """
+        scans: dict[Path, DirScan] = {}
+        for batch in self.scan_batches(node.path, workers, batch_size=0):
+            scans.update(batch)
+        if node.path not in scans:
+            # the root could not be listed, let the real error surface
+            scans[node.path] = self._scan_dir(node.path)
+
+        self._set_mtime(node.path, scans[node.path].mtime)
+        self._populate(node, scans[node.path].subdirs, scans)
+
+    @classmethod
+    def scan_batches(
+        cls,
+        root: Path,
+        workers: int = 1,
+        depth: int | None = None,
+        cancel: threading.Event | None = None,
+        batch_size: int = 256,
+        interval: float = 0.1,
+    ) -> Iterator[dict[Path, DirScan]]:
+        """
+        List 'root' and the folders below it with a pool of 'workers' threads
+        and yield the listings in batches, parents before their children.
+
+        Directory listings are submitted as soon as their parent has been read,
+        so slow network shares are kept busy. A batch is yielded every
+        'batch_size' listings or 'interval' seconds (batch_size 0: one batch at
+        the end). 'depth' limits how many levels below 'root' are listed and
+        setting 'cancel' stops the scan.
+        """
+        batch: dict[Path, DirScan] = {}
+        last_yield = time.monotonic()
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="conduit-scan"
+        )
+        pending = {pool.submit(cls._scan_dir, root): (root, 0)}
+        try:
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    return
+                done, _ = wait(pending, timeout=interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, level = pending.pop(future)
+                    try:
+                        scan = batch[path] = future.result()
+                    except OSError:
+                        continue
+                    # tasks of an asset need no listing of their own
+                    if (scan.is_asset and level) or (depth is not None and level >= depth):
+                        continue
+                    for child in scan.subdirs:
+                        pending[pool.submit(cls._scan_dir, child)] = (child, level + 1)
+
+                if not batch or (pending and batch_size == 0):
+                    continue
+                if (
+                    not pending
+                    or len(batch) >= batch_size
+                    or time.monotonic() - last_yield >= interval
+                ):
+                    yield batch
+                    batch = {}
+                    last_yield = time.monotonic()
+        finally:
+            # also reached when the consumer stops iterating early
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def attach_scans(self, scans: dict[Path, DirScan]) -> list[ProjectChange]:
+        """
+        Attach listings streamed by `scan_batches` to a tree that is still
+        loading. A directory is attached once its parent is in the tree; its
+        own children stay unloaded until their listings arrive (or until
+        `load_children` fetches them first).
+        """
+        changes: list[ProjectChange] = []
+        by_parent: dict[Folder, list[Path]] = {}
+
+        for path in sorted(scans, key=lambda p: len(p.parts)):
+            scan = scans[path]
+            if path == self.root.path:
+                if path not in self._mtimes:
+                    self._set_mtime(path, scan.mtime)
+                    self.root.unloaded = list(scan.subdirs) or None
+                continue
+            parent = self._nodes.get(path.parent)
+            if not isinstance(parent, Folder) or path in self._nodes:
+                continue
+            by_parent.setdefault(parent, []).append(path)
+
+            self._set_mtime(path, scan.mtime)
+            if scan.is_asset:
+                node = Asset(
+                    folder=parent, name=path.name, tasks=[Task(p) for p in scan.subdirs]
+                )
+                parent.assets.append(node)
+            else:
+                node = Folder(path=path, parent=parent)
+                node.unloaded = list(scan.subdirs) or None
+                parent.subfolders.append(node)
+            self._register(node, path)
+            changes.append(("added", parent, node))
+
+        for parent, paths in by_parent.items():
+            if parent.unloaded:
+                attached = set(paths)
+                parent.unloaded = [p for p in parent.unloaded if p not in attached] or None
+            self._sort_children(parent)
+        return changes
+
+    def _populate(
+        self,
+        node: Folder,
+        subdirs: list[Path],
+        scans: dict[Path, DirScan] | None = None,
+    ) -> None:
+        """
+        Attach every directory in 'subdirs' to 'node'.
+
+        Each directory is listed exactly once: the listing tells us whether it
+        is an asset and, at the same time, gives us its tasks or subfolders.
+        Listings already made elsewhere (parallel scan, revalidation) are taken
+        from 'scans'. In lazy mode subfolders are left unloaded.
+        """
+        for path in subdirs:
+            scan = scans.get(path) if scans is not None else None
+            if scan is None:
+                try:
+                    scan = self._scan_dir(path)
+                except FileNotFoundError:
+                    # removed since its parent was listed
+                    continue
+            self._set_mtime(path, scan.mtime)
+            if scan.is_asset:
+                asset = Asset(
+                    folder=node, name=path.name, tasks=[Task(p) for p in scan.subdirs]
+                )
+                node.assets.append(asset)
+                self._register(asset, path)
+            else:
+                folder = Folder(path=path, parent=node)
+                node.subfolders.append(folder)
+                self._register(folder, path)
+                if self.lazy:
+                    folder.unloaded = scan.subdirs
                 else:
-                    node.subfolders.append(new_entity)
-                    self._build_tree(new_entity)
+                    self._populate(folder, scan.subdirs, scans)
+
+    @staticmethod
+    def _scan_dir(path: Path) -> DirScan:
+        """
+        List a directory once and classify its entries.
+
+        Returns whether the directory holds a `.sidecar` file (i.e. is an asset),
+        its sorted subdirectories and its mtime. Uses the cached `DirEntry` type
+        info so no extra stat call is made per entry on most filesystems.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        is_asset = False
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif not is_asset and entry.is_file():
+                    is_asset = os.path.splitext(entry.name)[1] == ".sidecar"
+        subdirs.sort()
+        return DirScan(is_asset, [path / name for name in subdirs], mtime)
+
+    # ------------------------
+    # Snapshot
+    # ------------------------
+
+    def save_snapshot(self, path: Path) -> None:
+        """Write the tree and the directory mtimes to 'path' as compact JSON."""
+
+        def _pack(folder: Folder) -> dict:
+            packed = {
+                "m": self._mtimes.get(folder.path),
+                "f": {f.path.name: _pack(f) for f in folder.subfolders},
+                "a": {
+                    a.name: [self._mtimes.get(a.path), [t.name for t in a.tasks]]
+                    for a in folder.assets
+                },
+            }
+            if folder.unloaded is not None:
+                packed["u"] = [p.name for p in folder.unloaded]
+            return packed
+
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "root": str(self.root.path),
+            "tree": _pack(self.root),
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_snapshot(cls, root: Path, path: Path, **kwargs) -> "ProjectModel | None":
+        """
+        Build the tree from a snapshot written by `save_snapshot`, without
+        touching the project directory. Returns None if the snapshot is missing,
+        unreadable or belongs to another project. 'kwargs' go to the constructor.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        if data.get("version") != SNAPSHOT_VERSION or data.get("root") != str(root):
+            return None
+
+        model = cls(root, scan=False, **kwargs)
+
+        def _unpack(folder: Folder, packed: dict) -> None:
+            model._set_mtime(folder.path, packed["m"])
+            if "u" in packed:
+                folder.unloaded = [folder.path / name for name in packed["u"]]
+            for name, (mtime, tasks) in packed["a"].items():
+                path = folder.path / name
+                asset = Asset(
+                    folder=folder, name=name, tasks=[Task(path / t) for t in tasks]
+                )
+                model._set_mtime(path, mtime)
+                folder.assets.append(asset)
+                model._register(asset, path)
+            for name, child in packed["f"].items():
+                subfolder = Folder(folder.path / name, parent=folder)
+                folder.subfolders.append(subfolder)
+                model._register(subfolder)
+                _unpack(subfolder, child)
+
+        try:
+            _unpack(model.root, data["tree"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return model
+
+    def directories(self) -> list[Path]:
+        """All folder and asset directories currently in the tree."""
+        with self._mtimes_lock:
+            return list(self._mtimes)
+
+    @staticmethod
+    def subtree_paths(node: Folder | Asset) -> list[Path]:
+        """Directories of 'node' and of every folder and asset below it."""
+        if isinstance(node, Asset):
+            return [node.path]
+        paths = []
+        stack = [node]
+        while stack:
+            folder = stack.pop()
+            paths.append(folder.path)
+            paths.extend(asset.path for asset in folder.assets)
+            stack.extend(folder.subfolders)
+        return paths
+
+    def revalidate(self, paths: set[Path] | None = None) -> dict[Path, DirScan]:
+        """
+        Re-list every directory whose mtime changed since it was scanned, or
+        only the given 'paths' (e.g. reported by a `ProjectWatcher`).
+
+        Only reads from disk and never touches the tree, so it can run on a
+        worker thread. Directories that appeared below a changed folder are
+        scanned completely. Hand the result to `apply_updates`.
+        """
+        with self._mtimes_lock:
+            known = dict(self._mtimes)
+        if paths is None:
+            candidates = list(known.items())
+        else:
+            candidates = [(p, None) for p in paths if p in known]
+
+        updates: dict[Path, DirScan] = {}
+        for path, mtime in candidates:
+            try:
+                if mtime is not None and os.stat(path).st_mtime_ns == mtime:
+                    continue
+                scan = self._scan_dir(path)
+            except OSError:
+                # vanished directories are dropped when their parent is re-listed
+                continue
+            updates[path] = scan
+            if scan.is_asset and path != self.root.path:
+                continue
+            node = self._nodes.get(path)
+            if isinstance(node, Folder) and node.unloaded is not None:
+                continue
+            for child in scan.subdirs:
+                if child not in known:
+                    self._scan_subtree(child, updates)
+        return updates
+
+    def _scan_subtree(self, path: Path, scans: dict[Path, DirScan]) -> None:
+        try:
+            scan = scans[path] = self._scan_dir(path)
+        except OSError:
+            return
+        if not scan.is_asset and not self.lazy:
+            for child in scan.subdirs:
+                self._scan_subtree(child, scans)
+
+    def apply_updates(self, updates: dict[Path, DirScan]) -> list[ProjectChange]:
+        """
+        Patch the tree with listings returned by `revalidate`.
+
+        Unchanged nodes are kept as they are. Returns the nodes that were added
+        or removed and the assets whose tasks changed, in the order applied.
+        """
+        changes: list[ProjectChange] = []
+
+        # parents first, so that freshly attached subtrees are not visited twice
+        for path in sorted(updates, key=lambda p: len(p.parts)):
+            node = self._nodes.get(path)
+            # subtrees attached earlier in this loop come back unchanged
+            if node is None:
+                continue
+            parent = node.folder if isinstance(node, Asset) else node.parent
+            scan = updates[path]
+
+            if isinstance(node, Folder) and node.unloaded is not None:
+                if parent is None or not scan.is_asset:
+                    node.unloaded = scan.subdirs
+                    self._set_mtime(path, scan.mtime)
+                    continue
+            if parent is None or (isinstance(node, Folder) and not scan.is_asset):
+                changes.extend(self._reconcile_folder(node, scan, updates))
+            elif isinstance(node, Asset) and scan.is_asset:
+                known = {task.name: task for task in node.tasks}
+                tasks = [
+                    known.get(child.name) or Task(path=child) for child in scan.subdirs
+                ]
+                if tasks != node.tasks:
+                    node.tasks = tasks
+                    for task in tasks:
+                        task._attach(node, path)
+                    changes.append(("tasks", parent, node))
+                self._set_mtime(path, scan.mtime)
+            else:
+                # a sidecar was added or removed: the node changes its kind
+                self._detach(parent, node)
+                changes.append(("removed", parent, node))
+                changes.extend(self._attach(parent, [path], updates))
+        return changes
+
+    def _reconcile_folder(
+        self, folder: Folder, scan: DirScan, updates: dict[Path, DirScan]
+    ) -> list[ProjectChange]:
+        changes: list[ProjectChange] = []
+        names = {child.name for child in scan.subdirs}
+        existing = {f.path.name for f in folder.subfolders}
+        existing.update(a.name for a in folder.assets)
+
+        for child in folder.subfolders + folder.assets:
+            if child.path.name not in names:
+                self._detach(folder, child)
+                changes.append(("removed", folder, child))
+        new_paths = [p for p in scan.subdirs if p.name not in existing]
+        changes.extend(self._attach(folder, new_paths, updates))
+        self._set_mtime(folder.path, scan.mtime)
+        return changes
+
+    def _attach(
+        self, folder: Folder, paths: list[Path], updates: dict[Path, DirScan]
+    ) -> list[ProjectChange]:
+        """Populate 'paths' below 'folder' and report the new direct children."""
+        if not paths:
+            return []
+        before = set(map(id, folder.subfolders + folder.assets))
+        self._populate(folder, paths, updates)
+        self._sort_children(folder)
+        return [
+            ("added", folder, child)
+            for child in folder.subfolders + folder.assets
+            if id(child) not in before
+        ]
+
+    def _register(self, node: Folder | Asset, path: Path | None = None) -> None:
+        # reuse the caller's Path object for the key where there is one
+        self._nodes[path or node.path] = node
+
+    def _record_mtime(self, path: Path) -> None:
+        try:
+            self._set_mtime(path, os.stat(path).st_mtime_ns)
+        except OSError:
+            pass
+
+    def _set_mtime(self, path: Path, mtime: int) -> None:
+        with self._mtimes_lock:
+            self._mtimes[path] = mtime
+
+    def _detach(self, parent: Folder, node: Folder | Asset) -> None:
+        """Remove 'node' from 'parent' and forget everything recorded below it."""
+        if isinstance(node, Asset):
+            parent.assets.remove(node)
+        else:
+            parent.subfolders.remove(node)
+        paths = self.subtree_paths(node)
+        with self._mtimes_lock:
+            for path in paths:
+                self._mtimes.pop(path, None)
+        for path in paths:
+            self._nodes.pop(path, None)
+
+    @staticmethod
+    def _sort_children(folder: Folder) -> None:
+        folder.subfolders.sort(key=lambda f: f.path.name)
+        folder.assets.sort(key=lambda a: a.name)
 
     def get_folders(self, parent_path: Path | None = None) -> list[Folder]:
         parent = (
@@ -82,47 +636,73 @@ class ProjectModel:
         Sidecar files are recognized by their `.sidecar` extension.
         Extend this if you later add other sidecar formats.
         """
-        path = folder.path
-        for f in path.iterdir():
-            if f.is_file() and f.suffix == ".sidecar":
-                return True
-        return False
+        return ProjectModel._scan_dir(folder.path).is_asset
 
-    def _find_folder_node(self, path: Path, node: Folder) -> Folder | None:
-        if node.path == path:
+    def find(self, path: Path) -> "Folder | Asset | Task | None":
+        """Return the folder, asset or task at 'path', if it is part of the tree."""
+        path = Path(path)
+        node = self._nodes.get(path)
+        if node is not None:
             return node
-        for child in node.subfolders:
-            found = self._find_folder_node(path, child)
-            if found:
-                return found
+        asset = self._nodes.get(path.parent)
+        if isinstance(asset, Asset):
+            for task in asset.tasks:
+                if task.name == path.name:
+                    return task
         return None
 
+    def _find_folder_node(self, path: Path, node: Folder | None = None) -> Folder | None:
+        found = self._nodes.get(Path(path))
+        return found if isinstance(found, Folder) else None
+
     def _find_entity(
         self, target: Folder | Asset, node: Folder | None = None
     ) -> Folder | None:
-        """
-        Recursively search the tree to find the parent of 'target'.
-        If 'node' is None, start searching from the project root.
-        """
-        node = node or self.root
+        """Return the parent folder of 'target', or None if it is not in the tree."""
+        if self._nodes.get(target.path) is not target:
+            return None
+        return target.folder if isinstance(target, Asset) else target.parent
 
-        if isinstance(target, Asset) and target in node.assets:
-            return node
+    # ------------------------
+    # Edits
+    # ------------------------
 
-        for child in node.subfolders:
-            if child == target:
-                return node
-            # Recursively search in the child
-            result = self._find_entity(target, child)
-            if result:
-                return result
+    def add_folder(self, name: str, parent: Folder | None = None) -> Folder:
+        parent = parent or self.root
+        folder = Folder(parent.path / name, parent=parent)
+        folder.path.mkdir(exist_ok=True)
+        parent.subfolders.append(folder)
+        self._register(folder)
+        self._record_mtime(folder.path)
+        self._record_mtime(parent.path)
+        return folder
 
-        return None
+    def add_asset(self, name: str, folder: Folder) -> Asset:
+        asset = folder.add_asset(name)
+        self._register(asset)
+        self._record_mtime(asset.path)
+        self._record_mtime(folder.path)
+        return asset
+
+    def add_task(self, name: str, asset: Asset) -> Task:
+        task = Task(path=asset.path / name)
+        asset.add_task(task)
+        self._record_mtime(asset.path)
+        return task
+
+    def remove_node(self, node: Folder | Asset) -> None:
+        """Drop 'node' and everything below it from the tree (not from disk)."""
+        parent = self._find_entity(node)
+        if parent is None:
+            return
+        self._detach(parent, node)
+        self._record_mtime(parent.path)
 
     def get_all_assets(self, folder: Folder | None = None) -> list[Asset]:
         """Recursively get all assets under the given folder. If no folder is provided, start from root."""
         assets = []
         start_folder = folder or self.root
+        self.load_all(start_folder)
 
         def _gather_assets(node: Folder):
             assets.extend(node.assets)
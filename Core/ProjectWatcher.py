@@ -0,0 +1,355 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import re
+import select
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterable
+from Core.QLogger import log
+
+
+# on_change receives the directories whose entries changed, or None if the
+# watcher lost track (event queue overflow) and everything must be checked
+ChangeCallback = Callable[[set[Path] | None], None]
+
+# seconds between two checks of the polled directories, unless configured
+POLL_INTERVAL = 2.0
+
+# filesystems where inotify only sees the changes made on this machine
+NETWORK_FILESYSTEMS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph",
+    "glusterfs", "lustre", "davfs", "fuse.sshfs", "fuse.rclone", "fuse.davfs2",
+})
+
+
+def _read_mounts() -> list[tuple[str, str]]:
+    """(mount point, filesystem type) of every mount, longest mount point first."""
+    try:
+        with open("/proc/self/mounts", "r", encoding="utf-8", errors="replace") as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    mounts = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        # spaces and the like are written as octal escapes, e.g. \040
+        point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+        mounts.append((point.rstrip("/") or "/", fields[2]))
+    mounts.sort(key=lambda mount: len(mount[0]), reverse=True)
+    return mounts
+
+
+class ProjectWatcher(ABC):
+    """
+    Watches a set of directories and reports the ones whose entries were
+    created, deleted or renamed.
+
+    Changes are collected for `DEBOUNCE` seconds and then handed to
+    'on_change' as one batch, from the watcher thread.
+
+    `watch` takes 'poll' to say whether a directory is worth polling when no
+    change events can be had for it; directories that are not are only
+    watched where events come for free.
+    """
+
+    DEBOUNCE = 0.3
+
+    def __init__(self, on_change: ChangeCallback):
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    @abstractmethod
+    def watch(self, paths: Iterable[Path], poll: bool = True) -> None: ...
+
+    @abstractmethod
+    def unwatch(self, paths: Iterable[Path]) -> None: ...
+
+    @abstractmethod
+    def _run(self) -> None: ...
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="conduit-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _emit(self, changed: set[Path] | None) -> None:
+        try:
+            self.on_change(changed)
+        except Exception as e:
+            log(f"ERROR in project watcher callback: {e}", "error")
+
+
+class InotifyWatcher(ProjectWatcher):
+    """
+    Linux watcher built on inotify, one watch per directory.
+
+    Directories on network filesystems, where inotify misses the changes
+    made by other machines, and directories the kernel refuses a watch for
+    (usually because fs.inotify.max_user_watches is used up) are polled
+    instead.
+    """
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, on_change: ChangeCallback, poll_interval: float = POLL_INTERVAL):
+        super().__init__(on_change)
+        self.poll_interval = poll_interval
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: dict[int, Path] = {}
+        self._wds: dict[Path, int] = {}
+        # directories inotify could not take or does not see every change of
+        self._fallback: PollingWatcher | None = None
+        mounts = _read_mounts()
+        self._mount_points = [point for point, _ in mounts]
+        # the last mount on a point hides the ones before it
+        self._mount_types = dict(mounts)
+        # directory -> filesystem type, as most paths share their parent
+        self._fs_types: dict[str, str] = {}
+        self._network_logged: set[str] = set()
+
+    def _fs_type(self, path: Path) -> str:
+        path = str(path)
+        if path in self._mount_types:
+            return self._mount_types[path]
+        directory = os.path.dirname(path)
+        fs_type = self._fs_types.get(directory)
+        if fs_type is None:
+            fs_type = ""
+            for point in self._mount_points:
+                if directory == point or directory.startswith(point.rstrip("/") + "/"):
+                    fs_type = self._mount_types[point]
+                    break
+            self._fs_types[directory] = fs_type
+        return fs_type
+
+    def watch(self, paths: Iterable[Path], poll: bool = True) -> None:
+        refused: list[Path] = []
+        remote: list[Path] = []
+        error = 0
+        with self._lock:
+            if self._fd < 0:
+                return  # stopped
+            for path in paths:
+                if path in self._wds:
+                    continue
+                fs_type = self._fs_type(path)
+                if fs_type in NETWORK_FILESYSTEMS:
+                    remote.append(path)
+                    if fs_type not in self._network_logged:
+                        self._network_logged.add(fs_type)
+                        log(
+                            f"The project is on a network share ({fs_type}) where changes "
+                            "made by others are not reported; polling it instead",
+                            "info",
+                        )
+                    continue
+                wd = self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(path), self.MASK
+                )
+                if wd < 0:
+                    code = ctypes.get_errno()
+                    if code not in (errno.ENOENT, errno.ENOTDIR):
+                        # gone already is fine, anything else must not go unseen
+                        refused.append(path)
+                        error = code
+                    continue
+                self._paths[wd] = path
+                self._wds[path] = wd
+        if refused:
+            log(
+                f"Could not watch {len(refused)} directories ({os.strerror(error)}), "
+                "polling them instead. Raising fs.inotify.max_user_watches helps.",
+                "warning",
+            )
+        if poll and (refused or remote):
+            self._poll(refused + remote)
+
+    def _poll(self, paths: list[Path]) -> None:
+        with self._lock:
+            if self._fallback is None:
+                self._fallback = PollingWatcher(self.on_change, self.poll_interval)
+                if self._running:
+                    self._fallback.start()
+            fallback = self._fallback
+        fallback.watch(paths)
+
+    def unwatch(self, paths: Iterable[Path]) -> None:
+        paths = list(paths)
+        with self._lock:
+            for path in paths:
+                wd = self._wds.pop(path, None)
+                if wd is not None:
+                    self._paths.pop(wd, None)
+                    self._libc.inotify_rm_watch(self._fd, wd)
+        if self._fallback is not None:
+            self._fallback.unwatch(paths)
+
+    def start(self) -> None:
+        super().start()
+        if self._fallback is not None:
+            self._fallback.start()
+
+    def stop(self) -> None:
+        if self._fallback is not None:
+            self._fallback.stop()
+        super().stop()
+
+    def _read_events(self) -> set[Path] | None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[Path] = set()
+        overflow = False
+        offset = 0
+        with self._lock:
+            while offset < len(data):
+                wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                path = self._paths.get(wd)
+                if path is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    # the kernel dropped the watch, the directory is gone
+                    del self._paths[wd]
+                    self._wds.pop(path, None)
+                    continue
+                changed.add(path)
+        return None if overflow else changed
+
+    def _run(self) -> None:
+        pending: set[Path] | None = set()
+        deadline = None
+        try:
+            while self._running:
+                timeout = 0.5 if deadline is None else max(0, deadline - time.monotonic())
+                ready, _, _ = select.select([self._fd], [], [], timeout)
+                if ready:
+                    events = self._read_events()
+                    if events is None or pending is None:
+                        pending = None
+                    else:
+                        pending |= events
+                    if (pending is None or pending) and deadline is None:
+                        deadline = time.monotonic() + self.DEBOUNCE
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._emit(pending)
+                    pending = set()
+                    deadline = None
+        finally:
+            with self._lock:
+                os.close(self._fd)
+                self._fd = -1
+
+
+class PollingWatcher(ProjectWatcher):
+    """
+    Portable fallback that compares directory mtimes every `interval`
+    seconds. Only directories watched with 'poll' are checked, as every
+    check is a stat call that may go over the network.
+    """
+
+    def __init__(self, on_change: ChangeCallback, interval: float = POLL_INTERVAL):
+        super().__init__(on_change)
+        self.interval = interval
+        self._mtimes: dict[Path, int | None] = {}
+        # set by stop so a long interval does not hold it up
+        self._stopping = threading.Event()
+
+    @staticmethod
+    def _mtime(path: Path) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def watch(self, paths: Iterable[Path], poll: bool = True) -> None:
+        if not poll:
+            return
+        # stat'ed outside the lock, which the polling thread needs
+        new = [path for path in paths if path not in self._mtimes]
+        mtimes = {path: self._mtime(path) for path in new}
+        with self._lock:
+            for path, mtime in mtimes.items():
+                self._mtimes.setdefault(path, mtime)
+
+    def unwatch(self, paths: Iterable[Path]) -> None:
+        with self._lock:
+            for path in paths:
+                self._mtimes.pop(path, None)
+
+    def start(self) -> None:
+        self._stopping.clear()
+        super().start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        super().stop()
+
+    def _run(self) -> None:
+        while self._running:
+            if self._stopping.wait(self.interval):
+                break
+            with self._lock:
+                watched = list(self._mtimes.items())
+
+            changed: set[Path] = set()
+            for path, mtime in watched:
+                current = self._mtime(path)
+                if current != mtime:
+                    changed.add(path)
+                    with self._lock:
+                        if path in self._mtimes:
+                            self._mtimes[path] = current
+
+            if changed and self._running:
+                self._emit(changed)
+
+
+def create_watcher(
+    on_change: ChangeCallback, poll_interval: float = POLL_INTERVAL
+) -> ProjectWatcher:
+    """Return an inotify watcher on Linux and a polling watcher everywhere else."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(on_change, poll_interval)
+        except (OSError, AttributeError) as e:
+            log(f"inotify unavailable, polling the project instead: {e}", "warning")
+    return PollingWatcher(on_change, poll_interval)
@@ -0,0 +1,434 @@
+import bisect
+import heapq
+import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from Core.ProjectModel import ProjectModel, Folder, Asset, Task, DirScan, ProjectChange
+
+
+INDEX_VERSION = 1
+
+
+class SearchResult(NamedTuple):
+    kind: str       # "asset" | "task"
+    name: str
+    path: Path
+    score: float
+
+
+def _trigrams(text: str) -> set[str]:
+    # padded in front only, so the start of a name counts but the query does
+    # not have to be a whole name
+    padded = f" {text}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    In-memory fuzzy index over asset and task names.
+
+    Names are indexed once per distinct (lower-case) name: the sorted name
+    list answers prefix queries and trigram postings find substring and fuzzy
+    matches, so "modelling" costs the same whether 10 or 100k tasks carry it.
+    Entries are keyed by path and can be added and removed one by one; all
+    methods are safe to call from any thread. The index can be saved next to
+    the project snapshot and brought up to date with `refresh` on the next
+    launch instead of listing the whole project again.
+    """
+
+    # fuzzy matches must contain this share of the query trigrams
+    MIN_SIMILARITY = 0.6
+    # postings counted for fuzzy matches, rarest trigrams first; bounds the
+    # cost of queries made of very common trigrams
+    FUZZY_BUDGET = 30_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # path -> (kind, lower-case name)
+        self._entries: dict[str, tuple[str, str]] = {}
+        # every indexed path, sorted before use, so a subtree is one slice
+        self._paths: list[str] = []
+        self._paths_sorted = True
+        # lower-case name -> kind -> paths carrying it, in insertion order
+        self._names: dict[str, dict[str, dict[str, None]]] = {}
+        self._sorted_names: list[str] = []
+        self._trigrams: dict[str, set[str]] = {}
+        # directory mtimes (ns) of the listings given to `add_scans`, so a saved
+        # index only lists the directories that changed since
+        self._mtimes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+            self._names.clear()
+            self._sorted_names.clear()
+            self._trigrams.clear()
+            self._mtimes.clear()
+
+    # ------------------------
+    # Updates
+    # ------------------------
+
+    def add(self, path: Path, kind: str) -> None:
+        with self._lock:
+            self._add(str(path), kind)
+
+    def _add(self, path: str, kind: str, keep_sorted: bool = True) -> None:
+        # without 'keep_sorted' the caller sorts _sorted_names once at the end
+        if path in self._entries:
+            return
+        name = os.path.basename(path).lower()
+        self._entries[path] = (kind, name)
+        self._paths.append(path)
+        self._paths_sorted = False
+        kinds = self._names.get(name)
+        if kinds is not None:
+            kinds.setdefault(kind, {})[path] = None
+            return
+        self._names[name] = {kind: {path: None}}
+        if keep_sorted:
+            bisect.insort(self._sorted_names, name)
+        else:
+            self._sorted_names.append(name)
+        for gram in _trigrams(name):
+            self._trigrams.setdefault(gram, set()).add(name)
+
+    def _remove(self, path: str) -> None:
+        kind, name = self._entries.pop(path)
+        kinds = self._names[name]
+        paths = kinds[kind]
+        del paths[path]
+        if not paths:
+            del kinds[kind]
+        if kinds:
+            return
+        del self._names[name]
+        i = bisect.bisect_left(self._sorted_names, name)
+        if i < len(self._sorted_names) and self._sorted_names[i] == name:
+            del self._sorted_names[i]
+        for gram in _trigrams(name):
+            names = self._trigrams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._trigrams[gram]
+
+    def _sort_paths(self) -> None:
+        # nearly sorted after a few additions, which timsort handles in one pass
+        if not self._paths_sorted:
+            self._paths.sort()
+            self._paths_sorted = True
+
+    def remove(self, path: Path) -> None:
+        """Remove 'path' and every entry below it."""
+        path = str(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            self._sort_paths()
+            start = bisect.bisect_left(self._paths, path)
+            end = bisect.bisect_left(self._paths, prefix[:-1] + chr(ord(os.sep) + 1))
+            removed = [
+                p for p in self._paths[start:end] if p == path or p.startswith(prefix)
+            ]
+            if not removed:
+                return
+            for p in removed:
+                self._remove(p)
+            gone = set(removed)
+            self._paths[start:end] = [p for p in self._paths[start:end] if p not in gone]
+
+    def add_node(self, node: Folder | Asset | Task) -> None:
+        """Index 'node' and whatever is loaded below it."""
+        with self._lock:
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, Task):
+                    self._add(str(node.path), "task")
+                elif isinstance(node, Asset):
+                    self._add(str(node.path), "asset")
+                    stack.extend(node.tasks)
+                else:
+                    stack.extend(node.assets)
+                    stack.extend(node.subfolders)
+
+    def add_scans(self, scans: dict[Path, DirScan]) -> None:
+        """Index listings streamed by `ProjectModel.scan_batches`."""
+        with self._lock:
+            for path, scan in scans.items():
+                self._mtimes[str(path)] = scan.mtime
+                if scan.is_asset:
+                    self._add(str(path), "asset")
+                    for task in scan.subdirs:
+                        self._add(str(task), "task")
+
+    def apply_changes(self, changes: Iterable[ProjectChange]) -> None:
+        """Patch the index with changes from `ProjectModel.apply_updates`."""
+        for kind, _, node in changes:
+            if kind in ("removed", "tasks"):
+                # an asset whose tasks changed is simply indexed again
+                self.remove(node.path)
+            if kind in ("added", "tasks"):
+                self.add_node(node)
+
+    def paths(self, kind: str) -> list[Path]:
+        """Every indexed path of 'kind' ("asset" or "task")."""
+        with self._lock:
+            return [Path(path) for path, (k, _) in self._entries.items() if k == kind]
+
+    def kind(self, path: Path) -> str | None:
+        """"asset" or "task" if 'path' is indexed, else None."""
+        with self._lock:
+            entry = self._entries.get(str(path))
+        return entry[0] if entry else None
+
+    def entries(
+        self,
+        kind: str,
+        under: Path | None = None,
+        after: Path | None = None,
+        limit: int | None = None,
+    ) -> list[Path]:
+        """
+        Up to 'limit' paths of 'kind' below 'under', in path order and
+        starting after 'after'. Pages through the whole project whether its
+        folders were loaded or not; the paths are only sorted after changes.
+        """
+        prefix = str(under).rstrip(os.sep) + os.sep if under else ""
+        found: list[Path] = []
+        with self._lock:
+            self._sort_paths()
+            paths = self._paths
+            i = bisect.bisect_left(paths, prefix)
+            if after is not None:
+                i = max(i, bisect.bisect_right(paths, str(after)))
+            while i < len(paths) and paths[i].startswith(prefix):
+                if self._entries[paths[i]][0] == kind:
+                    found.append(Path(paths[i]))
+                    if limit is not None and len(found) >= limit:
+                        break
+                i += 1
+        return found
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the entries and listing mtimes to 'path' as compact JSON."""
+        with self._lock:
+            entries: dict[str, list[str]] = {}
+            for entry, (kind, _) in self._entries.items():
+                entries.setdefault(kind, []).append(entry)
+            data = {"version": INDEX_VERSION, "entries": entries, "mtimes": dict(self._mtimes)}
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path) -> bool:
+        """
+        Add the entries saved by `save`, without touching the project directory.
+        Returns False if the file is missing or unreadable.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return False
+            entries = [
+                (str(entry), str(kind))
+                for kind, paths in data["entries"].items()
+                for entry in paths
+            ]
+            mtimes = {str(p): int(mtime) for p, mtime in data["mtimes"].items()}
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            return False
+        with self._lock:
+            for entry, kind in entries:
+                self._add(entry, kind, keep_sorted=False)
+            self._sorted_names.sort()
+            self._mtimes.update(mtimes)
+        return True
+
+    def refresh(self, workers: int = 1, cancel: threading.Event | None = None) -> bool:
+        """
+        Bring a loaded index up to date with the project directory.
+
+        Every directory listed before is only stat'ed; the ones whose mtime
+        changed are listed again and folders that appeared below them are
+        scanned completely. Returns False if it was cancelled.
+        """
+        with self._lock:
+            known = dict(self._mtimes)
+        children: dict[str, set[str]] = {}
+        for path in known:
+            children.setdefault(os.path.dirname(path), set()).add(path)
+
+        def _check(item: tuple[str, int]) -> tuple[str, DirScan | None] | None:
+            path, mtime = item
+            if cancel is not None and cancel.is_set():
+                return None
+            try:
+                if os.stat(path).st_mtime_ns == mtime:
+                    return None
+                return path, ProjectModel._scan_dir(Path(path))
+            except OSError:
+                return path, None
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="conduit-search"
+        ) as pool:
+            changed = [result for result in pool.map(_check, known.items()) if result]
+
+        dropped: set[str] = set()
+
+        def _drop(path: str) -> None:
+            self.remove(Path(path))
+            stack = [path]
+            with self._lock:
+                while stack:
+                    path = stack.pop()
+                    dropped.add(path)
+                    self._mtimes.pop(path, None)
+                    stack.extend(children.pop(path, ()))
+
+        # parents first, so a removed folder takes its subtree along at once
+        for path, scan in sorted(changed, key=lambda result: len(result[0])):
+            if cancel is not None and cancel.is_set():
+                return False
+            if path in dropped:
+                continue
+            if scan is None:
+                _drop(path)
+                continue
+            with self._lock:
+                was_asset = self._entries.get(path, ("",))[0] == "asset"
+            if was_asset or scan.is_asset:
+                # tasks changed, or a folder became an asset or the reverse
+                old = children.pop(path, set())
+                self.remove(Path(path))
+                for child in old:
+                    _drop(child)
+                if not scan.is_asset:
+                    self._scan_new(Path(path), workers, cancel)
+                    continue
+            else:
+                subdirs = {str(child) for child in scan.subdirs}
+                old = children.get(path, set())
+                for gone in old - subdirs:
+                    _drop(gone)
+                for child in sorted(subdirs - old):
+                    self._scan_new(Path(child), workers, cancel)
+            self.add_scans({Path(path): scan})
+        return not (cancel is not None and cancel.is_set())
+
+    def _scan_new(self, path: Path, workers: int, cancel: threading.Event | None) -> None:
+        try:
+            scan = ProjectModel._scan_dir(path)
+        except OSError:
+            return
+        if scan.is_asset:
+            # `scan_batches` would list the tasks of an asset it starts at
+            self.add_scans({path: scan})
+            return
+        for batch in ProjectModel.scan_batches(path, workers=workers, cancel=cancel):
+            self.add_scans(batch)
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def _score_names(self, query: str, enough: int | None) -> dict[str, float]:
+        """
+        Score the names matching 'query': 3 for the name itself, 2 for
+        prefixes, between 1 and 2 for substrings and below 1 for similar
+        names. With 'enough' better matches the weaker passes are skipped.
+        """
+        scores: dict[str, float] = {}
+        names = self._sorted_names
+        i = bisect.bisect_left(names, query)
+        while i < len(names) and names[i].startswith(query):
+            scores[names[i]] = 3.0 if names[i] == query else 2.0
+            i += 1
+            if enough is not None and len(scores) >= enough:
+                return scores
+        if len(query) < 3:
+            return scores
+
+        grams = _trigrams(query)
+        postings = [self._trigrams.get(gram, set()) for gram in grams]
+        # names holding the query as a substring hold all of its inner trigrams
+        inner = [names for gram, names in zip(grams, postings) if not gram.startswith(" ")]
+        if inner and all(inner):
+            for name in set.intersection(*sorted(inner, key=len)):
+                if name not in scores and query in name:
+                    scores[name] = 1.0 + len(query) / len(name)
+        if enough is not None and len(scores) >= enough:
+            return scores
+
+        # share of the query trigrams found in the name, lightly favouring
+        # short names; trigrams no name has (a typo) count as misses
+        counted = []
+        misses = 0
+        budget = self.FUZZY_BUDGET
+        for names in sorted(postings, key=len):
+            if not names:
+                misses += 1
+                continue
+            if budget < len(names) and len(counted) >= 2:
+                break
+            budget -= len(names)
+            counted.append(names)
+        total = len(counted) + misses
+        needed = self.MIN_SIMILARITY * total
+        counts = Counter(chain.from_iterable(counted))
+        for name in [name for name, count in counts.items() if count >= needed]:
+            if name not in scores:
+                similarity = counts[name] / total
+                scores[name] = similarity * (0.9 + 0.1 * len(query) / max(len(name), len(query)))
+        return scores
+
+    def search(
+        self, query: str, limit: int = 20, kinds: Iterable[str] | None = None
+    ) -> list[SearchResult]:
+        """
+        Best matches for 'query', best first: exact names, then prefixes, then
+        substrings, then similar names. 'kinds' limits the result to "asset"
+        and/or "task" entries.
+        """
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            # every name has at least one path, so 'limit' names fill the
+            # result unless kinds are filtered out
+            enough = limit if kinds is None else None
+            scores = self._score_names(query, enough)
+            key = lambda name: (-scores[name], len(name), name)
+            if enough is None:
+                ranked = sorted(scores, key=key)
+            else:
+                ranked = heapq.nsmallest(limit, scores, key=key)
+
+            results: list[SearchResult] = []
+            for name in ranked:
+                for kind, paths in sorted(self._names[name].items()):
+                    if kinds is not None and kind not in kinds:
+                        continue
+                    for path in paths:
+                        path = Path(path)
+                        results.append(SearchResult(kind, path.name, path, scores[name]))
+                        if len(results) >= limit:
+                            return results
+            return results
@@ -16,6 +16,13 @@ class Settings_entry(Enum):
     IGNORED_SUFFIX = "ignored_suffix"
     UNITY_PATH = "unity_path"
     BLENDER_EXEC = "blender_path"
+    SCAN_WORKERS = "scan_workers"
+    WATCH_PROJECT = "watch_project"
+    POLL_INTERVAL = "poll_interval"
+    LAZY_SCAN = "lazy_scan"
+    PROJECT_CATALOG = "project_catalog"
+    SERVER_ASYNC = "server_async"
+    LOCAL_SOCKET = "local_socket"
 
 
 class Constants:
@@ -64,6 +71,14 @@ class Settings:
         Settings_entry.IGNORED_SUFFIX.value: [".blend1", ".versioninfo"],
         Settings_entry.UNITY_PATH.value: None,
         Settings_entry.BLENDER_EXEC.value: None,
+        Settings_entry.SCAN_WORKERS.value: 8,
+        Settings_entry.WATCH_PROJECT.value: True,
+        # seconds between checks of directories no change events come for
+        Settings_entry.POLL_INTERVAL.value: 2.0,
+        Settings_entry.LAZY_SCAN.value: True,
+        Settings_entry.PROJECT_CATALOG.value: False,
+        Settings_entry.SERVER_ASYNC.value: True,
+        Settings_entry.LOCAL_SOCKET.value: True,
     }
 
     def __init__(self, app_name: str, version: str, filename: str = "settings.json"):
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+from Core.QLogger import log
+from Core.VersionIndex import parse_version
+
+
+# one JSON object per line, appended to as versions are added; when a file
+# has several records the last one wins, so edits are appended too
+METADATA_FILE = ".versions.jsonl"
+LEGACY_SUFFIX = ".versioninfo"
+
+_append_lock = threading.Lock()
+
+
+def metadata_path(task_path: Path) -> Path:
+    return task_path / METADATA_FILE
+
+
+def file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file(source: Path, target: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Copy 'source' to 'target' (contents and permission bits, like
+    `shutil.copy`) and return the sha1 of the contents, reading them once.
+    """
+    digest = hashlib.sha1()
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        while chunk := src.read(chunk_size):
+            digest.update(chunk)
+            dst.write(chunk)
+    shutil.copymode(source, target)
+    return digest.hexdigest()
+
+
+def version_record(
+    file: Path, user: str | None, comment: str = "", sha1: str | None = None
+) -> dict:
+    """
+    Metadata for the version stored in 'file', which must exist. 'sha1' saves
+    reading the file again when the caller hashed it already.
+    """
+    stat = file.stat()
+    return {
+        "file": file.name,
+        "version": parse_version(file.name),
+        "user": user or "Unknown",
+        "comment": comment or "",
+        "time": int(time.time()),
+        "size": stat.st_size,
+        "sha1": sha1 or file_hash(file),
+    }
+
+
+def append_records(task_path: Path, records: Iterable[dict]) -> None:
+    lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+    if not lines:
+        return
+    data = lines.encode("utf-8")
+    # one O_APPEND write per call, so appends from other threads, processes
+    # and machines on the share do not interleave lines
+    with _append_lock:
+        fd = os.open(metadata_path(task_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            written = os.write(fd, data)
+            while written < len(data):
+                written += os.write(fd, data[written:])
+        finally:
+            os.close(fd)
+
+
+def read_records(task_path: Path) -> dict[str, dict]:
+    """All records of the task, by file name."""
+    records: dict[str, dict] = {}
+    try:
+        with open(metadata_path(task_path), "r", encoding="utf-8") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return records
+    for line in content.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # a torn line from an interrupted write
+        if isinstance(record, dict) and record.get("file"):
+            records[record["file"]] = record
+    return records
+
+
+def _import_legacy(task_path: Path, names: Iterable[str], records: dict[str, dict]) -> list[dict]:
+    """
+    Records for the `.versioninfo` files among 'names' whose version is not in
+    the store yet. The legacy files are left in place.
+    """
+    versions = {
+        name[: -len(LEGACY_SUFFIX)]: name for name in names if name.endswith(LEGACY_SUFFIX)
+    }
+    if not versions:
+        return []
+
+    known = {Path(file).stem for file in records}
+    imported = []
+    for name in sorted(names):
+        stem, suffix = os.path.splitext(name)
+        if suffix == LEGACY_SUFFIX or stem not in versions or stem in known:
+            continue
+        try:
+            with open(task_path / versions[stem], "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        try:
+            stat = (task_path / name).stat()
+        except OSError:
+            continue
+        imported.append({
+            "file": name,
+            "version": parse_version(name),
+            "user": data.get("user") or "Unknown",
+            "comment": data.get("comment") or "",
+            "time": int(stat.st_mtime),
+            "size": stat.st_size,
+        })
+        known.add(stem)
+    return imported
+
+
+def load_task_metadata(
+    task_path: Path, names: Iterable[str] | None = None, import_legacy: bool = True
+) -> dict[str, dict]:
+    """
+    Version metadata of a task, by file name, in one read of the store.
+
+    'names' is the directory listing of the task if the caller has it; any
+    `.versioninfo` file in it that is not in the store yet is imported first.
+    With 'import_legacy' off they are only merged into the result and the
+    store is left untouched.
+    """
+    records = read_records(task_path)
+    if names is None:
+        try:
+            names = os.listdir(task_path)
+        except FileNotFoundError:
+            return records
+    names = list(names)
+    imported = _import_legacy(task_path, names, records)
+    if imported and import_legacy:
+        try:
+            append_records(task_path, imported)
+            log(f"imported {len(imported)} .versioninfo files in {task_path}", "noise")
+        except OSError as e:
+            log(f"could not write {metadata_path(task_path)}: {e}", "warning")
+    for record in imported:
+        records[record["file"]] = record
+    return records
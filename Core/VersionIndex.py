@@ -0,0 +1,127 @@
+import bisect
+import os
+import re
+import threading
+from pathlib import Path
+
+
+# any string + version number + file extension, e.g. soldier_modelling_20.blend
+VERSION_PATTERN = re.compile(r"^(.*?)(\d+)\.([a-zA-Z0-9]+)$")
+
+
+# Blender backups (.blend1, .blend2, ...) and legacy .versioninfo sidecars
+# carry the version number of the file they belong to
+NOT_VERSION_PATTERN = re.compile(r"\.(blend\d+|versioninfo)$", re.IGNORECASE)
+
+
+def parse_version(file_name: str) -> int | None:
+    match = VERSION_PATTERN.match(file_name)
+    return int(match.group(2)) if match else None
+
+
+def is_version_file(file_name: str) -> bool:
+    """True for a version file itself, not one of its backups or sidecars."""
+    return parse_version(file_name) is not None and not NOT_VERSION_PATTERN.search(file_name)
+
+
+class TaskVersions:
+    """Sorted version numbers found in one task directory."""
+
+    __slots__ = ("mtime", "versions")
+
+    def __init__(self, mtime: int | None, versions: list[int]):
+        # directory mtime at the time of the listing, None if it was missing
+        self.mtime = mtime
+        self.versions = versions
+
+    @property
+    def latest(self) -> int:
+        return self.versions[-1] if self.versions else 0
+
+    def add(self, version: int) -> None:
+        if not self.versions or version > self.versions[-1]:
+            # the common case: a new version is always the highest one
+            self.versions.append(version)
+        elif version not in self.versions:
+            bisect.insort(self.versions, version)
+
+
+class VersionIndex:
+    """
+    Per-task cache of the versions present in each task directory.
+
+    An entry is reused as long as the directory mtime did not change, so a
+    lookup is one stat call no matter how many versions the task holds. Any
+    file added or removed from outside bumps the mtime and the directory is
+    listed again on the next lookup.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Path, TaskVersions] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _mtime(path: Path) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _scan(path: Path) -> list[int]:
+        versions = set()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    version = parse_version(entry.name)
+                    if version is not None:
+                        versions.add(version)
+        except FileNotFoundError:
+            pass
+        return sorted(versions)
+
+    def get(self, path: Path) -> TaskVersions:
+        """Return the versions of the task at 'path', listing it only if it changed."""
+        mtime = self._mtime(path)
+        with self._lock:
+            entry = self._tasks.get(path)
+            if entry is not None and entry.mtime == mtime:
+                return entry
+        entry = TaskVersions(mtime, self._scan(path))
+        with self._lock:
+            self._tasks[path] = entry
+        return entry
+
+    def latest(self, path: Path) -> int:
+        return self.get(path).latest
+
+    def versions(self, path: Path) -> list[int]:
+        return list(self.get(path).versions)
+
+    def add(self, path: Path, version: int) -> None:
+        """
+        Record 'version' after it was written to 'path'.
+
+        Call it once the files are in place: the entry takes the new directory
+        mtime so our own write does not trigger another listing.
+        """
+        entry = self.get_cached(path)
+        if entry is None:
+            self.get(path)
+            return
+        with self._lock:
+            entry.add(version)
+            entry.mtime = self._mtime(path)
+
+    def get_cached(self, path: Path) -> TaskVersions | None:
+        with self._lock:
+            return self._tasks.get(path)
+
+    def forget(self, path: Path | None = None) -> None:
+        """Drop the entry of 'path', or every entry below it (all when None)."""
+        with self._lock:
+            if path is None:
+                self._tasks.clear()
+                return
+            for key in [key for key in self._tasks if key == path or path in key.parents]:
+                del self._tasks[key]
@@ -0,0 +1,110 @@
+import threading
+from pathlib import Path
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QImage, QPixmap
+from Core.Settings import Constants
+from Core.QLogger import log
+
+
+class IconCache:
+    """
+    Process-wide cache of the icons in `Constants.icon_path()`.
+
+    Each PNG is read from disk once; scaled pixmaps are kept per
+    (name, size, device pixel ratio) so views, delegates and widgets can ask
+    for an icon on every paint without touching the disk. Pixmaps are GUI
+    objects: use the cache from the UI thread only.
+    """
+
+    def __init__(self, icon_dir: Path | None = None):
+        self.icon_dir = icon_dir or Constants.icon_path()
+        # name -> decoded image, None if the icon does not exist
+        self._images: dict[str, QImage | None] = {}
+        self._pixmaps: dict[tuple[str, int, float], QPixmap | None] = {}
+        self._icons: dict[str, QIcon] = {}
+
+    def warm(self, sizes=(32,), dpr: float = 1.0) -> None:
+        """Load every icon of the icon folder and scale it to 'sizes'."""
+        try:
+            names = [p.name for p in self.icon_dir.iterdir() if p.suffix == ".png"]
+        except OSError as e:
+            log(f"could not read icons from {self.icon_dir}: {e}", "warning")
+            return
+        for name in names:
+            for size in sizes:
+                self.pixmap(name, size, dpr)
+
+    def _image(self, name: str) -> QImage | None:
+        if name not in self._images:
+            image = QImage(str(self.icon_dir / name))
+            self._images[name] = None if image.isNull() else image
+        return self._images[name]
+
+    def pixmap(self, name: str, size: int, dpr: float = 1.0) -> QPixmap | None:
+        """
+        'name' scaled to fit 'size' x 'size' logical pixels at 'dpr', or None
+        if there is no such icon.
+        """
+        key = (name, size, dpr)
+        if key in self._pixmaps:
+            return self._pixmaps[key]
+        image = self._image(name)
+        pixmap = None
+        if image is not None:
+            device_size = round(size * dpr)
+            pixmap = QPixmap.fromImage(
+                image.scaled(
+                    device_size,
+                    device_size,
+                    Qt.KeepAspectRatio,
+                    Qt.SmoothTransformation,
+                )
+            )
+            pixmap.setDevicePixelRatio(dpr)
+        self._pixmaps[key] = pixmap
+        return pixmap
+
+    def icon(self, name: str) -> QIcon:
+        """QIcon for 'name'; an empty icon if it does not exist."""
+        if name not in self._icons:
+            image = self._image(name)
+            self._icons[name] = QIcon(QPixmap.fromImage(image)) if image else QIcon()
+        return self._icons[name]
+
+    def clear(self) -> None:
+        self._images.clear()
+        self._pixmaps.clear()
+        self._icons.clear()
+
+
+class IconCacheSingleton:
+    """Thread-safe singleton manager for the IconCache."""
+
+    _instance: IconCache | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> IconCache:
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = IconCache()
+        return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        """Reset the singleton instance. Use only in tests."""
+        with cls._lock:
+            cls._instance = None
+
+
+def get_icon_cache() -> IconCache:
+    """Return the global icon cache, creating it if needed."""
+    return IconCacheSingleton.get_instance()
+
+
+def init_icon_cache(sizes=(32,), dpr: float = 1.0) -> IconCache:
+    """Create the global icon cache and pre-scale every icon to 'sizes'."""
+    cache = get_icon_cache()
+    cache.warm(sizes, dpr)
+    return cache
@@ -0,0 +1,52 @@
+import threading
+from PySide6.QtCore import QObject, QRunnable, Signal
+from Core.ProjectModel import ProjectModel
+from Core.QLogger import log
+
+
+class _LoaderSignals(QObject):
+    # emitted from the worker thread, delivered queued on the UI thread
+    batch = Signal(object, object)
+    finished = Signal(object)
+
+
+class ProjectLoader(QRunnable):
+    """
+    Scans a project on a QThreadPool worker and streams the listings in batches.
+
+    Connect to `signals.batch` (project, listings) and `signals.finished`
+    (project) and hand the results to `Conduit.attach_project_batch` and
+    `Conduit.finish_project_load`. `cancel()` stops the scan; nothing is emitted
+    afterwards.
+    """
+
+    def __init__(self, project: ProjectModel, lazy: bool = False):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.project = project
+        # a lazy project only needs the children of the root classified
+        self.depth = 1 if lazy else None
+        self.signals = _LoaderSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self) -> None:
+        try:
+            for batch in ProjectModel.scan_batches(
+                self.project.root.path,
+                workers=self.project.workers,
+                depth=self.depth,
+                cancel=self._cancel,
+            ):
+                if self._cancel.is_set():
+                    return
+                self.signals.batch.emit(self.project, batch)
+        except Exception as e:
+            log(f"ERROR while loading project: {e}", "error")
+        if not self._cancel.is_set():
+            self.signals.finished.emit(self.project)
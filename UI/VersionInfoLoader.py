@@ -0,0 +1,36 @@
+from pathlib import Path
+from PySide6.QtCore import QObject, QRunnable, Signal
+from Core import TaskMetadata
+from Core.QLogger import log
+
+
+class _InfoSignals(QObject):
+    # emitted from the worker thread, delivered queued on the UI thread
+    loaded = Signal(object, object)
+
+
+class VersionInfoLoader(QRunnable):
+    """
+    Reads the version metadata of one task on a QThreadPool worker.
+
+    `signals.loaded` delivers (generation, {file name: record}); the receiver
+    drops results whose generation is no longer current. 'names' is the
+    directory listing the caller already made, used to import `.versioninfo`
+    files that are not in the task's store yet.
+    """
+
+    def __init__(self, generation: int, task_path: Path, names: list[str]):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.task_path = task_path
+        self.names = names
+        self.signals = _InfoSignals()
+
+    def run(self) -> None:
+        try:
+            records = TaskMetadata.load_task_metadata(self.task_path, self.names)
+        except Exception as e:
+            log(f"ERROR while reading version info of {self.task_path}: {e}", "error")
+            records = {}
+        self.signals.loaded.emit(self.generation, records)
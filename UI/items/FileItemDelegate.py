@@ -0,0 +1,74 @@
+from PySide6.QtCore import QRect, QSize, Qt
+from PySide6.QtGui import QPalette
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate
+from UI.IconCache import get_icon_cache
+from UI.items.FileListModel import FileListModel
+
+
+class FileItemDelegate(QStyledItemDelegate):
+    """
+    Paints a file row: icon on the left, name and user on the top line and the
+    version comment below. Replaces one FileItem widget per file.
+    """
+
+    ICON_SIZE = 32
+    MARGIN = 10
+    ROW_HEIGHT = ICON_SIZE + 2 * MARGIN
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QApplication.style()
+        # background, hover and selection as the stylesheet defines them
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        painter.save()
+        rect = option.rect
+        icon_rect = QRect(
+            rect.left() + self.MARGIN,
+            rect.top() + (rect.height() - self.ICON_SIZE) // 2,
+            self.ICON_SIZE,
+            self.ICON_SIZE,
+        )
+        dpr = option.widget.devicePixelRatioF() if option.widget else 1.0
+        pixmap = get_icon_cache().pixmap(
+            index.data(FileListModel.IconRole), self.ICON_SIZE, dpr
+        )
+        if pixmap is not None:
+            size = pixmap.deviceIndependentSize().toSize()
+            painter.drawPixmap(
+                icon_rect.left() + (self.ICON_SIZE - size.width()) // 2,
+                icon_rect.top() + (self.ICON_SIZE - size.height()) // 2,
+                pixmap,
+            )
+        else:
+            painter.drawText(icon_rect, Qt.AlignCenter, "No Icon")
+
+        selected = option.state & QStyle.State_Selected
+        text_color = option.palette.color(
+            QPalette.HighlightedText if selected else QPalette.Text
+        )
+        dim_color = option.palette.color(QPalette.PlaceholderText)
+        text_rect = rect.adjusted(icon_rect.right() + self.MARGIN, 2, -20, -2)
+        line_height = text_rect.height() // 2
+        top = QRect(text_rect.left(), text_rect.top(), text_rect.width(), line_height)
+        bottom = top.translated(0, line_height)
+
+        metrics = option.fontMetrics
+        user = index.data(FileListModel.UserRole) or ""
+        user_width = metrics.horizontalAdvance(user)
+        painter.setPen(dim_color if not selected else text_color)
+        painter.drawText(top, Qt.AlignRight | Qt.AlignBottom, user)
+
+        name_rect = top.adjusted(0, 0, -(user_width + 5), 0)
+        name = metrics.elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, name_rect.width())
+        painter.setPen(text_color)
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignBottom, name)
+
+        comment = index.data(FileListModel.CommentRole)
+        if comment:
+            comment = metrics.elidedText(comment, Qt.ElideRight, bottom.width())
+            painter.drawText(bottom, Qt.AlignLeft | Qt.AlignTop, comment)
+        painter.restore()
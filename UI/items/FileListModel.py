@@ -0,0 +1,131 @@
+import os
+from pathlib import Path
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QThreadPool, Qt
+from Core.TaskMetadata import METADATA_FILE
+from UI.VersionInfoLoader import VersionInfoLoader
+
+
+class FileEntry:
+    """One row of the file list; user and comment arrive from the info loader."""
+
+    __slots__ = ("path", "name", "user", "comment")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        self.user = "Unknown"
+        self.comment = ""
+
+
+class FileListModel(QAbstractListModel):
+    """
+    Files of one task, newest first.
+
+    Populating only lists the directory. The task's metadata store is read on
+    the thread pool and the user/comment of the rows are filled in when it
+    comes back. Results for a directory that is no longer shown are dropped.
+    """
+
+    UserRole = Qt.UserRole + 1
+    CommentRole = Qt.UserRole + 2
+    IconRole = Qt.UserRole + 3
+
+    ICONS = {
+        ".blend": "blender.png",
+        ".png": "image.png",
+        ".jpg": "image.png",
+    }
+    DEFAULT_ICON = "asset.png"
+
+    def __init__(self, parent=None, pool: QThreadPool | None = None):
+        super().__init__(parent)
+        self._entries: list[FileEntry] = []
+        # file name -> row, to place the metadata records
+        self._rows: dict[str, int] = {}
+        self._pool = pool or QThreadPool.globalInstance()
+        # bumped on every populate; loaders carry the generation they read for
+        self._generation = 0
+        # runnables still on the pool, kept referenced until they report back
+        self._loaders: set[VersionInfoLoader] = set()
+
+    def set_directory(self, path: Path | None, ignored_suffixes=()) -> None:
+        """List 'path' and replace all rows; None clears the list."""
+        self._generation += 1
+        entries = []
+        listing: list[str] = []
+        if path is not None:
+            ignored = tuple(ignored_suffixes)
+            try:
+                listing = os.listdir(path)
+            except FileNotFoundError:
+                pass
+            names = [
+                name
+                for name in listing
+                # skip master files, the metadata store and ignored suffixes
+                if not name.startswith("_master")
+                and name != METADATA_FILE
+                and not (ignored and name.endswith(ignored))
+            ]
+            names.sort(key=str.lower, reverse=True)
+            entries = [FileEntry(path / name) for name in names]
+
+        self.beginResetModel()
+        self._entries = entries
+        self._rows = {entry.name: row for row, entry in enumerate(entries)}
+        self.endResetModel()
+
+        if entries:
+            loader = VersionInfoLoader(self._generation, path, listing)
+            loader.signals.loaded.connect(self._on_info_loaded)
+            self._loaders.add(loader)
+            self._pool.start(loader)
+
+    def is_loading(self) -> bool:
+        return any(loader.generation == self._generation for loader in self._loaders)
+
+    def _on_info_loaded(self, generation: int, records: dict) -> None:
+        signals = self.sender()
+        self._loaders = {l for l in self._loaders if l.signals is not signals}
+        if generation != self._generation:
+            return
+        rows = []
+        for name, record in records.items():
+            row = self._rows.get(name)
+            if row is None:
+                continue
+            entry = self._entries[row]
+            entry.user = record.get("user") or "Unknown"
+            entry.comment = record.get("comment") or ""
+            rows.append(row)
+        if not rows:
+            return
+        self.dataChanged.emit(
+            self.index(min(rows)),
+            self.index(max(rows)),
+            [self.UserRole, self.CommentRole],
+        )
+
+    def entry(self, index: QModelIndex) -> FileEntry | None:
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        return self._entries[index.row()]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        entry = self.entry(index)
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return entry.name
+        if role == Qt.UserRole:
+            return entry.path
+        if role == self.IconRole:
+            return self.ICONS.get(entry.path.suffix.lower(), self.DEFAULT_ICON)
+        if role == self.UserRole:
+            return entry.user
+        if role == self.CommentRole:
+            return entry.comment
+        return None
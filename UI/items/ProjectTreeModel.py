@@ -0,0 +1,257 @@
+from pathlib import Path
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, QPersistentModelIndex, Qt
+from Core.ProjectModel import Folder, Asset
+from UI.IconCache import get_icon_cache
+
+
+class ProjectTreeModel(QAbstractItemModel):
+    """
+    Item model that reads straight from the `ProjectModel` tree.
+
+    Rows are only created when a branch is expanded (`canFetchMore` /
+    `fetchMore`), so opening a project costs the same no matter how big it is.
+    Every expanded folder keeps the list of rows the view currently knows
+    about; `sync_folder` brings that list in line with the project tree and
+    emits the matching row inserts and removals.
+    """
+
+    def __init__(self, conduit, parent=None):
+        super().__init__(parent)
+        self.conduit = conduit
+        self._root: Folder | None = None
+        # folder path -> children currently exposed as rows
+        self._rows: dict[Path, list[Folder | Asset]] = {}
+        # id(node) -> row inside its parent's list, so parent() stays O(1)
+        self._positions: dict[int, int] = {}
+        # folders whose positions are out of date while `sync_folder` runs
+        self._stale: set[Path] = set()
+
+        icons = get_icon_cache()
+        self._folder_icon = icons.icon("folder.png")
+        self._asset_icon = icons.icon("asset.png")
+
+    # ------------------------
+    # Helpers
+    # ------------------------
+
+    def _node(self, index: QModelIndex) -> Folder | Asset | None:
+        if not index.isValid():
+            return self._root
+        return index.internalPointer()
+
+    def _children(self, folder: Folder) -> list[Folder | Asset]:
+        """Children shown below 'folder': assets first, then subfolders."""
+        if folder is self._root:
+            # assets in the project root are not shown
+            return list(folder.subfolders)
+        return folder.assets + folder.subfolders
+
+    @staticmethod
+    def _parent_of(node: Folder | Asset) -> Folder | None:
+        return node.folder if isinstance(node, Asset) else node.parent
+
+    def node(self, index: QModelIndex) -> Folder | Asset | None:
+        """Return the Folder/Asset behind 'index' (None for the invisible root)."""
+        return index.internalPointer() if index.isValid() else None
+
+    def index_for(self, node: Folder | Asset | None) -> QModelIndex:
+        """Index of 'node', or an invalid index if it is not shown as a row."""
+        if node is None or node is self._root:
+            return QModelIndex()
+        parent = self._parent_of(node)
+        rows = self._rows.get(parent.path) if parent else None
+        if not rows:
+            return QModelIndex()
+        if parent.path in self._stale:
+            self._reindex(rows)
+            self._stale.discard(parent.path)
+        row = self._positions.get(id(node))
+        if row is None or row >= len(rows) or rows[row] is not node:
+            return QModelIndex()
+        return self.createIndex(row, 0, node)
+
+    def _reindex(self, rows: list[Folder | Asset]) -> None:
+        for row, child in enumerate(rows):
+            self._positions[id(child)] = row
+
+    def root(self) -> Folder | None:
+        return self._root
+
+    def set_root(self, root: Folder | None) -> None:
+        self.beginResetModel()
+        self._root = root
+        self._rows.clear()
+        self._positions.clear()
+        self._stale.clear()
+        self.endResetModel()
+        if root is not None:
+            self.fetchMore(QModelIndex())
+
+    # ------------------------
+    # QAbstractItemModel
+    # ------------------------
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        rows = self._rows.get(node.path) if isinstance(node, Folder) else None
+        if column != 0 or not rows or not 0 <= row < len(rows):
+            return QModelIndex()
+        return self.createIndex(row, column, rows[row])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_for(self._parent_of(index.internalPointer()))
+
+    def rowCount(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if not isinstance(node, Folder):
+            return 0
+        return len(self._rows.get(node.path, ()))
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if not isinstance(node, Folder):
+            return False
+        if node.path in self._rows:
+            return bool(self._rows[node.path])
+        return bool(node.unloaded or self._children(node))
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return isinstance(node, Folder) and node.path not in self._rows
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if not isinstance(node, Folder) or node.path in self._rows:
+            return
+        if node.unloaded is not None:
+            self.conduit.load_children(node)
+        children = self._children(node)
+        if not children:
+            self._rows[node.path] = []
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        self._rows[node.path] = children
+        self._reindex(children)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name if isinstance(node, Asset) else node.path.name
+        if role == Qt.DecorationRole:
+            return self._asset_icon if isinstance(node, Asset) else self._folder_icon
+        if role == Qt.UserRole:
+            return node
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return "Folders"
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # ------------------------
+    # Incremental updates
+    # ------------------------
+
+    def _forget(self, node: Folder | Asset) -> None:
+        """Drop the cached rows of 'node' and everything below it."""
+        self._positions.pop(id(node), None)
+        if not isinstance(node, Folder):
+            return
+        stack = [node]
+        while stack:
+            folder = stack.pop()
+            for child in self._rows.pop(folder.path, None) or ():
+                self._positions.pop(id(child), None)
+                if isinstance(child, Folder):
+                    stack.append(child)
+
+    def sync_folder(self, folder: Folder) -> None:
+        """
+        Bring the rows below 'folder' in line with the project tree.
+
+        Only the rows that differ are removed or inserted, so expansion state
+        and selection of everything else are kept. Folders that were never
+        expanded are left alone.
+        """
+        rows = self._rows.get(folder.path)
+        if rows is None:
+            return
+        parent_index = self.index_for(folder)
+        if folder is not self._root and not parent_index.isValid():
+            return
+
+        wanted = self._children(folder)
+        wanted_ids = {id(child) for child in wanted}
+
+        # rows are removed and inserted in contiguous runs and the positions
+        # are only rebuilt once at the end (or on demand by `index_for`)
+        end = len(rows)
+        while end > 0:
+            if id(rows[end - 1]) in wanted_ids:
+                end -= 1
+                continue
+            start = end - 1
+            while start > 0 and id(rows[start - 1]) not in wanted_ids:
+                start -= 1
+            self.beginRemoveRows(parent_index, start, end - 1)
+            for child in rows[start:end]:
+                self._forget(child)
+            del rows[start:end]
+            self._stale.add(folder.path)
+            self.endRemoveRows()
+            end = start
+
+        shown_ids = {id(child) for child in rows}
+        start = 0
+        while start < len(wanted):
+            if id(wanted[start]) in shown_ids:
+                start += 1
+                continue
+            end = start + 1
+            while end < len(wanted) and id(wanted[end]) not in shown_ids:
+                end += 1
+            row = min(start, len(rows))
+            self.beginInsertRows(parent_index, row, row + end - start - 1)
+            rows[row:row] = wanted[start:end]
+            self._stale.add(folder.path)
+            self.endInsertRows()
+            start = end
+
+        self._reindex(rows)
+        self._stale.discard(folder.path)
+
+        if any(a is not b for a, b in zip(rows, wanted)):
+            self._reorder(parent_index, rows, wanted)
+
+    def _reorder(
+        self,
+        parent_index: QModelIndex,
+        rows: list[Folder | Asset],
+        wanted: list[Folder | Asset],
+    ) -> None:
+        parent = QPersistentModelIndex(parent_index)
+        self.layoutAboutToBeChanged.emit([parent])
+        new_row = {id(child): row for row, child in enumerate(wanted)}
+        old = [index for index in self.persistentIndexList()
+               if index.parent() == parent_index]
+        moved = [(index, new_row[id(rows[index.row()])]) for index in old]
+        rows[:] = wanted
+        self._reindex(rows)
+        for index, row in moved:
+            self.changePersistentIndex(
+                index, self.createIndex(row, index.column(), rows[row])
+            )
+        self.layoutChanged.emit([parent])
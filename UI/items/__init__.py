@@ -1,5 +1,5 @@
-from .FolderItem import FolderItem
-from .AssetItem import AssetItem
-from .FileItem import FileItem
+from .FileListModel import FileListModel
+from .FileItemDelegate import FileItemDelegate
+from .ProjectTreeModel import ProjectTreeModel
 
-__all__ = ["FolderItem", "AssetItem", "FileItem"]
+__all__ = ["FileListModel", "FileItemDelegate", "ProjectTreeModel"]
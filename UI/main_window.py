@@ -9,13 +9,13 @@ from PySide6.QtWidgets import (
     QInputDialog,
     QMessageBox,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, Signal, QThreadPool
 import sys
 import os
 import subprocess
 from pathlib import Path
 from Core.ProjectModel import Folder, Asset
-from Core.Settings import Constants
+from Core.Settings import Constants, Settings_entry
 from UI.main_window_layout.Folder import FolderPane
 from UI.main_window_layout.Tasks import TaskPane
 from UI.main_window_layout.Files import FilePane
@@ -23,6 +23,15 @@ from UI.items.TitleBar import CustomTitleBar
 from UI.main_window_layout.Buttons import Buttons
 from UI.settings_window import SettingsWindow
 from UI.console_window import ConsoleWindow
+from UI.ProjectLoader import ProjectLoader
+from Core.QLogger import log
+
+
+class _ProjectSignals(QObject):
+    """Carries background project results over to the UI thread."""
+
+    revalidated = Signal(object, object)
+    changed = Signal(object, object, object)
 
 
 class MainWindow(QMainWindow):
@@ -100,15 +109,107 @@ class MainWindow(QMainWindow):
 
         # Connect signals
         self.folder_pane.tree_view.clicked.connect(self.on_folder_selected)
+        self.folder_pane.search_results.itemActivated.connect(self.on_search_result)
+        self.folder_pane.search_results.itemClicked.connect(self.on_search_result)
+        self.folder_pane.search_box.returnPressed.connect(
+            lambda: self.on_search_result(self.folder_pane.search_results.item(0))
+        )
         self.task_pane.list_widget.itemClicked.connect(self.on_task_selected)
 
+        self._project_signals = _ProjectSignals()
+        self._project_signals.revalidated.connect(self.on_project_revalidated)
+        self._project_signals.changed.connect(self.on_project_changed)
+        self._loader: ProjectLoader | None = None
+
         self.refresh_ui()
 
     # Populate tree
     def refresh_ui(self):
-        project = self.conduit.load_project()
-        if project:
-            self.folder_pane.refresh_ui_tree(project.root)
+        """
+        Rescan the shown project in the background and patch only the rows that
+        changed. Loads the project from scratch if none is shown yet or the
+        project directory was changed in the settings.
+        """
+        project = self.conduit.project
+        root = self.settings.get(Settings_entry.PROJECT_DIRECTORY.value)
+        if (
+            project
+            and root
+            and project.root.path == Path(root)
+            and self.folder_pane.model.root() is project.root
+        ):
+            if project.loading:
+                log("Project is still loading", "info")
+                return
+            self.conduit.revalidate_project(
+                self._project_signals.revalidated.emit, full=True
+            )
+            return
+        self.load_project_ui()
+
+    def load_project_ui(self):
+        """
+        Show the configured project. A snapshot is shown right away and checked
+        in the background; without one the tree fills in while a worker scans.
+        """
+        self.cancel_project_load()
+        self.conduit.stop_watching()
+        project = self.conduit.load_project(stream=True)
+        if not project:
+            return
+        self.folder_pane.refresh_ui_tree(project.root)
+
+        if not project.loading:
+            self.conduit.revalidate_project(self._project_signals.revalidated.emit)
+            self.conduit.start_watching(self._project_signals.changed.emit)
+            return
+
+        lazy = bool(self.settings.get(Settings_entry.LAZY_SCAN.value, False))
+        self._loader = ProjectLoader(project, lazy=lazy)
+        self._loader.signals.batch.connect(self.on_project_batch)
+        self._loader.signals.finished.connect(self.on_project_loaded)
+        QThreadPool.globalInstance().start(self._loader)
+
+    def cancel_project_load(self):
+        """Stop a running background scan, e.g. when the project directory changed."""
+        if self._loader is not None:
+            self._loader.cancel()
+            self._loader = None
+
+    def on_project_batch(self, project, batch):
+        changes = self.conduit.attach_project_batch(project, batch)
+        if changes:
+            self.folder_pane.apply_changes(changes)
+
+    def on_project_loaded(self, project):
+        if self._loader is None or self._loader.project is not project:
+            return
+        self._loader = None
+        self.conduit.finish_project_load(project)
+        if project is self.conduit.project:
+            self.conduit.start_watching(self._project_signals.changed.emit)
+
+    def on_project_revalidated(self, project, updates):
+        changes = self.conduit.apply_project_updates(project, updates)
+        self.apply_project_changes(changes)
+
+    def on_project_changed(self, project, updates, changed_dirs):
+        changes = self.conduit.apply_project_updates(project, updates)
+        self.apply_project_changes(changes)
+
+        task = self.conduit.selected_task
+        if task and task.path in changed_dirs:
+            self.file_pane.populate_files(task)
+
+    def apply_project_changes(self, changes):
+        """Patch the panes with changes from `Conduit.apply_project_updates`."""
+        if not changes:
+            return
+        self.folder_pane.apply_changes(changes)
+        asset = self.conduit.selected_asset
+        for kind, _, node in changes:
+            if node is asset:
+                self.task_pane.populate_tasks([] if kind == "removed" else asset.tasks)
 
     def open_settings(self):
         self.settings_window = SettingsWindow(settings=self.settings, parent=self)
@@ -128,6 +229,24 @@ class MainWindow(QMainWindow):
         if isinstance(node, Asset):
             self.conduit.set_selected_asset(node)
 
+    def on_search_result(self, item):
+        if item is None:
+            return
+        result = item.data(Qt.UserRole)
+        node = self.folder_pane.reveal(result.path)
+        if node is None:
+            log(f"{result.path} is not in the project tree", "warning")
+            return
+        self.on_folder_selected(None)
+        if result.kind != "task":
+            return
+        tasks = self.task_pane.list_widget
+        for row in range(tasks.count()):
+            if tasks.item(row).data(Qt.UserRole).name == result.path.name:
+                tasks.setCurrentRow(row)
+                self.on_task_selected(tasks.item(row))
+                break
+
     def on_task_selected(self, item):
         task = item.data(Qt.UserRole)
         self.conduit.set_seleted_task(task)
@@ -188,7 +307,6 @@ class MainWindow(QMainWindow):
     # Folder / Asset Ops
     # ------------------------
     def add_new_folder(self):
-        index = self.folder_pane.tree_view.currentIndex()
         folder_name, ok = QInputDialog.getText(self, "New Folder", "Enter folder name:")
         if not ok or not folder_name:
             return
@@ -197,9 +315,7 @@ class MainWindow(QMainWindow):
         new_node = self.conduit.create_folder(folder_name, parent_folder)
 
         # Add new node to tree view
-        self.folder_pane.add_Folder_item(
-            self.folder_pane.model.itemFromIndex(index), new_node
-        )
+        self.folder_pane.refresh_folder(new_node.parent)
 
     def add_new_asset(self):
         node: Folder = self.folder_pane.get_selected_node()
@@ -212,10 +328,7 @@ class MainWindow(QMainWindow):
 
         print(f"Asset Name: {type(asset_name)}")
         new_asset = self.conduit.create_asset(name=asset_name, parent=node)
-        parent_item = self.folder_pane.model.itemFromIndex(
-            self.folder_pane.tree_view.currentIndex()
-        )
-        self.folder_pane.add_Asset_item(parent_item=parent_item, asset=new_asset)
+        self.folder_pane.refresh_folder(new_asset.folder)
 
     def delete_selected(self):
         node = self.folder_pane.get_selected_node()
@@ -231,11 +344,9 @@ class MainWindow(QMainWindow):
         if confirm != QMessageBox.Yes:
             return
 
+        parent = node.folder if isinstance(node, Asset) else node.parent
         self.conduit.delete_node(node)
-        self.folder_pane.remove_Row(
-            self.folder_pane.tree_view.currentIndex().row(),
-            self.folder_pane.tree_view.currentIndex().parent(),
-        )
+        self.folder_pane.refresh_folder(parent)
 
     def add_task_to_selected_asset(self, task_type):
         asset = self.folder_pane.get_selected_node()
@@ -1,15 +1,21 @@
+from PySide6.QtCore import QObject, Signal
 from PySide6.QtWidgets import (
     QGroupBox,
     QVBoxLayout,
     QPushButton,
 )
 from Core.BlenderCommands import get_blender_commands
-from Core.BlenderClient import get_heartbeat
+from Core.BlenderClient import get_client, get_heartbeat
 from pathlib import Path
 from Core.Conduit import get_conduit
 from Core.QLogger import log
 
 
+class _HeartbeatSignals(QObject):
+    # emitted from the heartbeat thread, delivered queued on the UI thread
+    changed = Signal(bool)
+
+
 class Buttons:
     """
     Encapsulates the Files pane: layout + model + population logic.
@@ -29,10 +35,11 @@ class Buttons:
     def link_file_btn(self) -> QPushButton:
         button = QPushButton("Link into Blender")
         button.clicked.connect(self.link_file)
-        button.setDisabled(True)
-        if get_heartbeat():
-            print(True)
-            button.setDisabled(False)
+        # the cached heartbeat state; later changes arrive through the signal
+        button.setEnabled(get_heartbeat())
+        self._heartbeat = _HeartbeatSignals()
+        self._heartbeat.changed.connect(button.setEnabled)
+        get_client().add_listener(self._heartbeat.changed.emit)
         return button
 
     def export_file_btn(self) -> QPushButton:
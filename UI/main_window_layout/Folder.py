@@ -1,14 +1,21 @@
 # UI/Folder.py
-from PySide6.QtWidgets import QGroupBox, QVBoxLayout, QTreeView
-from PySide6.QtGui import QStandardItemModel
-from PySide6.QtCore import Qt
-
-from UI.items import FolderItem
-from UI.items import AssetItem
+from pathlib import Path
+from PySide6.QtWidgets import (
+    QGroupBox,
+    QVBoxLayout,
+    QTreeView,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+)
+from PySide6.QtCore import Qt, QModelIndex
+
+from UI.items import ProjectTreeModel
+from UI.IconCache import get_icon_cache
 from Core import Conduit
 
 
-from Core.ProjectModel import Folder, Asset
+from Core.ProjectModel import Folder, Asset, ProjectChange
 
 
 class FolderPane:
@@ -22,9 +29,18 @@ class FolderPane:
         self.group_box = QGroupBox("Folders")
         layout = QVBoxLayout(self.group_box)
 
+        # --- Search ---
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search assets and tasks")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_results = QListWidget()
+        self.search_results.hide()
+        self.search_box.textChanged.connect(self.update_search)
+        layout.addWidget(self.search_box)
+        layout.addWidget(self.search_results)
+
         self.tree_view = QTreeView()
-        self.model = QStandardItemModel()
-        self.model.setHorizontalHeaderLabels(["Folders"])
+        self.model = ProjectTreeModel(conduit)
         self.tree_view.setHeaderHidden(True)
         self.tree_view.setModel(self.model)
 
@@ -33,56 +49,77 @@ class FolderPane:
     def widget(self):
         return self.group_box
 
-    def root_item(self):
-        return self.model.invisibleRootItem()
-
-    def populate_tree(self, parent_item, folder_node):
-        """Recursive function only — never clears."""
-        for f in folder_node.subfolders:
-            item = FolderItem(f)
-            item.setData(f, Qt.UserRole)
-            parent_item.appendRow(item)
-            self.conduit.logger.log(f"{f.path} was added to UI", "noise")
-
-            # Add assets
-            for asset in f.assets:
-                asset_item = AssetItem(asset)
-                asset_item.setData(asset, Qt.UserRole)
-                self.conduit.logger.log(f"{asset.name} was added to UI", "noise")
-                item.appendRow(asset_item)
-
-            # Recurse into subfolders
-            self.populate_tree(item, f)
-
-    def refresh_ui_tree(self, folder_node):
-        """Public entry point — clears model and starts fresh population."""
-        self.model.clear()
-        self.model.setHorizontalHeaderLabels(["Folders"])
-        root = self.model.invisibleRootItem()
-        self.populate_tree(root, folder_node)
+    def refresh_ui_tree(self, folder_node: Folder):
+        """Public entry point — shows 'folder_node'; branches load when expanded."""
+        self.model.set_root(folder_node)
         self.conduit.logger.log("Project Tree Loaded", "success")
 
-    def get_selected_node(self):
+    def refresh_folder(self, folder: Folder | None) -> None:
+        """Insert/remove the rows below 'folder' that changed in the project."""
+        if folder is not None:
+            self.model.sync_folder(folder)
+
+    def apply_changes(self, changes: list[ProjectChange]) -> None:
+        """Patch the rows of folders reported by `ProjectModel.apply_updates`."""
+        synced = set()
+        for kind, parent, node in changes:
+            if kind == "tasks" or id(parent) in synced:
+                continue
+            synced.add(id(parent))
+            self.refresh_folder(parent)
+
+    SEARCH_LIMIT = 50
+
+    def update_search(self, text: str) -> None:
+        """Show the best matches for 'text' below the search box."""
+        self.search_results.clear()
+        if not text.strip():
+            self.search_results.hide()
+            return
+        root = self.model.root()
+        icons = get_icon_cache()
+        for result in self.conduit.search(text, self.SEARCH_LIMIT):
+            where = result.path.parent
+            if root is not None and where.is_relative_to(root.path):
+                where = where.relative_to(root.path)
+            item = QListWidgetItem(f"{result.name}  —  {where}")
+            item.setIcon(icons.icon("asset.png" if result.kind == "asset" else "folder.png"))
+            item.setData(Qt.UserRole, result)
+            self.search_results.addItem(item)
+        self.search_results.setVisible(self.search_results.count() > 0)
+
+    def reveal(self, path: Path) -> Folder | Asset | None:
+        """
+        Expand the tree down to 'path' and select it, loading folders on the
+        way. For a task path the asset is selected. Returns the selected node.
+        """
+        project = self.conduit.project
+        root = self.model.root()
+        if project is None or root is None or not path.is_relative_to(root.path):
+            return None
+        node: Folder | Asset = root
+        index = QModelIndex()
+        current = root.path
+        for part in path.relative_to(root.path).parts:
+            if not isinstance(node, Folder):
+                break
+            if self.model.canFetchMore(index):
+                self.model.fetchMore(index)
+            current = current / part
+            child = project.find(current)
+            child_index = self.model.index_for(child) if child else QModelIndex()
+            if not child_index.isValid():
+                return None
+            if index.isValid():
+                self.tree_view.expand(index)
+            node, index = child, child_index
+        self.tree_view.scrollTo(index)
+        self.tree_view.setCurrentIndex(index)
+        return node
+
+    def get_selected_node(self) -> Folder | Asset | None:
         """Return the Folder/Asset object of the currently selected item."""
         indexes = self.tree_view.selectedIndexes()
         if not indexes:
             return None
-        item = self.model.itemFromIndex(indexes[0])
-        return item.data(Qt.UserRole)
-
-    def add_Asset_item(self, parent_item, asset: Asset):
-        asset_item = AssetItem(asset)
-        asset_item.setData(asset, Qt.UserRole)
-        parent_item.appendRow(asset_item)
-
-    def add_Folder_item(self, parent_item: Folder | None, folder: Folder):
-        folder_item = FolderItem(folder)
-        folder_item.setData(folder, Qt.UserRole)
-        if parent_item:
-            parent_item.appendRow(folder_item)
-        else:
-            print("no root selected")
-            self.root_item().appendRow(folder_item)
-
-    def remove_Row(self, row, parent_index):
-        self.model.removeRow(row, parent_index)
+        return self.model.node(indexes[0])
@@ -34,6 +34,7 @@ class SettingsWindow(QMainWindow):
 
         # global fields
         self.settings = settings
+        self.main_window = parent
 
         # adding widgets
         layout.addWidget(self.settings_window_layout())
@@ -130,6 +131,9 @@ class SettingsWindow(QMainWindow):
         self.unity_directory.setText(str(unity_dir))
 
     def save_settings(self) -> None:
+        old_project_directory = self.settings.get(
+            Settings_entry.PROJECT_DIRECTORY.value
+        )
         self.settings.set(
             Settings_entry.PROJECT_DIRECTORY.value, self.project_directory.text()
         )
@@ -140,3 +144,10 @@ class SettingsWindow(QMainWindow):
             Settings_entry.THEME.value, self.theme_combo_box.currentText()
         )
         self.settings.save()
+
+        # a different project: drop any scan still running and load the new one
+        new_project_directory = self.project_directory.text()
+        if new_project_directory != str(old_project_directory) and hasattr(
+            self.main_window, "load_project_ui"
+        ):
+            self.main_window.load_project_ui()
@@ -1,5 +1,8 @@
 import builtins
+import json
 import socket
+import threading
+import time
 import pytest
 from Core.BlenderClient import BlenderClient
 
@@ -73,3 +76,212 @@ def test_test_connection_failure(monkeypatch):
 
     connector = BlenderClient(host='127.0.0.1', port=9000)
     assert connector.test_connection() is False
+
+
+class FakeBlender:
+    """Newline-JSON server standing in for the Blender add-on."""
+
+    def __init__(self, latency=0.0, echo_ids=True, batch=True, one_shot=False, newline=True):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        # every reply is sent 'latency' seconds after its request arrived, so
+        # pipelined replies can overtake each other
+        self.latency = latency
+        self.echo_ids = echo_ids
+        self.batch = batch
+        # like older add-ons: answer one message, then close the connection
+        self.one_shot = one_shot
+        # False: replies are not ended by a newline, only by closing (one_shot)
+        self.newline = newline
+        self.connections = 0
+        self.received = []
+        self._clients = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._clients.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        lock = threading.Lock()
+
+        def answer(payload):
+            if payload["cmd"] == "hello":
+                return {"status": "error", "msg": "unknown command"}
+            if payload["cmd"] == "batch":
+                if not self.batch:
+                    return {"status": "error", "msg": "unknown command"}
+                return {"status": "ok", "reply": [answer(p) for p in payload["commands"]]}
+            return {"status": "ok", "reply": "pong" if payload["cmd"] == "ping" else payload["cmd"]}
+
+        def reply(payload):
+            reply = answer(payload)
+            if self.echo_ids:
+                reply["id"] = payload.get("id")
+            with lock:
+                try:
+                    conn.sendall((json.dumps(reply) + "\n" * self.newline).encode("utf-8"))
+                except OSError:
+                    pass
+
+        with conn, conn.makefile("rb") as lines:
+            for line in lines:
+                payload = json.loads(line)
+                if payload["cmd"] != "hello":
+                    self.received.append(payload)
+                if self.one_shot:
+                    reply(payload)
+                    break
+                if self.latency:
+                    threading.Timer(self.latency, reply, (payload,)).start()
+                else:
+                    reply(payload)
+
+    def drop_clients(self):
+        for conn in self._clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # already closed by the client
+        self._clients.clear()
+
+    def close(self):
+        self.sock.close()
+        self.drop_clients()
+
+
+@pytest.fixture
+def blender():
+    server = FakeBlender()
+    yield server
+    server.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_persistent_connection_and_reconnect(blender):
+    client = BlenderClient(port=blender.port, interval=0.05)
+    client.BACKOFF_MIN = 0.05
+    states = []
+    client.add_listener(states.append)
+    client.connect()
+    try:
+        wait_for(lambda: client.alive)
+        for i in range(5):
+            assert client.send("bpy.ops.conduit.link(path='x')")["status"] == "ok"
+        assert blender.connections == 1
+
+        blender.drop_clients()
+        wait_for(lambda: blender.connections == 2)
+        wait_for(lambda: client.alive)
+        assert states[0] is True
+    finally:
+        client.stop()
+
+
+def test_heartbeat_without_blender_does_not_block():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]  # nothing listens here
+    client = BlenderClient(port=port)
+    client.connect()
+    try:
+        start = time.time()
+        assert client.alive is False
+        assert time.time() - start < 0.1
+        wait_for(lambda: client._alive is False)
+    finally:
+        client.stop()
+
+
+def test_requests_are_multiplexed(blender):
+    blender.latency = 0.05
+    client = BlenderClient(port=blender.port)
+    try:
+        commands = [f"bpy.ops.conduit.link(path='{i}')" for i in range(20)]
+        start = time.time()
+        replies = client.send_many(commands)
+        pipelined = time.time() - start
+        assert [r["reply"] for r in replies] == commands
+        assert pipelined < 10 * blender.latency  # about one round-trip, not 20
+
+        futures = [client.request(command) for command in commands[:3]]
+        assert [f.result(2)["reply"] for f in futures] == commands[:3]
+        assert blender.connections == 1
+    finally:
+        client.stop()
+
+
+def test_replies_without_ids_are_matched_in_order():
+    server = FakeBlender(echo_ids=False)
+    client = BlenderClient(port=server.port)
+    try:
+        replies = client.send_many(["a", "b", "c"])
+        assert [r["reply"] for r in replies] == ["a", "b", "c"]
+        assert client.send("ping")["reply"] == "pong"
+    finally:
+        client.stop()
+        server.close()
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_send_batch(batch):
+    server = FakeBlender(batch=batch)
+    client = BlenderClient(port=server.port)
+    try:
+        replies = client.send_batch(["a", ("b", {"path": "x"})])
+        assert [r["reply"] for r in replies] == ["a", "b"]
+        # one envelope, or the batch attempt plus the pipelined fallback
+        assert len(server.received) == (1 if batch else 3)
+    finally:
+        client.stop()
+        server.close()
+
+
+@pytest.mark.parametrize("newline", [True, False])
+def test_add_on_closing_after_every_reply(newline):
+    server = FakeBlender(echo_ids=False, one_shot=True, newline=newline)
+    client = BlenderClient(port=server.port, interval=0.05)
+    states = []
+    client.add_listener(states.append)
+    client.connect()
+    try:
+        wait_for(lambda: client.alive)
+        for i in range(10):
+            assert client.send(f"link {i}")["reply"] == f"link {i}"
+        assert [r["reply"] for r in client.send_many(["a", "b"])] == ["a", "b"]
+        assert states == [True]
+
+        # requests right after a disconnect open a connection themselves
+        server.drop_clients()
+        assert client.send("after")["reply"] == "after"
+        assert states == [True]
+    finally:
+        client.stop()
+        server.close()
+
+
+def test_requests_reconnect_without_waiting_for_the_heartbeat(blender):
+    client = BlenderClient(port=blender.port, interval=60)
+    client.connect()
+    try:
+        wait_for(lambda: client.alive)
+        blender.drop_clients()
+        wait_for(lambda: client._sock is None)
+        # the heartbeat sleeps for another minute
+        assert client.send("link")["reply"] == "link"
+        assert blender.connections == 2
+    finally:
+        client.stop()
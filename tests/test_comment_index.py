@@ -0,0 +1,87 @@
+from Core import TaskMetadata
+from Core.CommentIndex import CommentIndex
+
+
+def record(file, user, comment, time):
+    return {"file": file, "version": 1, "user": user, "comment": comment, "time": time}
+
+
+def build(root):
+    chair = root / "props" / "chair" / "modelling"
+    soldier = root / "chars" / "soldier" / "modelling"
+    for task in (chair, soldier):
+        task.mkdir(parents=True)
+    (root / "props" / "chair" / "chair.sidecar").touch()
+    (root / "chars" / "soldier" / "soldier.sidecar").touch()
+    TaskMetadata.append_records(chair, [
+        record("chair_modelling_001.blend", "anna", "UV fix on the legs", 1),
+        record("chair_modelling_002.blend", "bob", "fix UV seams", 2),
+    ])
+    TaskMetadata.append_records(soldier, [
+        record("soldier_modelling_001.blend", "Anna", "blockout, UV fix later", 3),
+    ])
+    return chair, soldier
+
+
+def test_words_phrases_and_users(tmp_path):
+    chair, soldier = build(tmp_path)
+    index = CommentIndex()
+    assert index.build(tmp_path)
+    assert len(index) == 3
+
+    assert [h.file for h in index.search("uv fix")] == [
+        "soldier_modelling_001.blend", "chair_modelling_002.blend", "chair_modelling_001.blend",
+    ]
+    assert [h.user for h in index.search("'UV fix'", user="anna")] == ["Anna", "anna"]
+    assert [h.task for h in index.search(user="ANNA", path=tmp_path / "props")] == [chair]
+    assert index.search("") == []
+
+
+def test_updates_replace_and_remove(tmp_path):
+    chair, soldier = build(tmp_path)
+    index = CommentIndex()
+    index.build(tmp_path)
+
+    # a newer record for the same file wins, as in the store
+    index.add_records(chair, [record("chair_modelling_002.blend", "bob", "final", 4)])
+    assert [h.comment for h in index.search(user="bob")] == ["final"]
+    assert index.search("seams") == []
+
+    index.remove(tmp_path / "chars")
+    assert [h.task for h in index.search("uv")] == [chair]
+    index.index_tasks([soldier])
+    assert len(index.search("blockout")) == 1
+
+
+def test_saved_index_only_reads_changed_tasks(tmp_path, monkeypatch):
+    chair, soldier = build(tmp_path)
+    index = CommentIndex()
+    assert index.build(tmp_path)
+    saved = tmp_path / "comment_index.json"
+    index.save(saved)
+
+    TaskMetadata.append_records(chair, [record("chair_modelling_003.blend", "cid", "retopo", 5)])
+    lamp = tmp_path / "props" / "lamp" / "modelling"
+    lamp.mkdir(parents=True)
+    TaskMetadata.append_records(lamp, [record("lamp_modelling_001.blend", "cid", "bulb", 6)])
+
+    read = []
+    load = TaskMetadata.load_task_metadata
+    monkeypatch.setattr(
+        TaskMetadata, "load_task_metadata", lambda task, **kw: read.append(task) or load(task, **kw)
+    )
+    loaded = CommentIndex()
+    assert loaded.load(saved)
+    assert len(loaded) == 3 and not read
+    # the soldier is not part of the project any more
+    assert loaded.refresh([chair, lamp])
+    assert sorted(read) == sorted([chair, lamp])
+    assert [h.comment for h in loaded.search(user="cid")] == ["bulb", "retopo"]
+    assert loaded.search("blockout") == []
+
+    read.clear()
+    loaded.save(saved)
+    again = CommentIndex()
+    assert again.load(saved) and again.refresh([chair, lamp])
+    assert read == [] and len(again) == 4
+    assert not CommentIndex().load(tmp_path / "missing.json")
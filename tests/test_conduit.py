@@ -2,6 +2,7 @@ import pytest
 from pathlib import Path
 from Core import Conduit
 from Core import Settings
+from Core import TaskMetadata
 from Core.ProjectModel import Folder, Asset, Task
 
 
@@ -112,3 +113,34 @@ def test_set_selected_asset_and_task(conduit):
 
     assert conduit.selected_asset == asset
     assert conduit.selected_task == task
+
+
+def test_conduit_without_autoload(tmp_project):
+    settings = DummySettings(project_directory=str(tmp_project))
+    conduit = Conduit(settings, autoload=False)
+    assert conduit.project is None
+
+    project = conduit.load_project(stream=True)
+    assert project.loading
+    for batch in project.scan_batches(tmp_project):
+        conduit.attach_project_batch(project, batch)
+    conduit.finish_project_load(project)
+    assert not project.loading
+
+
+def test_add_new_task_file_numbers_versions(conduit, tmp_project, tmp_path):
+    task_dir = tmp_project / "chars" / "soldier" / "modelling"
+    task_dir.mkdir(parents=True)
+    (task_dir / "soldier_modelling_007.blend").touch()
+    task = Task(task_dir)
+    source = tmp_path / "empty.blend"
+    source.touch()
+
+    assert conduit.get_latest_task_version(task) == "008"
+    conduit.add_new_task_file(source, task)
+    assert (task_dir / "soldier_modelling_008.blend").exists()
+    records = TaskMetadata.read_records(task_dir)
+    assert records["soldier_modelling_008.blend"]["version"] == 8
+    user = records["soldier_modelling_008.blend"]["user"]
+    assert [h.file for h in conduit.search_versions(user=user)] == ["soldier_modelling_008.blend"]
+    assert conduit.get_latest_task_version(task) == "009"
@@ -1,4 +1,16 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from Core import Framing, TaskMetadata
+from Core.BlenderClient import BlenderClient
 from Core.ConduitServer import ConduitServer
+from Core.ProjectModel import ProjectModel
+from Core.SearchIndex import SearchIndex
 from types import SimpleNamespace
 from Core.QLogger import get_logger
 
@@ -25,4 +37,341 @@ def test_conduitserver_routes_and_port(monkeypatch):
     assert '/asset' in paths
     assert '/task' in paths
 
-    assert server.port == 8000
\ No newline at end of file
+    assert server.port == 8000
+
+@pytest.fixture
+def async_server():
+    server = ConduitServer()
+    server.start(port=0, use_asyncio=True)
+    yield server
+    server.stop()
+
+
+def connect(server):
+    sock = socket.create_connection(("127.0.0.1", server.port), timeout=2)
+    return sock, sock.makefile("rb")
+
+
+def test_asyncio_mode_serves_streams(async_server):
+    sock, replies = connect(async_server)
+    with sock, replies:
+        sock.sendall(b'{"cmd": "hello", "framing": "newline"}\n{"cmd": "ping"}\n')
+        assert json.loads(replies.readline()) == {"status": "ok", "framing": "newline"}
+        sock.sendall(b'{"cmd": "status", "id": 7}\nnot json\n{"cmd": "nope"}\n')
+        assert json.loads(replies.readline()) == {"status": "ok", "reply": "pong"}
+        assert json.loads(replies.readline()) == {"status": "ok", "reply": "running", "id": 7}
+        assert json.loads(replies.readline())["msg"] == "invalid json"
+        assert json.loads(replies.readline())["msg"] == "unknown command"
+        # the connection stays open for more
+        sock.sendall(b'{"cmd": "ping"}\n')
+        assert json.loads(replies.readline())["reply"] == "pong"
+
+
+@pytest.mark.parametrize("use_asyncio", [True, False])
+def test_legacy_client_reading_until_eof(use_asyncio):
+    server = ConduitServer()
+    server.start(port=0, use_asyncio=use_asyncio)
+    try:
+        for request in (b'{"cmd": "ping"}\n', b'{"cmd": "nope"}\n', b"not json\n"):
+            sock = socket.create_connection(("127.0.0.1", server.port), timeout=2)
+            with sock:
+                start = time.monotonic()
+                sock.sendall(request)
+                data = b""
+                while chunk := sock.recv(1024):
+                    data += chunk
+                # the server closes the connection right after its reply
+                assert time.monotonic() - start < 0.5
+            assert json.loads(data)["status"] in ("ok", "error")
+            if request.startswith(b'{"cmd": "ping"'):
+                assert data == b'{"status": "ok", "reply": "pong"}'
+    finally:
+        server.stop()
+
+
+def test_asyncio_mode_slow_client_does_not_stall_others(async_server):
+    slow, _ = connect(async_server)
+    with slow:
+        slow.sendall(b'{"cmd": "pi')  # never finishes its line
+        for _ in range(3):
+            sock, replies = connect(async_server)
+            with sock, replies:
+                sock.sendall(b'{"cmd": "ping"}\n')
+                assert json.loads(replies.readline())["reply"] == "pong"
+
+
+def test_slow_handlers_do_not_hold_up_pings(async_server):
+    release = threading.Event()
+
+    def handle_slow(conn, args):
+        release.wait(5)
+        conn.sendall(json.dumps({"status": "ok", "reply": "done"}).encode("utf-8"))
+
+    async_server.commands["slow"] = handle_slow
+    async_server.COMMAND_LIMITS = {"slow": 1}
+    async_server.COMMAND_TIMEOUTS = {"slow": 0.3}
+
+    sock, replies = connect(async_server)
+    with sock, replies:
+        sock.sendall(b'{"cmd": "slow", "id": 1}\n{"cmd": "slow", "id": 2}\n{"cmd": "ping", "id": 3}\n')
+        # the ping overtakes both, the second slow call never gets a slot
+        assert json.loads(replies.readline()) == {"status": "ok", "reply": "pong", "id": 3}
+        timed_out = [json.loads(replies.readline()) for _ in range(2)]
+        assert sorted(r["id"] for r in timed_out) == [1, 2]
+        assert all(r["msg"] == "slow timed out" for r in timed_out)
+
+        # a late reply of the first call is dropped
+        release.set()
+        sock.sendall(b'{"cmd": "slow", "id": 4}\n')
+        assert json.loads(replies.readline()) == {"status": "ok", "reply": "done", "id": 4}
+
+
+def test_threaded_mode_waits_for_slots_off_the_pool():
+    release = threading.Event()
+
+    def handle_slow(conn, args):
+        release.wait(5)
+        conn.sendall(b'{"status":"ok","reply":"done"}')
+
+    def handle_quick(conn, args):
+        conn.sendall(b'{"status":"ok","reply":"quick"}')
+
+    server = ConduitServer()
+    server.commands.update(slow=handle_slow, quick=handle_quick)
+    server.COMMAND_LIMITS = {"slow": 1}
+    server.COMMAND_TIMEOUTS = {"slow": 0.5}
+    server.start(port=0)
+    slow = []
+    try:
+        for _ in range(server.HANDLER_WORKERS + 4):
+            sock, replies = connect(server)
+            sock.sendall(b'{"cmd": "slow"}\n')
+            slow.append((sock, replies))
+        sock, replies = connect(server)
+        with sock, replies:
+            start = time.monotonic()
+            sock.sendall(b'{"cmd": "quick"}\n')
+            assert json.loads(replies.read())["reply"] == "quick"
+            assert time.monotonic() - start < 0.3
+        # the running call times out like the waiting ones
+        for sock, replies in slow:
+            assert json.loads(replies.read())["msg"] == "slow timed out"
+    finally:
+        release.set()
+        for sock, replies in slow:
+            sock.close()
+            replies.close()
+        server.stop()
+
+
+def test_batched_commands_share_command_limits(async_server):
+    running, most = [0], [0]
+    lock = threading.Lock()
+
+    def handle_exclusive(conn, args):
+        with lock:
+            running[0] += 1
+            most[0] = max(most[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        conn.sendall(json.dumps({"status": "ok", "reply": args["n"]}).encode("utf-8"))
+
+    async_server.commands["exclusive"] = handle_exclusive
+    async_server.COMMAND_LIMITS = {"exclusive": 1}
+    sock, replies = connect(async_server)
+    with sock, replies:
+        for b in range(3):
+            batch = {"cmd": "batch", "id": b, "commands": [
+                {"cmd": "exclusive", "n": n} for n in range(5)
+            ]}
+            sock.sendall(json.dumps(batch).encode("utf-8") + b"\n")
+        sock.sendall(b'{"cmd": "exclusive", "n": 9, "id": 3}\n')
+        answers = {}
+        for _ in range(4):
+            reply = json.loads(replies.readline())
+            answers[reply["id"]] = reply["reply"]
+    assert most[0] == 1
+    assert [[r["reply"] for r in answers[b]] for b in range(3)] == [list(range(5))] * 3
+    assert answers[3] == 9
+
+
+@pytest.mark.parametrize("use_asyncio", [True, False])
+def test_batch_replies_in_one_message(use_asyncio):
+    server = ConduitServer()
+    server.start(port=0, use_asyncio=use_asyncio)
+    try:
+        sock, replies = connect(server)
+        with sock, replies:
+            batch = {
+                "cmd": "batch",
+                "id": "b1",
+                "commands": [{"cmd": "ping"}, {"cmd": "nope"}, {"cmd": "batch"}, {"cmd": "status"}],
+            }
+            sock.sendall(json.dumps(batch).encode("utf-8") + b"\n")
+            reply = json.loads(replies.readline())
+        assert reply["status"] == "ok"
+        assert [r.get("reply", r.get("msg")) for r in reply["reply"]] == [
+            "pong", "unknown command", "invalid batch entry", "running",
+        ]
+        if use_asyncio:
+            assert reply["id"] == "b1"
+    finally:
+        server.stop()
+
+
+def test_client_negotiates_length_framing(async_server):
+    text = "ü€" * 200_000
+    async_server.commands["big"] = lambda conn, args: conn.sendall(
+        json.dumps({"status": "ok", "reply": text}).encode("utf-8")
+    )
+    for framing in (Framing.LENGTH, Framing.NEWLINE):
+        client = BlenderClient(port=async_server.port, framing=framing)
+        try:
+            assert client.send("ping")["reply"] == "pong"
+            assert client._wire == framing
+            assert client.send("big")["reply"] == text
+        finally:
+            client.stop()
+
+
+@pytest.mark.parametrize("use_asyncio", [True, False])
+def test_characters_split_across_reads(use_asyncio):
+    server = ConduitServer()
+    server.commands["echo"] = lambda conn, args: conn.sendall(
+        json.dumps({"status": "ok", "reply": args["text"]}).encode("utf-8")
+    )
+    server.start(port=0, use_asyncio=use_asyncio)
+    try:
+        sock, replies = connect(server)
+        with sock, replies:
+            data = json.dumps({"cmd": "echo", "text": "ü"}, ensure_ascii=False).encode("utf-8")
+            cut = data.index("ü".encode("utf-8")) + 1
+            sock.sendall(data[:cut])
+            time.sleep(0.05)
+            sock.sendall(data[cut:] + b"\n")
+            assert json.loads(replies.readline())["reply"] == "ü"
+    finally:
+        server.stop()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no Unix sockets")
+def test_local_socket_next_to_tcp(tmp_path):
+    path = ConduitServer.socket_path(tmp_path)
+    path.touch()  # left behind by a crash
+    server = ConduitServer()
+    server.start(port=0, use_asyncio=True, unix_path=path)
+    try:
+        assert server.unix_path == path
+        client = BlenderClient(port=server.port, unix_path=path)
+        assert client.send("status")["reply"] == "running"
+        assert client.transport == "unix"
+        # a second instance leaves the live socket alone
+        other = ConduitServer()
+        other.start(port=0, use_asyncio=True, unix_path=path)
+        assert other.unix_path is None
+        other.stop()
+        assert path.exists()
+        client.stop()
+    finally:
+        server.stop()
+    assert not path.exists()
+    # and with the file gone, clients fall back to TCP
+    server = ConduitServer()
+    server.start(port=0, use_asyncio=True)
+    try:
+        client = BlenderClient(port=server.port, unix_path=path)
+        assert client.send("ping")["reply"] == "pong"
+        assert client.transport == "tcp"
+        client.stop()
+    finally:
+        server.stop()
+
+
+def test_second_instance_on_a_taken_port(tmp_path):
+    first, second = ConduitServer(), ConduitServer()
+    first.start(port=0, use_asyncio=True, unix_path=ConduitServer.socket_path(tmp_path))
+    # another running process stands in for the second instance
+    other_path = ConduitServer.socket_path(tmp_path, os.getppid())
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    stale = ConduitServer.socket_path(tmp_path, dead.pid)
+    stale.touch()
+    try:
+        second.start(port=first.port, use_asyncio=True, unix_path=other_path)
+        assert second.unix_path == other_path
+        assert set(ConduitServer.local_sockets(tmp_path)) == {first.unix_path, other_path}
+        assert not stale.exists()
+        client = BlenderClient(port=first.port, unix_path=other_path)
+        assert client.send("status")["reply"] == "running"
+        assert client.transport == "unix"
+        client.stop()
+    finally:
+        second.stop()
+        first.stop()
+    # without a local socket a taken port is an error, and a clean one
+    server = ConduitServer()
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        for use_asyncio in (True, False):
+            with pytest.raises(OSError):
+                server.start(port=taken.getsockname()[1], use_asyncio=use_asyncio)
+            assert not server._running
+
+
+def test_project_queries_page_with_cursors(tmp_path, monkeypatch):
+    for i in range(5):
+        asset = tmp_path / "props" / f"asset{i}"
+        (asset / "modelling").mkdir(parents=True)
+        (asset / f"asset{i}.sidecar").touch()
+    task = tmp_path / "props" / "asset0" / "modelling"
+    for v in (1, 2, 3, 4):
+        (task / f"asset0_modelling_00{v}.blend").write_bytes(b"x" * v)
+    (task / "asset0_modelling_004.blend1").touch()
+    # version 4 was copied in by hand and is not in the store
+    TaskMetadata.append_records(task, [
+        {"file": f"asset0_modelling_00{v}.blend", "version": v, "user": "anna"} for v in (1, 2, 3)
+    ])
+    # the assets sit in a folder the lazy project never expanded
+    project = ProjectModel(tmp_path, lazy=True)
+    assert project.find(task.parent) is None
+    index = SearchIndex()
+    for batch in ProjectModel.scan_batches(tmp_path):
+        index.add_scans(batch)
+    conduit = SimpleNamespace(project=project, search_index=index, search_ready=True)
+    monkeypatch.setattr(sys.modules[ConduitServer.__module__], "get_conduit", lambda: conduit)
+
+    client = BlenderClient(port=0)
+    server = ConduitServer()
+    server.start(port=0, use_asyncio=True)
+    try:
+        client.port = server.port
+        names, cursor = [], None
+        while True:
+            resp = client.send("list_assets", folder=str(tmp_path / "props"), limit=2, cursor=cursor)
+            assert resp["status"] == "ok" and len(resp["reply"]) <= 2
+            names += [asset["name"] for asset in resp["reply"]]
+            if not (cursor := resp["cursor"]):
+                break
+        assert names == [f"asset{i}" for i in range(5)]
+        assert resp["loading"] is False
+        conduit.search_ready = False
+        assert client.send("list_assets")["loading"] is True
+
+        asset = client.send("get_asset", path=str(task.parent))["reply"]
+        assert asset["tasks"] == [{"name": "modelling", "path": str(task)}]
+        assert client.send("list_tasks", asset=str(task.parent))["reply"][0]["name"] == "modelling"
+
+        first = client.send("list_versions", task=str(task), limit=2)
+        rest = client.send("list_versions", task=str(task), cursor=first["cursor"])
+        versions = first["reply"] + rest["reply"]
+        assert [r["version"] for r in versions] == [1, 2, 3, 4]
+        assert rest["cursor"] is None
+        assert versions[2]["user"] == "anna"
+        assert versions[3]["file"] == "asset0_modelling_004.blend" and versions[3]["size"] == 4
+
+        assert client.send("get_asset", path=str(task))["status"] == "error"
+    finally:
+        client.stop()
+        server.stop()
@@ -0,0 +1,91 @@
+import json
+from Core import TaskMetadata
+from Core.ProjectCatalog import ProjectCatalog, main
+
+
+def make_asset(root, folder, name, tasks=("modelling",)):
+    asset = root / folder / name
+    for task in tasks:
+        (asset / task).mkdir(parents=True)
+    (asset / f"{name}.sidecar").touch()
+    return asset
+
+
+def test_sync_and_queries(tmp_path):
+    root = tmp_path / "project"
+    chair = make_asset(root, "props", "chair", ("modelling", "rigging"))
+    make_asset(root, "chars", "soldier")
+    version = chair / "modelling" / "chair_modelling_002.blend"
+    version.write_bytes(b"x")
+    (chair / "modelling" / "chair_modelling_001.blend").write_bytes(b"y")
+    TaskMetadata.append_records(
+        chair / "modelling", [TaskMetadata.version_record(version, "bob", "hi")]
+    )
+
+    catalog = ProjectCatalog(tmp_path / "catalog.sqlite")
+    assert catalog.sync(root, workers=2)
+
+    assert [a["name"] for a in catalog.assets()] == ["chair", "soldier"]
+    assert [a["name"] for a in catalog.assets("ch%")] == ["chair"]
+    assert [t["name"] for t in catalog.tasks(asset="chair")] == ["modelling", "rigging"]
+    latest = catalog.latest_version(chair / "modelling")
+    assert latest["version"] == 2 and latest["user"] == "bob" and latest["comment"] == "hi"
+    assert [v["file"] for v in catalog.versions(user="bob")] == [version.name]
+
+    # removed directories disappear on the next sync, with their versions
+    for path in sorted((root / "props").rglob("*"), reverse=True):
+        path.rmdir() if path.is_dir() else path.unlink()
+    (root / "props").rmdir()
+    assert catalog.sync(root)
+    assert [a["name"] for a in catalog.assets()] == ["soldier"]
+    assert catalog.versions() == []
+    catalog.close()
+
+
+def test_sync_task_and_cli(tmp_path, capsys):
+    root = tmp_path / "project"
+    task = make_asset(root, "props", "lamp") / "modelling"
+    db = tmp_path / "catalog.sqlite"
+
+    catalog = ProjectCatalog(db)
+    catalog.sync(root)
+    assert catalog.latest_version(task) is None
+    (task / "lamp_modelling_001.blend").touch()
+    catalog.sync_task(task)
+    assert catalog.latest_version(task)["version"] == 1
+    catalog.remove(root / "props")
+    assert catalog.assets() == []
+    catalog.close()
+
+    main([str(db), "sync", str(root)])
+    main([str(db), "versions", "--task", "modelling"])
+    out = capsys.readouterr().out
+    assert json.loads(out.split("\n", 1)[1])[0]["file"] == "lamp_modelling_001.blend"
+
+
+def test_add_version_without_listing_the_task(tmp_path):
+    task = make_asset(tmp_path / "project", "props", "lamp") / "modelling"
+    catalog = ProjectCatalog(tmp_path / "catalog.sqlite")
+    catalog.sync(tmp_path / "project")
+    version = task / "lamp_modelling_002.blend"
+    version.write_bytes(b"lamp")
+    # a file the catalog must not see, since the task is not listed again
+    (task / "lamp_modelling_001.blend").touch()
+    catalog.add_version(task, TaskMetadata.version_record(version, "ann", "shade"))
+    assert [v["file"] for v in catalog.versions()] == [version.name]
+    latest = catalog.latest_version(task)
+    assert latest["user"] == "ann" and latest["comment"] == "shade" and latest["size"] == 4
+    catalog.close()
+
+
+def test_backups_and_sidecars_are_not_versions(tmp_path):
+    task = make_asset(tmp_path / "project", "props", "lamp") / "modelling"
+    (task / "lamp_modelling_003.blend").write_bytes(b"lamp")
+    (task / "lamp_modelling_003.blend1").write_bytes(b"old lamp")
+    (task / "lamp_modelling_003.versioninfo").write_text(json.dumps({"user": "ann"}))
+    catalog = ProjectCatalog(tmp_path / "catalog.sqlite")
+    catalog.sync(tmp_path / "project")
+    assert [v["file"] for v in catalog.versions()] == ["lamp_modelling_003.blend"]
+    latest = catalog.latest_version(task)
+    assert latest["version"] == 3 and latest["user"] == "ann" and latest["size"] == 4
+    catalog.close()
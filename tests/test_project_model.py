@@ -65,6 +65,17 @@ def test_project_model_build_tree(tmp_path):
     assert asset.tasks[0].name == "task1"
 
 
+def test_folder_path_is_built_from_parent(tmp_path):
+    root = Folder(tmp_path)
+    props = Folder(tmp_path / "props", parent=root)
+    chairs = Folder(tmp_path / "props" / "chairs", parent=props)
+    assert chairs.path == tmp_path / "props" / "chairs"
+    assert props._path is None and chairs._path is None
+    # a folder that does not sit directly in its parent keeps its path
+    elsewhere = Folder(tmp_path / "other" / "sets", parent=root)
+    assert elsewhere.path == tmp_path / "other" / "sets"
+
+
 def test_is_asset(tmp_path):
     folder_dir = tmp_path / "folder"
     folder_dir.mkdir()
@@ -95,3 +106,185 @@ def test_get_all_assets_recursive(tmp_path):
 
     assert "asset1" in asset_names
     assert "asset2" in asset_names
+
+
+def test_build_tree_lists_each_directory_once(tmp_path, monkeypatch):
+    (tmp_path / "b_folder" / "nested").mkdir(parents=True)
+    asset_dir = tmp_path / "a_folder" / "asset1"
+    (asset_dir / "rigging").mkdir(parents=True)
+    (asset_dir / "modelling").mkdir()
+    (asset_dir / "asset1.sidecar").touch()
+
+    import os
+
+    listed = []
+    real_scandir = os.scandir
+
+    def counting_scandir(path):
+        listed.append(str(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    project = ProjectModel(tmp_path)
+
+    assert len(listed) == len(set(listed))
+    assert [f.path.name for f in project.get_folders()] == ["a_folder", "b_folder"]
+    asset = project.root.subfolders[0].assets[0]
+    assert [t.name for t in asset.tasks] == ["modelling", "rigging"]
+
+
+def test_parallel_scan_matches_sequential(tmp_path):
+    for i in range(5):
+        folder = tmp_path / f"folder_{i}" / "sub"
+        folder.mkdir(parents=True)
+        asset_dir = folder / f"asset_{i}"
+        (asset_dir / "modelling").mkdir(parents=True)
+        (asset_dir / f"asset_{i}.sidecar").touch()
+
+    def shape(node):
+        return (
+            node.path.name,
+            [(a.name, [t.name for t in a.tasks]) for a in node.assets],
+            [shape(f) for f in node.subfolders],
+        )
+
+    sequential = ProjectModel(tmp_path)
+    parallel = ProjectModel(tmp_path, workers=4)
+    assert shape(parallel.root) == shape(sequential.root)
+
+
+def test_snapshot_roundtrip_and_revalidate(tmp_path):
+    root = tmp_path / "project"
+    asset_dir = root / "props" / "chair"
+    (asset_dir / "modelling").mkdir(parents=True)
+    (asset_dir / "chair.sidecar").touch()
+    (root / "old").mkdir()
+    snapshot = tmp_path / "index.json"
+
+    ProjectModel(root).save_snapshot(snapshot)
+    loaded = ProjectModel.from_snapshot(root, snapshot)
+    assert [f.path.name for f in loaded.get_folders()] == ["old", "props"]
+    assert loaded.get_all_assets()[0].tasks[0].name == "modelling"
+    assert ProjectModel.from_snapshot(tmp_path, snapshot) is None
+
+    # nothing changed on disk -> nothing to re-list
+    assert loaded.revalidate() == {}
+
+    (root / "old").rmdir()
+    (root / "chars" / "hero").mkdir(parents=True)
+    (root / "chars" / "hero" / "hero.sidecar").touch()
+    (asset_dir / "rigging").mkdir()
+    import os
+    for path in (root, asset_dir):
+        os.utime(path, ns=(0, 0))
+
+    props = loaded.root.subfolders[1]
+    updates = loaded.revalidate()
+    assert loaded.apply_updates(updates)
+    assert [f.path.name for f in loaded.get_folders()] == ["chars", "props"]
+    assert loaded.root.subfolders[1] is props
+    assert [a.name for a in loaded.get_all_assets()] == ["hero", "chair"]
+    assert [t.name for t in props.assets[0].tasks] == ["modelling", "rigging"]
+
+
+def test_apply_updates_reports_changes(tmp_path):
+    (tmp_path / "keep").mkdir()
+    (tmp_path / "gone").mkdir()
+    project = ProjectModel(tmp_path)
+    keep = project.root.subfolders[1]
+
+    (tmp_path / "gone").rmdir()
+    asset_dir = tmp_path / "keep" / "asset1"
+    asset_dir.mkdir()
+    (asset_dir / "asset1.sidecar").touch()
+
+    changes = project.apply_updates(project.revalidate({tmp_path, keep.path}))
+    kinds = [(kind, node.path.name) for kind, _, node in changes]
+    assert ("removed", "gone") in kinds
+    assert ("added", "asset1") in kinds
+    assert keep.assets[0].name == "asset1"
+    assert asset_dir in project.directories()
+
+
+def test_path_index_follows_edits(tmp_path):
+    project = ProjectModel(tmp_path)
+    folder = project.add_folder("props")
+    asset = project.add_asset("chair", folder)
+    task = project.add_task("modelling", asset)
+
+    assert project.find(tmp_path / "props") is folder
+    assert project.find(asset.path) is asset
+    assert project.find(task.path) is task
+    assert task.asset is asset and folder.parent is project.root
+    assert project._find_entity(asset) is folder
+    assert project.get_folders(folder.path) == []
+
+    project.remove_node(folder)
+    assert project.find(asset.path) is None
+    assert project.find(task.path) is None
+    assert folder not in project.root.subfolders
+    assert project._find_entity(folder) is None
+
+
+def test_lazy_scan_loads_children_on_demand(tmp_path):
+    asset_dir = tmp_path / "props" / "furniture" / "chair"
+    (asset_dir / "modelling").mkdir(parents=True)
+    (asset_dir / "chair.sidecar").touch()
+
+    project = ProjectModel(tmp_path, lazy=True)
+    props = project.root.subfolders[0]
+    assert props.subfolders == [] and props.unloaded == [tmp_path / "props" / "furniture"]
+
+    furniture = project.load_children(props)[0]
+    assert furniture.unloaded is not None
+    assert project.load_children(furniture)[0].name == "chair"
+    assert project.load_children(furniture) == []
+
+    # get_all_assets loads whatever is still missing
+    assert [a.name for a in ProjectModel(tmp_path, lazy=True).get_all_assets()] == ["chair"]
+
+
+def test_revalidate_given_paths_ignores_mtimes(tmp_path):
+    import os
+
+    project = ProjectModel(tmp_path)
+    stamp = os.stat(tmp_path).st_mtime_ns
+    (tmp_path / "new").mkdir()
+    os.utime(tmp_path, ns=(stamp, stamp))
+
+    # mtime looks unchanged, so only an explicit rescan notices the folder
+    assert project.revalidate() == {}
+    changes = project.apply_updates(project.revalidate(set(project.directories())))
+    assert [(kind, node.path.name) for kind, _, node in changes] == [("added", "new")]
+
+
+def test_streamed_batches_build_the_same_tree(tmp_path):
+    for name in ("b", "a"):
+        asset_dir = tmp_path / name / "nested" / f"{name}_asset"
+        (asset_dir / "modelling").mkdir(parents=True)
+        (asset_dir / f"{name}_asset.sidecar").touch()
+
+    project = ProjectModel(tmp_path, scan=False, lazy=True)
+    added = []
+    for batch in ProjectModel.scan_batches(tmp_path, workers=2, batch_size=1):
+        added += [node.path.name for _, _, node in project.attach_scans(batch)]
+
+    assert sorted(added) == ["a", "a_asset", "b", "b_asset", "nested", "nested"]
+    assert [f.path.name for f in project.get_folders()] == ["a", "b"]
+    nested = project.root.subfolders[0].subfolders[0]
+    assert nested.unloaded is None
+    assert nested.assets[0].tasks[0].name == "modelling"
+
+
+def test_nodes_share_paths_and_task_names(tmp_path):
+    for asset in ("a1", "a2"):
+        (tmp_path / "props" / asset / "modelling").mkdir(parents=True)
+        (tmp_path / "props" / asset / f"{asset}.sidecar").touch()
+
+    project = ProjectModel(tmp_path)
+    a1, a2 = project.root.subfolders[0].assets
+    assert not hasattr(a1, "__dict__")
+    assert a1.tasks[0].name is a2.tasks[0].name
+    assert a1.tasks[0].path == tmp_path / "props" / "a1" / "modelling"
+    assert project.find(a2.tasks[0].path) is a2.tasks[0]
+
@@ -0,0 +1,109 @@
+import ctypes
+import errno
+import sys
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from Core import Conduit
+from Core import ProjectWatcher as watcher_module
+from Core.ProjectWatcher import InotifyWatcher, PollingWatcher
+
+
+def _wait_for_change(watcher_cls, tmp_path, **kwargs):
+    received = []
+    event = threading.Event()
+
+    def on_change(changed):
+        received.append(changed)
+        event.set()
+
+    watcher = watcher_cls(on_change, **kwargs)
+    watcher.watch([tmp_path])
+    watcher.start()
+    try:
+        (tmp_path / "new_folder").mkdir()
+        assert event.wait(5)
+    finally:
+        watcher.stop()
+    return received
+
+
+def test_polling_watcher_reports_changed_directory(tmp_path):
+    received = _wait_for_change(PollingWatcher, tmp_path, interval=0.05)
+    assert received[0] == {tmp_path}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_reports_changed_directory(tmp_path):
+    received = _wait_for_change(InotifyWatcher, tmp_path)
+    assert received[0] == {tmp_path}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_polls_when_out_of_watches(tmp_path, monkeypatch):
+    def add_watch(fd, path, mask):
+        ctypes.set_errno(errno.ENOSPC)
+        return -1
+
+    real_init = InotifyWatcher.__init__
+
+    def init(self, on_change, poll_interval):
+        real_init(self, on_change, poll_interval)
+        self._libc = SimpleNamespace(inotify_add_watch=add_watch, inotify_rm_watch=lambda fd, wd: 0)
+
+    monkeypatch.setattr(InotifyWatcher, "__init__", init)
+    received = _wait_for_change(InotifyWatcher, tmp_path, poll_interval=0.05)
+    assert received[0] == {tmp_path}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_polls_network_shares(tmp_path, monkeypatch):
+    mounts = [(str(tmp_path), "nfs4"), ("/", "ext4")]
+    monkeypatch.setattr(watcher_module, "_read_mounts", lambda: mounts)
+    watcher = InotifyWatcher(lambda changed: None)
+    try:
+        watcher.watch([tmp_path / "unexpanded"], poll=False)
+        watcher.watch([tmp_path])
+        assert watcher._wds == {}
+        assert list(watcher._fallback._mtimes) == [tmp_path]
+    finally:
+        watcher.start()
+        watcher.stop()
+    received = _wait_for_change(InotifyWatcher, tmp_path, poll_interval=0.05)
+    assert received[0] == {tmp_path}
+
+
+def test_polling_watcher_skips_directories_not_worth_polling(tmp_path):
+    watcher = PollingWatcher(lambda changed: None)
+    watcher.watch([tmp_path / "asset"], poll=False)
+    watcher.watch([tmp_path])
+    assert list(watcher._mtimes) == [tmp_path]
+
+
+def test_conduit_polls_loaded_folders_only(tmp_path, monkeypatch):
+    (tmp_path / "props" / "chair" / "modelling").mkdir(parents=True)
+    (tmp_path / "props" / "chair" / "chair.sidecar").touch()
+    (tmp_path / "sets" / "street").mkdir(parents=True)
+    settings = {"project_directory": str(tmp_path), "lazy_scan": True, "poll_interval": 60}
+    conduit = Conduit(SimpleNamespace(get=lambda key, default=None: settings.get(key, default)))
+    watchers = []
+
+    def create(on_change, interval):
+        watchers.append(PollingWatcher(on_change, interval))
+        return watchers[-1]
+
+    monkeypatch.setattr(sys.modules[Conduit.__module__], "create_watcher", create)
+    conduit.start_watching(lambda *args: None)
+    try:
+        watcher = watchers[0]
+        assert watcher.interval == 60
+        # registered in the background; the unexpanded folders are not polled
+        deadline = time.monotonic() + 5
+        while tmp_path not in watcher._mtimes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert set(watcher._mtimes) == {tmp_path}
+        conduit.load_children(conduit.project.find(tmp_path / "props"))
+        assert set(watcher._mtimes) == {tmp_path, tmp_path / "props"}
+    finally:
+        conduit.stop_watching()
@@ -0,0 +1,71 @@
+from pathlib import Path
+from Core.ProjectModel import ProjectModel
+from Core.SearchIndex import SearchIndex
+
+
+def build(root):
+    for folder, asset in [("props", "chair"), ("props", "armchair"), ("chars", "soldier")]:
+        (root / folder / asset / "modelling").mkdir(parents=True)
+        (root / folder / asset / f"{asset}.sidecar").touch()
+    return ProjectModel(root)
+
+
+def test_ranking_and_kinds(tmp_path):
+    index = SearchIndex()
+    index.add_node(build(tmp_path).root)
+
+    assert [r.name for r in index.search("chair")] == ["chair", "armchair"]
+    assert index.search("chair")[0].path == tmp_path / "props" / "chair"
+    assert [r.name for r in index.search("soldir")] == ["soldier"]
+    assert [r.kind for r in index.search("model")] == ["task"] * 3
+    assert index.search("model", kinds=["asset"]) == []
+
+
+def test_incremental_updates_match_scans(tmp_path):
+    project = build(tmp_path)
+    scanned = SearchIndex()
+    for batch in ProjectModel.scan_batches(tmp_path):
+        scanned.add_scans(batch)
+    assert len(scanned) == 6
+
+    index = SearchIndex()
+    index.add_node(project.root)
+    index.remove(tmp_path / "props")
+    assert [r.name for r in index.search("chair")] == []
+    assert len(index) == 2
+
+    lamp = project.add_asset("lamp", project.find(tmp_path / "chars"))
+    index.add_node(project.add_task("rigging", lamp))
+    index.add_node(lamp)
+    assert [str(r.path) for r in index.search("rig")] == [str(Path(lamp.path) / "rigging")]
+
+
+def test_saved_index_refreshes_changed_directories(tmp_path):
+    root = tmp_path / "project"
+    build(root)
+    index = SearchIndex()
+    for batch in ProjectModel.scan_batches(root):
+        index.add_scans(batch)
+    saved = tmp_path / "search_index.json"
+    index.save(saved)
+
+    # a new asset, a removed folder and a new task since the index was saved
+    for path in sorted((root / "chars").rglob("*"), reverse=True):
+        path.rmdir() if path.is_dir() else path.unlink()
+    (root / "chars").rmdir()
+    (root / "sets" / "street" / "layout").mkdir(parents=True)
+    (root / "sets" / "street" / "street.sidecar").touch()
+    (root / "props" / "chair" / "rigging").mkdir()
+
+    loaded = SearchIndex()
+    assert loaded.load(saved)
+    assert len(loaded) == 6
+    assert loaded.refresh()
+    fresh = SearchIndex()
+    for batch in ProjectModel.scan_batches(root):
+        fresh.add_scans(batch)
+    assert sorted(loaded._entries) == sorted(fresh._entries)
+    assert loaded._mtimes == fresh._mtimes
+    assert [r.name for r in loaded.search("street")] == ["street"]
+    assert loaded.search("soldier") == []
+    assert not SearchIndex().load(tmp_path / "missing.json")
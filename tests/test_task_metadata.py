@@ -0,0 +1,42 @@
+import json
+from Core import TaskMetadata
+
+
+def test_version_record_and_last_record_wins(tmp_path):
+    version = tmp_path / "chair_modelling_002.blend"
+    version.write_bytes(b"blend data")
+
+    record = TaskMetadata.version_record(version, "alice")
+    assert record["version"] == 2 and record["size"] == 10 and record["sha1"]
+    TaskMetadata.append_records(tmp_path, [record])
+    TaskMetadata.append_records(tmp_path, [dict(record, comment="fixed uvs")])
+
+    records = TaskMetadata.load_task_metadata(tmp_path)
+    assert list(records) == [version.name]
+    assert records[version.name]["comment"] == "fixed uvs"
+
+
+def test_legacy_versioninfo_is_imported_once(tmp_path):
+    (tmp_path / "chair_modelling_001.blend").touch()
+    (tmp_path / "chair_modelling_001.versioninfo").write_text(
+        json.dumps({"user": "bob", "comment": "first"})
+    )
+
+    records = TaskMetadata.load_task_metadata(tmp_path)
+    assert records["chair_modelling_001.blend"]["user"] == "bob"
+    lines = TaskMetadata.metadata_path(tmp_path).read_text().splitlines()
+    assert len(lines) == 1
+
+    assert TaskMetadata.load_task_metadata(tmp_path) == records
+    assert TaskMetadata.metadata_path(tmp_path).read_text().splitlines() == lines
+
+
+def test_copy_file_hashes_while_copying(tmp_path):
+    source = tmp_path / "scene.blend"
+    source.write_bytes(bytes(range(256)) * 5000)
+    target = tmp_path / "chair_modelling_003.blend"
+
+    sha1 = TaskMetadata.copy_file(source, target, chunk_size=4096)
+    assert target.read_bytes() == source.read_bytes()
+    assert sha1 == TaskMetadata.file_hash(source)
+    assert TaskMetadata.version_record(target, "bob", sha1=sha1)["sha1"] == sha1
@@ -0,0 +1,32 @@
+import os
+from Core.VersionIndex import VersionIndex, parse_version
+
+
+def test_parse_version():
+    assert parse_version("soldier_modelling_020.blend") == 20
+    assert parse_version("notes.txt") is None
+
+
+def test_index_reuses_listing_until_mtime_changes(tmp_path, monkeypatch):
+    for name in ("a_001.blend", "a_003.blend", "a_002.blend1", "a.sidecar"):
+        (tmp_path / name).touch()
+
+    index = VersionIndex()
+    assert index.versions(tmp_path) == [1, 2, 3]
+
+    scans = []
+    original = VersionIndex._scan
+    monkeypatch.setattr(
+        VersionIndex, "_scan", staticmethod(lambda p: scans.append(p) or original(p))
+    )
+    (tmp_path / "a_004.blend").touch()
+    index.add(tmp_path, 4)
+    assert index.latest(tmp_path) == 4
+    assert scans == []
+
+    # a file added from outside bumps the mtime and triggers a new listing
+    (tmp_path / "a_010.blend").touch()
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert index.latest(tmp_path) == 10
+    assert scans == [tmp_path]